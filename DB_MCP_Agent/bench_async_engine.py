@@ -0,0 +1,89 @@
+# bench_async_engine.py
+# 스레드 풀 엔진(SQLEngine)과 aiosqlite 엔진(AsyncSQLEngine) 비교 벤치마크
+#  - 동시에 처리 중인(in-flight) 쿼리 수를 1, 4, 16, 64로 바꿔가며 처리량(쿼리/초)과 p50/p99 지연 시간 측정
+#  - 가벼운 쿼리(기본 키 조회)는 디스패치 비용, 무거운 쿼리(장르별 매출 조인)는 실행 시간이 지배
+#
+# 사용법: python bench_async_engine.py [--queries 500] [--pool-size 8]
+
+import argparse
+import asyncio
+import os
+import random
+import time
+
+from sql_engine import SQLEngine
+from sql_engine_async import AsyncSQLEngine
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.path.join(BASE_DIR, "Chinook.db")
+
+QUERIES = {
+    # 기본 키 조회 한 건
+    "light": ("SELECT TrackId, Name, Milliseconds, UnitPrice FROM Track WHERE TrackId = ?", lambda: (random.randint(1, 3503),)),
+    # 장르별 매출 집계: InvoiceLine × Track × Genre 조인
+    "heavy": ("""
+SELECT g.Name, COUNT(*) AS Lines, SUM(il.UnitPrice * il.Quantity) AS Revenue
+FROM InvoiceLine il
+JOIN Track t ON t.TrackId = il.TrackId
+JOIN Genre g ON g.GenreId = t.GenreId
+GROUP BY g.Name
+ORDER BY Revenue DESC
+""", lambda: ()),
+}
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run(engine, query: str, params, total: int, in_flight: int) -> tuple[float, float, float]:
+    """(쿼리/초, p50 ms, p99 ms)"""
+    sem = asyncio.Semaphore(in_flight)
+    latencies = []
+
+    async def one():
+        async with sem:
+            start = time.perf_counter()
+            await engine.execute_async(query, params(), timeout=30)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+    return total / elapsed, _percentile(latencies, 0.50) * 1000, _percentile(latencies, 0.99) * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="스레드 풀 엔진과 aiosqlite 엔진 비교")
+    parser.add_argument("--queries", type=int, default=500, help="단계별 실행할 쿼리 수")
+    parser.add_argument("--pool-size", type=int, default=8, help="연결 풀 크기 (두 엔진 같음)")
+    args = parser.parse_args()
+
+    engines = {
+        "thread": SQLEngine(DB_PATH, pool_size=args.pool_size),
+        "aiosqlite": AsyncSQLEngine(DB_PATH, pool_size=args.pool_size),
+    }
+    try:
+        # 워밍업 (연결 열기, 페이지 캐시 채우기)
+        for engine in engines.values():
+            for query, params in QUERIES.values():
+                await asyncio.gather(*(engine.execute_async(query, params()) for _ in range(args.pool_size)))
+
+        print(f"쿼리 {args.queries}개 / 풀 크기 {args.pool_size} / CPU {os.cpu_count()}개")
+        for label, (query, params) in QUERIES.items():
+            total = args.queries if label == "light" else max(1, args.queries // 10)
+            print(f"\n[{label}] 단계별 쿼리 {total}개")
+            print(f"{'in-flight':>10} | {'engine':>9} | {'q/s':>9} | {'p50 ms':>8} | {'p99 ms':>8}")
+            print("-" * 56)
+            for in_flight in (1, 4, 16, 64):
+                for name, engine in engines.items():
+                    qps, p50, p99 = await run(engine, query, params, total, in_flight)
+                    print(f"{in_flight:>10} | {name:>9} | {qps:>9.1f} | {p50:>8.2f} | {p99:>8.2f}")
+    finally:
+        engines["thread"].close()
+        await engines["aiosqlite"].aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
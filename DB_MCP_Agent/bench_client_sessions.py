@@ -0,0 +1,63 @@
+# bench_client_sessions.py
+# 클라이언트 도구 호출 지연 시간: 호출마다 세션 열기 vs 세션 풀 재사용
+#  - MultiServerMCPClient.get_tools()의 도구: 호출마다 stdio 서버 프로세스 실행 + initialize + 호출
+#  - MCPSessionPool.get_tools()의 도구: 열어 둔 세션으로 호출만 (IPC 왕복)
+#  - 같은 도구 호출을 순서대로 반복하여 p50/p95와 평균을 출력
+#
+# 사용법: python bench_client_sessions.py [--calls 20] [--pool-size 1] [--server xagent_server.py]
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+from langchain_mcp_adapters.client import MultiServerMCPClient
+
+from mcp_session_pool import MCPSessionPool
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+QUERY = "SELECT BillingCountry, SUM(Total) FROM Invoice GROUP BY BillingCountry ORDER BY 2 DESC LIMIT 5"
+
+
+async def measure(tools: list, calls: int) -> list[float]:
+    tool = next(t for t in tools if t.name == "execute_sql_query")
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        await tool.ainvoke({"query": QUERY})
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(label: str, latencies: list[float]) -> None:
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+    print(f"{label:>14} | {statistics.median(ordered):>9.2f} | {p95:>9.2f} | {statistics.mean(ordered):>9.2f}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="호출마다 세션 열기 vs 세션 풀 재사용")
+    parser.add_argument("--calls", type=int, default=20, help="방식별 도구 호출 수")
+    parser.add_argument("--pool-size", type=int, default=1, help="세션 풀 크기")
+    parser.add_argument("--server", default=os.path.join(BASE_DIR, "xagent_server.py"), help="stdio MCP 서버 스크립트")
+    args = parser.parse_args()
+
+    connections = {"chinook": {"transport": "stdio", "command": sys.executable, "args": [args.server]}}
+
+    per_call = await measure(await MultiServerMCPClient(connections).get_tools(), args.calls)
+    async with MCPSessionPool(connections, pool_size=args.pool_size) as pool:
+        pooled = await measure(await pool.get_tools(), args.calls)
+
+    print(f"호출 {args.calls}회 / 서버 {os.path.basename(args.server)} / 풀 크기 {args.pool_size}")
+    print(f"{'방식':>14} | {'p50 (ms)':>9} | {'p95 (ms)':>9} | {'평균 (ms)':>9}")
+    print("-" * 52)
+    report("per-call", per_call)
+    report("session pool", pooled)
+    print(f"평균 {statistics.mean(per_call) / statistics.mean(pooled):.1f}배 빠름")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,82 @@
+# bench_concurrency.py
+# SQLEngine 동시성 벤치마크
+#  - 동시에 처리 중인(in-flight) 쿼리 수를 1, 4, 16으로 바꿔가며 처리량(쿼리/초) 측정
+#  - 비교용으로 단일 연결에서 이벤트 루프 위에서 직접 실행하는 기존 방식도 측정
+#
+# 사용법: python bench_concurrency.py [--queries 200] [--pool-size 16]
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import time
+
+from sql_engine import SQLEngine
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.path.join(BASE_DIR, "Chinook.db")
+
+# 장르별 매출 집계: InvoiceLine × Track × Genre 조인 (적당히 무거운 분석 쿼리)
+QUERY = """
+SELECT g.Name, COUNT(*) AS Lines, SUM(il.UnitPrice * il.Quantity) AS Revenue
+FROM InvoiceLine il
+JOIN Track t ON t.TrackId = il.TrackId
+JOIN Genre g ON g.GenreId = t.GenreId
+GROUP BY g.Name
+ORDER BY Revenue DESC
+"""
+
+
+async def run_blocking(total: int, in_flight: int) -> float:
+    """기존 방식: 하나의 연결로 이벤트 루프 안에서 직접 실행 (동시성 없음)"""
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    sem = asyncio.Semaphore(in_flight)
+
+    async def one():
+        async with sem:
+            conn.execute(QUERY).fetchall()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return total / elapsed
+
+
+async def run_engine(engine: SQLEngine, total: int, in_flight: int) -> float:
+    """엔진 방식: 읽기 전용 연결 풀 + 스레드 풀에서 실행"""
+    sem = asyncio.Semaphore(in_flight)
+
+    async def one():
+        async with sem:
+            await engine.execute_async(QUERY)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return total / (time.perf_counter() - start)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="SQLEngine 동시성 벤치마크")
+    parser.add_argument("--queries", type=int, default=200, help="단계별 실행할 쿼리 수")
+    parser.add_argument("--pool-size", type=int, default=16, help="읽기 전용 연결 풀 크기")
+    args = parser.parse_args()
+
+    engine = SQLEngine(DB_PATH, pool_size=args.pool_size)
+    try:
+        # 워밍업 (페이지 캐시 채우기)
+        await engine.execute_async(QUERY)
+
+        print(f"쿼리 {args.queries}개 / 풀 크기 {args.pool_size} / CPU {os.cpu_count()}개")
+        print(f"{'in-flight':>10} | {'blocking (q/s)':>15} | {'engine (q/s)':>13} | {'배율':>6}")
+        print("-" * 55)
+        for in_flight in (1, 4, 16):
+            baseline = await run_blocking(args.queries, in_flight)
+            pooled = await run_engine(engine, args.queries, in_flight)
+            print(f"{in_flight:>10} | {baseline:>15.1f} | {pooled:>13.1f} | {pooled / baseline:>5.2f}x")
+    finally:
+        engine.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,112 @@
+# bench_http_sessions.py
+# Streamable HTTP 모드 부하 테스트
+#  - xagent_server.py를 HTTP 모드로 하나 띄운 뒤(또는 --url로 기존 서버 사용)
+#  - 여러 클라이언트가 동시에 세션을 열고 → 초기화 → 도구 호출 → 세션 종료를 반복
+#  - 초당 처리한 세션 수와 세션 지연 시간(p50/p95/p99)을 출력
+#
+# 사용법: python bench_http_sessions.py [--sessions 200] [--concurrency 20] [--url http://127.0.0.1:8765/mcp]
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER = os.path.join(BASE_DIR, "xagent_server.py")
+
+QUERY = "SELECT BillingCountry, SUM(Total) FROM Invoice GROUP BY BillingCountry ORDER BY 2 DESC LIMIT 5"
+
+
+async def wait_ready(url: str, timeout: float = 30.0) -> None:
+    """서버가 HTTP 요청을 받을 수 있을 때까지 대기합니다."""
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as http:
+        while time.monotonic() < deadline:
+            try:
+                await http.get(url, timeout=1.0)
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.2)
+    raise TimeoutError(f"서버가 {timeout}초 안에 시작되지 않았습니다: {url}")
+
+
+async def one_session(url: str) -> float:
+    """세션 하나: 연결 → initialize → list_tables → execute_sql_query → 종료"""
+    start = time.perf_counter()
+    async with streamablehttp_client(url) as (read, write, _):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            await session.call_tool("list_tables", {})
+            await session.call_tool("execute_sql_query", {"query": QUERY})
+    return time.perf_counter() - start
+
+
+async def run_load(url: str, sessions: int, concurrency: int) -> dict:
+    sem = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def worker():
+        nonlocal errors
+        async with sem:
+            try:
+                latencies.append(await one_session(url))
+            except Exception:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(sessions)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0.0
+    return {
+        "sessions": sessions,
+        "concurrency": concurrency,
+        "errors": errors,
+        "sessions_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(pct(0.50), 1),
+        "p95_ms": round(pct(0.95), 1),
+        "p99_ms": round(pct(0.99), 1),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 1) if latencies else 0.0,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Chinook MCP 서버 HTTP 세션 부하 테스트")
+    parser.add_argument("--sessions", type=int, default=200, help="실행할 전체 세션 수")
+    parser.add_argument("--concurrency", type=int, default=20, help="동시에 열어 둘 세션 수")
+    parser.add_argument("--url", default=None, help="이미 실행 중인 서버 주소 (없으면 직접 실행)")
+    parser.add_argument("--port", type=int, default=8765, help="직접 실행할 서버의 포트")
+    args = parser.parse_args()
+
+    proc = None
+    url = args.url
+    if url is None:
+        url = f"http://127.0.0.1:{args.port}/mcp"
+        proc = subprocess.Popen(
+            [sys.executable, SERVER, "--transport", "http", "--port", str(args.port)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    try:
+        await wait_ready(url)
+        await run_load(url, min(10, args.sessions), args.concurrency)  # 워밍업
+        result = await run_load(url, args.sessions, args.concurrency)
+        print(f"URL: {url}")
+        for key, value in result.items():
+            print(f"  {key:>17}: {value}")
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
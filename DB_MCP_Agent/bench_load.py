@@ -0,0 +1,315 @@
+# bench_load.py
+# 도구 호출 부하 테스트 (처리량과 꼬리 지연 시간)
+#  - xagent_server.py를 stdio와 HTTP 모드로 각각 띄운 뒤(또는 --url로 기존 HTTP 서버 사용)
+#  - 여러 가상 클라이언트가 동시에 list_tables / get_table_schema / execute_sql_query / validate_sql_query를
+#    가중치(--mix)대로 섞어 호출 (쿼리는 Chinook 분석 쿼리 모음에서 선택)
+#  - stdio: 서버 프로세스 하나와 세션 하나를 모든 클라이언트가 공유 (요청을 동시에 보냄)
+#    HTTP: 서버 프로세스 하나에 클라이언트마다 세션 하나
+#  - 전체/도구별 p50/p95/p99 지연 시간과 초당 호출 수를 JSON으로 출력
+#    --baseline으로 이전 결과 파일을 주면 p95/처리량이 허용 범위(--tolerance)보다 나빠졌는지 확인
+#
+# 사용법: python bench_load.py [--transport stdio|http|both] [--calls 2000] [--clients 16]
+#                              [--mix execute_sql_query=6,get_table_schema=2,list_tables=1,validate_sql_query=1]
+#                              [--corpus queries.json] [--output result.json] [--baseline old.json]
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER = os.path.join(BASE_DIR, "xagent_server.py")
+
+DEFAULT_MIX = "execute_sql_query=6,get_table_schema=2,list_tables=1,validate_sql_query=1"
+
+TABLES = [
+    "Album", "Artist", "Customer", "Employee", "Genre", "Invoice",
+    "InvoiceLine", "MediaType", "Playlist", "PlaylistTrack", "Track",
+]
+
+# Chinook 분석 쿼리 모음 (단순 조회부터 여러 테이블 조인 집계까지)
+CHINOOK_QUERIES = [
+    "SELECT * FROM Genre",
+    "SELECT * FROM MediaType",
+    "SELECT ArtistId, Name FROM Artist ORDER BY Name LIMIT 50",
+    "SELECT AlbumId, Title FROM Album WHERE ArtistId = 22",
+    "SELECT Name, Milliseconds FROM Track WHERE AlbumId = 148 ORDER BY TrackId",
+    "SELECT FirstName, LastName, Country, Email FROM Customer WHERE Country = 'Brazil'",
+    "SELECT Country, COUNT(*) AS Customers FROM Customer GROUP BY Country ORDER BY Customers DESC",
+    "SELECT BillingCountry, COUNT(*) AS Invoices, ROUND(SUM(Total), 2) AS Revenue "
+    "FROM Invoice GROUP BY BillingCountry ORDER BY Revenue DESC LIMIT 10",
+    "SELECT strftime('%Y', InvoiceDate) AS Year, ROUND(SUM(Total), 2) AS Revenue FROM Invoice GROUP BY Year ORDER BY Year",
+    "SELECT strftime('%Y-%m', InvoiceDate) AS Month, COUNT(*) AS Invoices FROM Invoice GROUP BY Month ORDER BY Month",
+    "SELECT c.CustomerId, c.FirstName || ' ' || c.LastName AS Customer, ROUND(SUM(i.Total), 2) AS Spent "
+    "FROM Customer c JOIN Invoice i ON i.CustomerId = c.CustomerId GROUP BY c.CustomerId ORDER BY Spent DESC LIMIT 10",
+    "SELECT g.Name AS Genre, COUNT(*) AS Tracks, ROUND(AVG(t.Milliseconds) / 60000.0, 2) AS AvgMinutes "
+    "FROM Track t JOIN Genre g ON g.GenreId = t.GenreId GROUP BY g.Name ORDER BY Tracks DESC",
+    "SELECT g.Name AS Genre, SUM(il.Quantity) AS Units, ROUND(SUM(il.UnitPrice * il.Quantity), 2) AS Revenue "
+    "FROM InvoiceLine il JOIN Track t ON t.TrackId = il.TrackId JOIN Genre g ON g.GenreId = t.GenreId "
+    "GROUP BY g.Name ORDER BY Revenue DESC",
+    "SELECT ar.Name AS Artist, COUNT(DISTINCT al.AlbumId) AS Albums, COUNT(t.TrackId) AS Tracks "
+    "FROM Artist ar JOIN Album al ON al.ArtistId = ar.ArtistId JOIN Track t ON t.AlbumId = al.AlbumId "
+    "GROUP BY ar.ArtistId ORDER BY Tracks DESC LIMIT 15",
+    "SELECT t.Name AS Track, ar.Name AS Artist, SUM(il.Quantity) AS Units "
+    "FROM InvoiceLine il JOIN Track t ON t.TrackId = il.TrackId JOIN Album al ON al.AlbumId = t.AlbumId "
+    "JOIN Artist ar ON ar.ArtistId = al.ArtistId GROUP BY t.TrackId ORDER BY Units DESC LIMIT 20",
+    "SELECT e.FirstName || ' ' || e.LastName AS Employee, COUNT(DISTINCT c.CustomerId) AS Customers, "
+    "ROUND(SUM(i.Total), 2) AS Revenue FROM Employee e JOIN Customer c ON c.SupportRepId = e.EmployeeId "
+    "JOIN Invoice i ON i.CustomerId = c.CustomerId GROUP BY e.EmployeeId ORDER BY Revenue DESC",
+    "SELECT p.Name AS Playlist, COUNT(*) AS Tracks FROM Playlist p JOIN PlaylistTrack pt ON pt.PlaylistId = p.PlaylistId "
+    "GROUP BY p.PlaylistId ORDER BY Tracks DESC",
+    "SELECT m.Name AS MediaType, COUNT(*) AS Tracks, ROUND(SUM(t.Bytes) / 1048576.0, 1) AS MB "
+    "FROM Track t JOIN MediaType m ON m.MediaTypeId = t.MediaTypeId GROUP BY m.Name",
+    "SELECT Composer, COUNT(*) AS Tracks FROM Track WHERE Composer IS NOT NULL "
+    "GROUP BY Composer ORDER BY Tracks DESC LIMIT 10",
+    "SELECT Name FROM Track WHERE Name LIKE '%Love%' ORDER BY Name LIMIT 25",
+    "SELECT i.InvoiceId, date(i.InvoiceDate) AS InvoiceDate, i.Total, COUNT(il.InvoiceLineId) AS Lines "
+    "FROM Invoice i JOIN InvoiceLine il ON il.InvoiceId = i.InvoiceId WHERE i.CustomerId = 5 GROUP BY i.InvoiceId",
+    "SELECT c.Country, g.Name AS Genre, SUM(il.Quantity) AS Units FROM InvoiceLine il "
+    "JOIN Invoice i ON i.InvoiceId = il.InvoiceId JOIN Customer c ON c.CustomerId = i.CustomerId "
+    "JOIN Track t ON t.TrackId = il.TrackId JOIN Genre g ON g.GenreId = t.GenreId "
+    "GROUP BY c.Country, g.Name ORDER BY Units DESC LIMIT 30",
+]
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    """"이름=가중치,..." 형식의 호출 비율을 {도구: 가중치}로 바꿉니다."""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name:
+            mix[name] = float(weight or 1)
+    unknown = set(mix) - {"list_tables", "get_table_schema", "execute_sql_query", "validate_sql_query"}
+    if unknown:
+        raise SystemExit(f"지원하지 않는 도구: {', '.join(sorted(unknown))}")
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+def load_corpus(path: str | None) -> list[str]:
+    """쿼리 모음 파일(JSON 문자열 배열)을 읽습니다. 없으면 기본 Chinook 쿼리 모음."""
+    if not path:
+        return list(CHINOOK_QUERIES)
+    with open(path, encoding="utf-8") as f:
+        queries = json.load(f)
+    if not queries or not all(isinstance(q, str) for q in queries):
+        raise SystemExit(f"쿼리 모음은 비어 있지 않은 문자열 배열이어야 합니다: {path}")
+    return queries
+
+
+def build_workload(mix: dict[str, float], corpus: list[str], calls: int, seed: int) -> list[tuple[str, dict]]:
+    """가중치대로 (도구 이름, 인자) 목록을 만듭니다. 같은 seed면 같은 순서 → 버전 간 비교 가능."""
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    workload = []
+    for name in rng.choices(names, weights, k=calls):
+        if name == "get_table_schema":
+            args = {"table_name": rng.choice(TABLES)}
+        elif name in ("execute_sql_query", "validate_sql_query"):
+            args = {"query": rng.choice(corpus)}
+        else:
+            args = {}
+        workload.append((name, args))
+    return workload
+
+
+def percentiles(latencies: list[float]) -> dict:
+    latencies = sorted(latencies)
+    pct = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0.0
+    return {
+        "p50_ms": round(pct(0.50), 2),
+        "p95_ms": round(pct(0.95), 2),
+        "p99_ms": round(pct(0.99), 2),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+    }
+
+
+async def replay(sessions: list, workload: list[tuple[str, dict]], clients: int) -> dict:
+    """
+    clients개의 가상 클라이언트가 작업 목록을 나눠 가져가며 호출합니다.
+    클라이언트 i는 sessions[i % len(sessions)]를 사용합니다.
+    """
+    pending = iter(workload)
+    timings: dict[str, list[float]] = {name: [] for name, _ in workload}
+    errors: dict[str, int] = {name: 0 for name, _ in workload}
+
+    async def client(session):
+        for name, args in pending:
+            start = time.perf_counter()
+            try:
+                result = await session.call_tool(name, args)
+                failed = result.isError
+            except Exception:
+                failed = True
+            timings[name].append(time.perf_counter() - start)
+            errors[name] += failed
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(sessions[i % len(sessions)]) for i in range(clients)))
+    elapsed = time.perf_counter() - start
+
+    everything = [t for values in timings.values() for t in values]
+    return {
+        "calls": len(everything),
+        "errors": sum(errors.values()),
+        "elapsed_s": round(elapsed, 3),
+        "calls_per_sec": round(len(everything) / elapsed, 1) if elapsed else 0.0,
+        **percentiles(everything),
+        "tools": {
+            name: {"calls": len(values), "errors": errors[name], **percentiles(values)}
+            for name, values in sorted(timings.items())
+        },
+    }
+
+
+def server_env(args) -> dict:
+    env = dict(os.environ)
+    if args.cache_size is not None:
+        env["CHINOOK_CACHE_SIZE"] = str(args.cache_size)
+    return env
+
+
+async def run_stdio(args, workload, warmup) -> dict:
+    from mcp import ClientSession, StdioServerParameters
+    from mcp.client.stdio import stdio_client
+
+    params = StdioServerParameters(command=sys.executable, args=[SERVER], cwd=BASE_DIR, env=server_env(args))
+    with open(os.devnull, "w") as devnull:
+        async with stdio_client(params, errlog=devnull) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                await replay([session], warmup, args.clients)
+                return await replay([session], workload, args.clients)
+
+
+async def run_http(args, workload, warmup) -> dict:
+    from contextlib import AsyncExitStack
+
+    from mcp import ClientSession
+    from mcp.client.streamable_http import streamablehttp_client
+    from bench_http_sessions import wait_ready
+
+    proc = None
+    url = args.url
+    if url is None:
+        url = f"http://127.0.0.1:{args.port}/mcp"
+        proc = subprocess.Popen(
+            [sys.executable, SERVER, "--transport", "http", "--port", str(args.port)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            env=server_env(args),
+        )
+    try:
+        await wait_ready(url)
+        async with AsyncExitStack() as stack:
+            sessions = []
+            for _ in range(args.clients):
+                read, write, _ = await stack.enter_async_context(streamablehttp_client(url))
+                session = await stack.enter_async_context(ClientSession(read, write))
+                await session.initialize()
+                sessions.append(session)
+            await replay(sessions, warmup, args.clients)
+            return await replay(sessions, workload, args.clients)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list[str]:
+    """이전 결과보다 p95가 (1 + tolerance)배 이상 느려졌거나 처리량이 (1 - tolerance)배 미만이면 설명을 반환합니다."""
+    regressions = []
+    for transport, current in result["transports"].items():
+        previous = baseline.get("transports", {}).get(transport)
+        if previous is None:
+            continue
+        if previous["p95_ms"] and current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{transport}: p95 {previous['p95_ms']}ms → {current['p95_ms']}ms")
+        if current["calls_per_sec"] < previous["calls_per_sec"] * (1 - tolerance):
+            regressions.append(f"{transport}: 처리량 {previous['calls_per_sec']} → {current['calls_per_sec']} calls/s")
+    return regressions
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Chinook MCP 서버 도구 호출 부하 테스트")
+    parser.add_argument("--transport", choices=["stdio", "http", "both"], default="both")
+    parser.add_argument("--calls", type=int, default=2000, help="측정할 전체 호출 수 (전송 방식마다)")
+    parser.add_argument("--clients", type=int, default=16, help="동시에 호출하는 가상 클라이언트 수")
+    parser.add_argument("--warmup", type=int, default=100, help="측정 전에 버리는 호출 수")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"도구별 호출 비율 (기본: {DEFAULT_MIX})")
+    parser.add_argument("--corpus", default=None, help="쿼리 모음 파일 (JSON 문자열 배열, 기본: 내장 Chinook 쿼리)")
+    parser.add_argument("--seed", type=int, default=42, help="작업 순서를 정하는 난수 시드")
+    parser.add_argument("--cache-size", type=int, default=None,
+                        help="서버 결과 캐시 크기 (CHINOOK_CACHE_SIZE, 0이면 캐시 없이 매번 실행)")
+    parser.add_argument("--url", default=None, help="이미 실행 중인 HTTP 서버 주소 (없으면 직접 실행)")
+    parser.add_argument("--port", type=int, default=8765, help="직접 실행할 HTTP 서버의 포트")
+    parser.add_argument("--output", default=None, help="결과 JSON을 저장할 파일 (기본: 표준 출력만)")
+    parser.add_argument("--baseline", default=None, help="비교할 이전 결과 JSON (나빠졌으면 종료 코드 1)")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="허용하는 p95/처리량 변화 비율")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    corpus = load_corpus(args.corpus)
+    workload = build_workload(mix, corpus, args.calls, args.seed)
+    warmup = build_workload(mix, corpus, args.warmup, args.seed + 1)
+
+    result = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "config": {
+            "calls": args.calls,
+            "clients": args.clients,
+            "warmup": args.warmup,
+            "mix": mix,
+            "corpus_queries": len(corpus),
+            "seed": args.seed,
+            "cache_size": args.cache_size,
+        },
+        "transports": {},
+    }
+    transports = ["stdio", "http"] if args.transport == "both" else [args.transport]
+    for transport in transports:
+        runner = run_stdio if transport == "stdio" else run_http
+        if transport == "http":
+            try:
+                import httpx  # noqa: F401  (HTTP 클라이언트가 없으면 HTTP 측정은 건너뜀)
+            except ImportError:
+                print("httpx가 없어 HTTP 측정을 건너뜁니다.", file=sys.stderr)
+                continue
+        print(f"{transport}: 호출 {args.calls}개, 클라이언트 {args.clients}개 ...", file=sys.stderr)
+        result["transports"][transport] = await runner(args, workload, warmup)
+
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"성능 저하: {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,70 @@
+# bench_startup.py
+# MCP 서버 콜드 스타트 시간 측정
+#  - 클라이언트가 stdio로 서버 프로세스를 새로 띄운 순간부터
+#    initialize → 첫 list_tools 응답을 받을 때까지의 시간을 반복 측정
+#  - x070_MCP_Agent.py처럼 요청마다 서버를 새로 띄우는 경우 이 시간이 그대로 응답 지연에 더해짐
+#
+# 사용법: python bench_startup.py [--runs 10] [--server xagent_server.py] [--server other_server.py ...]
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+async def cold_start(server: str) -> tuple[float, float]:
+    """서버를 새로 띄워 (initialize 완료, 첫 list_tools 응답) 시점을 초 단위로 반환합니다."""
+    params = StdioServerParameters(command=sys.executable, args=[server], cwd=BASE_DIR)
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull:
+        async with stdio_client(params, errlog=devnull) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                initialized = time.perf_counter() - start
+                await session.list_tools()
+                first_tools = time.perf_counter() - start
+    return initialized, first_tools
+
+
+async def bench(server: str, runs: int) -> dict:
+    await cold_start(server)  # 워밍업 (.pyc 생성, OS 파일 캐시)
+    init_times, tool_times = [], []
+    for _ in range(runs):
+        initialized, first_tools = await cold_start(server)
+        init_times.append(initialized * 1000)
+        tool_times.append(first_tools * 1000)
+    return {
+        "runs": runs,
+        "initialize_p50_ms": round(statistics.median(init_times), 1),
+        "list_tools_p50_ms": round(statistics.median(tool_times), 1),
+        "list_tools_min_ms": round(min(tool_times), 1),
+        "list_tools_max_ms": round(max(tool_times), 1),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="MCP 서버 콜드 스타트(프로세스 실행 → 첫 list_tools) 측정")
+    parser.add_argument("--runs", type=int, default=10, help="서버별 측정 횟수")
+    parser.add_argument(
+        "--server", action="append", default=None,
+        help="측정할 서버 스크립트 (여러 번 지정 가능, 기본값: xagent_server.py)",
+    )
+    args = parser.parse_args()
+
+    for server in args.server or ["xagent_server.py"]:
+        path = os.path.join(BASE_DIR, server) if not os.path.isabs(server) else server
+        result = await bench(path, args.runs)
+        print(f"서버: {server}")
+        for key, value in result.items():
+            print(f"  {key:>18}: {value}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,278 @@
+# catalog_search.py
+# 아티스트/앨범/트랙/장르/플레이리스트 이름의 전문 검색 (SQLite FTS5)
+#  - 원본 데이터베이스와 별도인 메모리 데이터베이스에 FTS5 인덱스와 결과 정보 테이블을 만듦
+#    (원본 스키마에는 테이블/트리거를 만들지 않으므로 원본 파일은 바뀌지 않음)
+#  - 원본 데이터가 바뀌면(버전 태그 변경) 다음 검색 때 인덱스를 새로 만들어 교체
+#  - BM25로 순위를 매기고, 입력한 단어는 접두어로 검색 ("iron mai" → "Iron Maiden")
+#
+# 사용법: python catalog_search.py Chinook.db "iron maiden" [--entity artist] [--limit 10]
+#        python catalog_search.py Chinook.db --drop  (이전 버전이 원본 파일에 설치한 인덱스/트리거 제거)
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import quote
+
+SEARCH_PREFIX = "search_"
+META_TABLE = "search_meta"
+
+# 단어 단위로 잘라 각 단어를 접두어 검색어로 사용 (FTS5 연산자/특수문자는 그대로 전달하지 않음)
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class SearchEntity:
+    """
+    검색 대상 하나의 정의입니다.
+
+    table/key: 원본 테이블과 정수 기본키 (FTS 인덱스의 rowid로 사용)
+    columns: 인덱싱할 컬럼과 BM25 가중치 (앞 컬럼이 이름/제목)
+    result_query: 검색 결과에 붙일 정보(id 컬럼 포함)를 원본에서 읽는 쿼리. 인덱스를 만들 때 함께 복사
+    """
+
+    def __init__(self, name: str, table: str, key: str, columns: dict[str, float], result_query: str):
+        self.name = name
+        self.table = table
+        self.key = key
+        self.columns = columns
+        self.result_query = result_query
+
+    @property
+    def index(self) -> str:
+        return SEARCH_PREFIX + self.name
+
+    @property
+    def signature(self) -> str:
+        return hashlib.sha1(repr((self.table, self.key, self.columns)).encode()).hexdigest()
+
+    @property
+    def info_table(self) -> str:
+        return f"{self.index}_info"
+
+    def create_sql(self) -> str:
+        # prefix='2 3': 2~3글자 접두어 검색용 추가 인덱스
+        return (f"CREATE VIRTUAL TABLE {self.index} USING fts5({', '.join(self.columns)}, "
+                "tokenize='unicode61 remove_diacritics 2', prefix='2 3')")
+
+    def copy_into(self, source: sqlite3.Connection, index: sqlite3.Connection) -> int:
+        """원본 연결에서 이름과 결과 정보를 읽어 인덱스 연결의 FTS/정보 테이블에 넣고 행 수를 반환합니다."""
+        cols = ", ".join(self.columns)
+        marks = ", ".join("?" for _ in range(len(self.columns) + 1))
+        index.execute(self.create_sql())
+        cur = source.execute(f"SELECT {self.key}, {cols} FROM {self.table}")
+        index.executemany(f"INSERT INTO {self.index}(rowid, {cols}) VALUES ({marks})", cur)
+        cur = source.execute(self.result_query)
+        names = [d[0] for d in cur.description]
+        index.execute(
+            f"CREATE TABLE {self.info_table} ("
+            + ", ".join(f'"{n}" INTEGER PRIMARY KEY' if n == "id" else f'"{n}"' for n in names) + ")"
+        )
+        index.executemany(f"INSERT INTO {self.info_table} VALUES ({', '.join('?' for _ in names)})", cur)
+        return index.execute(f"SELECT COUNT(*) FROM {self.info_table}").fetchone()[0]
+
+    def search_sql(self) -> str:
+        weights = ", ".join(str(w) for w in self.columns.values())
+        return (
+            f"SELECT bm25({self.index}, {weights}) AS score, r.* "
+            f"FROM {self.index} s JOIN {self.info_table} r ON r.id = s.rowid "
+            f"WHERE {self.index} MATCH ? ORDER BY score LIMIT ?"
+        )
+
+
+ENTITIES = [
+    SearchEntity(
+        "artist", "Artist", "ArtistId", {"Name": 1.0},
+        "SELECT ArtistId AS id, Name AS name FROM Artist",
+    ),
+    SearchEntity(
+        "album", "Album", "AlbumId", {"Title": 1.0},
+        "SELECT al.AlbumId AS id, al.Title AS name, ar.Name AS artist "
+        "FROM Album al LEFT JOIN Artist ar ON ar.ArtistId = al.ArtistId",
+    ),
+    SearchEntity(
+        "track", "Track", "TrackId", {"Name": 2.0, "Composer": 1.0},
+        "SELECT t.TrackId AS id, t.Name AS name, t.Composer AS composer, al.Title AS album, ar.Name AS artist "
+        "FROM Track t LEFT JOIN Album al ON al.AlbumId = t.AlbumId LEFT JOIN Artist ar ON ar.ArtistId = al.ArtistId",
+    ),
+    SearchEntity(
+        "genre", "Genre", "GenreId", {"Name": 1.0},
+        "SELECT GenreId AS id, Name AS name FROM Genre",
+    ),
+    SearchEntity(
+        "playlist", "Playlist", "PlaylistId", {"Name": 1.0},
+        "SELECT PlaylistId AS id, Name AS name FROM Playlist",
+    ),
+]
+ENTITY_NAMES = [e.name for e in ENTITIES]
+
+
+# --------------------------------------------------------
+# 인덱스
+# --------------------------------------------------------
+class SearchIndex:
+    """
+    메모리 데이터베이스에 두는 검색 인덱스입니다.
+
+    connect: 원본을 읽을 읽기 전용 연결을 여는 함수 (스냅숏 모드이면 스냅숏 연결)
+    refresh(tag)는 버전 태그가 마지막으로 만든 때와 다르면 인덱스를 새로 만들어 교체합니다.
+    새 인덱스는 잠금 밖에서 만들므로 만드는 동안에도 이전 인덱스로 검색할 수 있습니다.
+    """
+
+    def __init__(self, connect, entities: list[SearchEntity] = ENTITIES):
+        self._connect = connect
+        self._entities = entities
+        self.entities: list[str] = []   # 원본에 테이블이 있어 검색할 수 있는 대상 이름
+        self.tag = None
+        self.rows = 0
+        self.build_ms = None
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+
+    def build(self, tag=None) -> list[str]:
+        start = time.perf_counter()
+        source = self._connect()
+        try:
+            tables = {row[0] for row in source.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            wanted = [e for e in self._entities if e.table in tables]
+            index = sqlite3.connect(":memory:", check_same_thread=False)
+            rows = 0
+            with index:
+                for e in wanted:
+                    rows += e.copy_into(source, index)
+        finally:
+            source.close()
+        with self._lock:
+            old, self._conn = self._conn, index
+            self.entities = [e.name for e in wanted]
+            self.tag = tag
+            self.rows = rows
+            self.build_ms = round((time.perf_counter() - start) * 1000, 1)
+        if old is not None:
+            old.close()
+        return self.entities
+
+    def refresh(self, tag) -> bool:
+        """태그가 바뀌었으면 인덱스를 다시 만들고 True를 반환합니다 (동시에 한 번만 만듦)."""
+        if tag == self.tag and self._conn is not None:
+            return False
+        with self._build_lock:
+            if tag == self.tag and self._conn is not None:
+                return False    # 기다리는 동안 다른 스레드가 만듦
+            self.build(tag)
+            return True
+
+    def invalidate(self) -> None:
+        """다음 refresh()에서 태그와 관계없이 다시 만들도록 합니다 (스냅숏을 새로 복사했을 때)."""
+        self.tag = None
+
+    def search(self, text: str, entities: list[str], limit: int = 10) -> list[dict]:
+        with self._lock:
+            if self._conn is None:
+                return []
+            return search(self._conn, text, entities, limit)
+
+    def stats(self) -> dict:
+        return {"entities": self.entities, "rows": self.rows, "build_ms": self.build_ms}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# --------------------------------------------------------
+# 이전 버전 정리
+# --------------------------------------------------------
+def _drop(conn: sqlite3.Connection, entity: SearchEntity) -> None:
+    for suffix in ("ai", "ad", "au"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {entity.index}_{suffix}")
+    conn.execute(f"DROP TABLE IF EXISTS {entity.index}")
+
+
+def drop_search(db_path: str, entities: list[SearchEntity] = ENTITIES) -> None:
+    """이전 버전이 원본 파일에 설치한 FTS5 인덱스, 동기화 트리거, 메타 테이블을 제거합니다."""
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        with conn:
+            for e in entities:
+                _drop(conn, e)
+            conn.execute(f"DROP TABLE IF EXISTS {META_TABLE}")
+    finally:
+        conn.close()
+
+
+# --------------------------------------------------------
+# 검색
+# --------------------------------------------------------
+def build_match(text: str, any_term: bool = False) -> str | None:
+    """
+    사용자 입력을 FTS5 MATCH 식으로 바꿉니다.
+    각 단어는 따옴표로 감싼 접두어 검색어("word"*)가 되며, 기본은 모든 단어 포함(AND), any_term이면 OR.
+    """
+    tokens = _TOKEN_RE.findall(text)
+    if not tokens:
+        return None
+    return (" OR " if any_term else " ").join(f'"{t}"*' for t in tokens)
+
+
+def search(
+    conn: sqlite3.Connection,
+    text: str,
+    entities: list[str],
+    limit: int = 10,
+) -> list[dict]:
+    """
+    entities(이름 목록)의 FTS 인덱스에서 text를 검색하여 BM25 점수(작을수록 관련성 높음) 순으로 반환합니다.
+    모든 단어를 포함하는 결과가 없으면 단어 중 하나라도 포함하는 결과로 다시 검색합니다.
+    BM25 점수는 테이블마다 기준이 달라, 여러 대상을 검색하면 대상별 순위가 같은 것끼리 번갈아 배치합니다.
+    """
+    targets = [e for e in ENTITIES if e.name in entities]
+    results = []
+    for any_term in (False, True):
+        match = build_match(text, any_term)
+        if match is None:
+            return []
+        for e in targets:
+            cur = conn.execute(e.search_sql(), (match, limit))
+            columns = [d[0] for d in cur.description]
+            for rank, row in enumerate(cur):
+                item = dict(zip(columns, row))
+                results.append((rank, {"entity": e.name, "score": round(item.pop("score"), 4), **item}))
+        if results:
+            break
+    results.sort(key=lambda r: (r[0], r[1]["score"]))
+    return [item for _, item in results[:limit]]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="FTS5 이름 검색 (메모리 인덱스)")
+    parser.add_argument("db_path")
+    parser.add_argument("text", nargs="?", default=None)
+    parser.add_argument("--entity", choices=ENTITY_NAMES + ["all"], default="all")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--drop", action="store_true", help="이전 버전이 원본 파일에 설치한 검색 인덱스와 트리거 제거")
+    args = parser.parse_args()
+
+    if args.drop:
+        drop_search(args.db_path)
+        print("검색 인덱스를 제거했습니다.")
+    else:
+        uri = f"file:{quote(os.path.abspath(args.db_path))}?mode=ro"
+        index = SearchIndex(lambda: sqlite3.connect(uri, uri=True))
+        names = index.build()
+        print(f"검색 대상: {', '.join(names)} ({index.rows}행, {index.build_ms}ms)")
+        if args.text:
+            targets = names if args.entity == "all" else [args.entity]
+            start = time.perf_counter()
+            found = index.search(args.text, targets, args.limit)
+            elapsed = (time.perf_counter() - start) * 1000
+            for item in found:
+                print(f"  {item}")
+            print(f"({len(found)}건, {elapsed:.3f}ms)")
+        index.close()
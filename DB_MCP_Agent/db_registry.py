@@ -0,0 +1,425 @@
+# db_registry.py
+# 여러 SQLite 데이터베이스(테넌트)를 이름으로 관리하는 레지스트리
+#  - 설정된 데이터베이스는 이름 → 파일 경로만 기억하고, 처음 사용할 때 연결 풀/카탈로그/캐시를 만듦
+#  - 동시에 열어 둘 데이터베이스 수를 제한하고, 넘으면 사용 중이 아닌 것 중 가장 오래된 것부터 닫음
+#  - 일정 시간 사용하지 않은 데이터베이스는 닫아서 연결/스레드/캐시 메모리를 반환
+
+import asyncio
+import os
+import re
+import sqlite3
+import sys
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from urllib.parse import quote
+
+from catalog_search import META_TABLE as SEARCH_META, SearchIndex
+from db_snapshot import Snapshot
+from db_versions import VersionTracker
+from named_queries import check_named_queries
+from rollups import install_rollups, installed_rollups, rollup_tables
+from sampling import build_samples, default_sample_path, sample_tables
+from schema_catalog import SchemaCatalog
+from sql_cache import QueryCache
+from sql_cursors import CursorRegistry
+from sql_engine import SQLEngine
+from sql_engine_async import AsyncSQLEngine
+from table_index import TableIndex, hashing_embedding
+from table_stats import analyze, collect_table_stats
+
+# 데이터베이스 이름: 영문/숫자/밑줄로 시작하고 '.', '-'를 포함할 수 있음 (경로 구분자 불가)
+_NAME_RE = re.compile(r"^[A-Za-z0-9_][A-Za-z0-9_.-]*$")
+
+
+def parse_database_list(text: str) -> dict[str, str]:
+    """"이름=경로,이름=경로" 형식의 문자열을 {이름: 경로}로 변환합니다."""
+    databases = {}
+    for item in text.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, sep, path = item.partition("=")
+        if not sep or not name.strip() or not path.strip():
+            raise ValueError(f"데이터베이스 설정 형식이 올바르지 않습니다 (이름=경로): {item}")
+        databases[name.strip()] = path.strip()
+    return databases
+
+
+class Database:
+    """
+    데이터베이스 하나의 연결 풀, 스키마 카탈로그, 결과 캐시, 커서를 묶어 관리합니다.
+    생성 시 파일을 열고 카탈로그를 만들므로 이벤트 루프 밖(스레드)에서 생성합니다.
+    snapshot=True이면 파일을 메모리 스냅숏으로 복사하고 쿼리/커서/내보내기는 스냅숏을 읽습니다
+    (카탈로그와 버전 추적은 변경을 감지해야 하므로 계속 파일을 봄).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        db_path: str,
+        pool_size: int = 8,
+        cache_size: int = 256,
+        cursor_idle_timeout: float = 300.0,
+        query_timeout: float | None = None,
+        rollups: bool = False,
+        search: bool = False,
+        embedding=hashing_embedding,
+        descriptions: dict | None = None,
+        named_queries: dict | None = None,
+        snapshot: bool = False,
+        snapshot_refresh: float = 0.0,
+        sample_fraction: float = 0.0,
+        analysis_limit: int = 10000,
+        sql_backend: str = "thread",
+        wal: bool = False,
+    ):
+        self.name = name
+        self.db_path = db_path
+        self.engine = None
+        self.aengine = None     # sql_backend="aiosqlite"일 때 쿼리 실행용 aiosqlite 엔진
+        self.snapshot = None
+        self.catalog = None
+        self.cache = None
+        self.cursors = None
+        self.table_index = None
+        self.versions = None
+        self.named_query_errors: dict[str, str] = {}
+        self.rollups: list[str] = []
+        self.search: SearchIndex | None = None
+        # 근사 집계용 층화 표본 비율 (0이면 사용 안 함). 만들기는 오래 걸릴 수 있으므로 build_samples()로 따로 실행
+        # 표본은 원본 옆의 별도 파일(<원본>.samples)에 만들어 원본 파일과 버전 태그를 건드리지 않음
+        self.sample_fraction = sample_fraction
+        self.sample_path = default_sample_path(db_path)
+        self.samples_tag = None     # 마지막으로 표본을 만든 뒤의 데이터베이스 버전 태그
+        self.samples_built_at = 0.0
+        # 테이블 통계 (행 수, 크기, 인덱스, 컬럼 고유값 수). 전체 테이블을 읽으므로 collect_stats()로 따로 계산
+        # analysis_limit: collect_stats(run_analyze=True)로 ANALYZE를 요청할 때 인덱스마다 읽는 최대 행 수
+        self.analysis_limit = analysis_limit
+        self.table_stats: dict[str, dict] | None = None
+        self.stats_tag = None       # 마지막으로 통계를 계산하기 전의 데이터베이스 버전 태그
+        self.stats_built_at = 0.0
+        self.stats_computed_at = None   # time.time()
+        self.stats_ms = None
+        # 요약/검색/표본 관리용 테이블 (스키마 카탈로그에서 제외)
+        self.internal_tables = rollup_tables() | {SEARCH_META} | sample_tables()
+        try:
+            # 요약 설치는 원본 파일에 테이블/트리거를 쓰므로 rollups=True일 때만,
+            # 아니면 이미 설치된 요약만 읽기 전용으로 찾음 (스냅숏 복사보다 먼저)
+            try:
+                self.rollups = install_rollups(db_path) if rollups else installed_rollups(db_path)
+            except sqlite3.Error as e:
+                print(f"요약 테이블 설치/확인 실패 (요약 없이 진행): {name}: {e}", file=sys.stderr)
+            if snapshot:
+                # 요약 설치가 끝난 파일을 복사
+                self.snapshot = Snapshot(db_path, refresh_interval=snapshot_refresh)
+            # WAL 전환은 원본 파일에 쓰므로 wal=True일 때만, 스냅숏 모드에서는 풀이 파일을 읽지 않으므로 하지 않음
+            self.engine = SQLEngine(
+                db_path, pool_size=pool_size, enable_wal=wal and self.snapshot is None,
+                connect=self.snapshot.connect if self.snapshot else None,
+            )
+            if sql_backend == "aiosqlite":
+                # 연결은 처음 쿼리할 때 이벤트 루프에서 열림 (aclose()로 닫음)
+                self.aengine = AsyncSQLEngine(
+                    db_path, pool_size=pool_size, connect=self.snapshot.connect if self.snapshot else None,
+                )
+            elif sql_backend != "thread":
+                raise ValueError(f"알 수 없는 SQL 실행 방식입니다: {sql_backend} (thread 또는 aiosqlite)")
+            # 컬럼/외래키/인덱스/행 수/샘플 행을 미리 읽어 둠 (데이터베이스별 스키마 캐시)
+            # 요약/검색/표본 관리용 테이블은 스키마 도구, 관련 테이블 검색, 통계에 보이지 않도록 제외
+            self.catalog = SchemaCatalog(db_path, exclude=self.internal_tables)
+            # 질문 → 관련 테이블 검색용 벡터 인덱스 (요약은 뷰라서 카탈로그에 없음, list_rollups로 안내)
+            self.table_index = TableIndex(self.catalog, embedding, descriptions or {})
+            if named_queries:
+                # 이름 붙은 쿼리를 한 번 컴파일해 보고 이 데이터베이스 스키마와 맞지 않는 것을 기록
+                with self.engine.pool.connection() as conn:
+                    self.named_query_errors = check_named_queries(conn, named_queries)
+                for query_name, error in self.named_query_errors.items():
+                    print(f"이름 붙은 쿼리 사용 불가: {name}/{query_name}: {error}", file=sys.stderr)
+            if cache_size > 0:
+                self.cache = QueryCache(db_path, max_entries=cache_size)
+            self.cursors = CursorRegistry(
+                db_path, idle_timeout=cursor_idle_timeout, timeout=query_timeout,
+                connect=self.snapshot.connect if self.snapshot else None,
+            )
+            if search:
+                # 이름 검색용 FTS5 인덱스: 원본과 별도인 메모리 DB에 처음 검색할 때 만들고 데이터가 바뀌면 다시 만듦
+                self.search = SearchIndex(self.connect)
+            if self.snapshot is not None:
+                self.snapshot.on_refresh(self._snapshot_refreshed)
+            # 리소스 버전 태그와 변경 알림용 스키마/데이터 버전 추적 (요약/검색 설치가 끝난 뒤 시작)
+            self.versions = VersionTracker(db_path)
+        except Exception:
+            self.close()
+            raise
+        self.active = 0     # 이 데이터베이스를 사용 중인 도구 호출 수
+        self.last_used = time.monotonic()
+
+    def build_samples(self, force: bool = False) -> list[str]:
+        """
+        층화 표본을 (없거나 설정이 바뀌었으면, force이면 항상) 표본 DB에 만들고 다시 만든 테이블 목록을 반환합니다.
+        원본 전체를 읽으므로 스레드에서 실행합니다. 읽기 전의 버전 태그를 기억해 두어 이후 변경 여부를 판단합니다.
+        """
+        before = self.versions.current_tag()
+        built = build_samples(self.db_path, self.sample_fraction, force=force, sample_path=self.sample_path)
+        self.samples_tag = before
+        self.samples_built_at = time.monotonic()
+        return built
+
+    def collect_stats(self, run_analyze: bool = False) -> dict[str, dict]:
+        """
+        테이블 통계를 읽기 전용 연결(스냅숏 모드이면 스냅숏)로 계산해 table_stats에 보관합니다 (스레드에서 실행).
+        run_analyze이면 먼저 원본에 ANALYZE를 실행합니다 (명시적으로 요청할 때만, 데이터 버전이 바뀜, 실패하면 건너뜀).
+        카탈로그의 sqlite_stat1 통계도 다시 읽어 실행 계획 비용 추정에 반영합니다.
+        """
+        start = time.perf_counter()
+        tables = {name: self.catalog.get(name) for name in self.catalog.table_names()}
+        if run_analyze:
+            try:
+                analyze(self.db_path, self.analysis_limit)
+            except sqlite3.Error as e:
+                # 읽기 전용/잠긴 파일 등: ANALYZE 없이 기존 sqlite_stat1(없으면 표본/정확한 계산)으로 진행
+                print(f"ANALYZE 실패 (기존 통계 사용): {self.name}: {e}", file=sys.stderr)
+        # 읽기 전의 버전 태그: 읽는 동안 데이터가 바뀌었으면 다음 확인 때 다시 계산
+        before = self.versions.current_tag()
+        stats = collect_table_stats(self.db_path, tables, connect=self.connect)
+        # 처음 ANALYZE하면 sqlite_stat1 테이블이 생겨 스키마 버전이 바뀌므로 그때는 카탈로그 전체를 다시 만듦
+        if not self.catalog.refresh_if_changed():
+            self.catalog.reload_index_stats()
+        self.table_stats = stats
+        self.stats_tag = before
+        self.stats_built_at = time.monotonic()
+        self.stats_computed_at = time.time()
+        self.stats_ms = round((time.perf_counter() - start) * 1000, 1)
+        return stats
+
+    @property
+    def query_engine(self):
+        """execute_async로 쿼리를 실행할 엔진 (aiosqlite 엔진이 있으면 그것, 없으면 스레드 풀 엔진)."""
+        return self.aengine or self.engine
+
+    def _snapshot_refreshed(self) -> None:
+        # 풀의 연결을 새 스냅숏으로 바꾸고, 이전 스냅숏에서 얻은 캐시 결과를 비움
+        self.engine.pool.reconnect()
+        if self.aengine is not None:
+            self.aengine.reconnect()
+        if self.cache is not None:
+            self.cache.clear()
+        if self.search is not None:
+            self.search.invalidate()
+
+    def connect(self) -> sqlite3.Connection:
+        """풀과 별도로 쓰는 읽기 전용 연결 (스냅숏 모드이면 현재 스냅숏)을 엽니다."""
+        if self.snapshot is not None:
+            return self.snapshot.connect()
+        uri = f"file:{quote(os.path.abspath(self.db_path))}?mode=ro"
+        return sqlite3.connect(uri, uri=True, check_same_thread=False)
+
+    async def aclose(self) -> None:
+        """aiosqlite 연결을 이벤트 루프에서 닫은 뒤 나머지를 스레드에서 닫습니다."""
+        if self.aengine is not None:
+            await self.aengine.aclose()
+        await asyncio.to_thread(self.close)
+
+    def close(self) -> None:
+        # 스냅숏을 먼저 닫아 (진행 중인 새로 고침이 끝난 뒤) 더 이상 풀 연결을 다시 열지 않도록 함
+        if self.snapshot is not None:
+            self.snapshot.close()
+        if self.versions is not None:
+            self.versions.close()
+        if self.cursors is not None:
+            self.cursors.close_all()
+        if self.cache is not None:
+            self.cache.close()
+        if self.search is not None:
+            self.search.close()
+        if self.catalog is not None:
+            self.catalog.close()
+        if self.engine is not None:
+            self.engine.close()
+
+
+class DatabaseRegistry:
+    """
+    이름으로 데이터베이스를 찾아 필요할 때 열고, 사용하지 않으면 닫습니다.
+
+    databases: {이름: 파일 경로} (고정 목록)
+    db_dir: 이 디렉터리의 *.db 파일도 파일 이름(확장자 제외)으로 사용 가능 (새 파일은 바로 인식)
+    default: database 인자를 생략했을 때 사용할 이름
+    max_open: 동시에 열어 둘 최대 데이터베이스 수
+    idle_timeout: 이 시간(초) 동안 사용하지 않은 데이터베이스는 reap_idle()에서 닫음
+    options: Database 생성자에 그대로 전달 (pool_size, cache_size 등)
+    """
+
+    def __init__(
+        self,
+        databases: dict[str, str],
+        db_dir: str | None = None,
+        default: str | None = None,
+        max_open: int = 8,
+        idle_timeout: float = 600.0,
+        **options,
+    ):
+        for name in databases:
+            if not _NAME_RE.match(name):
+                raise ValueError(f"사용할 수 없는 데이터베이스 이름입니다: {name}")
+        self._configured = {name: os.path.abspath(path) for name, path in databases.items()}
+        self.db_dir = os.path.abspath(db_dir) if db_dir else None
+        self.default = default or next(iter(self._configured), None)
+        self.max_open = max(1, max_open)
+        self.idle_timeout = idle_timeout
+        self._options = options
+        self._open: OrderedDict[str, Database] = OrderedDict()   # 가장 오래 사용하지 않은 것이 앞
+        self._opening: set[str] = set()
+        self._cond = asyncio.Condition()
+
+    # --------------------------------------------------------
+    # 이름 → 경로
+    # --------------------------------------------------------
+    def _available(self) -> dict[str, str]:
+        found = {}
+        if self.db_dir and os.path.isdir(self.db_dir):
+            for entry in os.scandir(self.db_dir):
+                stem, ext = os.path.splitext(entry.name)
+                if ext == ".db" and entry.is_file() and _NAME_RE.match(stem):
+                    found[stem] = entry.path
+        found.update(self._configured)
+        return found
+
+    def names(self) -> list[str]:
+        return sorted(self._available())
+
+    def resolve(self, name: str | None) -> tuple[str, str]:
+        """이름(대소문자 무시)을 (등록된 이름, 파일 경로)로 바꿉니다. 없으면 LookupError."""
+        name = (name or self.default or "").strip()
+        available = self._available()
+        if name not in available:
+            by_lower = {n.lower(): n for n in available}
+            name = by_lower.get(name.lower(), name)
+        path = available.get(name)
+        if path is None or not os.path.exists(path):
+            raise LookupError(
+                f"데이터베이스를 찾을 수 없습니다: {name or '(기본값 없음)'} "
+                f"(사용 가능: {', '.join(sorted(available)) or '없음'})"
+            )
+        return name, path
+
+    # --------------------------------------------------------
+    # 열기 / 닫기
+    # --------------------------------------------------------
+    def _evict_one(self) -> Database | None:
+        """
+        사용 중이 아닌 데이터베이스 중 가장 오래된 것을 목록에서 빼서 반환합니다.
+        열린 커서가 있는 데이터베이스는 커서가 없는 것이 하나도 없을 때만 닫습니다.
+        """
+        idle = [db for db in self._open.values() if db.active == 0]
+        if not idle:
+            return None
+        victim = next((db for db in idle if len(db.cursors) == 0), idle[0])
+        return self._open.pop(victim.name)
+
+    async def _acquire(self, name: str | None) -> Database:
+        name, path = self.resolve(name)
+        evicted = None
+        async with self._cond:
+            while True:
+                db = self._open.get(name)
+                if db is not None:
+                    db.active += 1
+                    db.last_used = time.monotonic()
+                    self._open.move_to_end(name)
+                    return db
+                if name not in self._opening:
+                    if len(self._open) + len(self._opening) < self.max_open:
+                        break
+                    evicted = self._evict_one()
+                    if evicted is not None:
+                        break
+                # 다른 호출이 같은 DB를 여는 중이거나, 열린 DB가 모두 사용 중이면 대기
+                await self._cond.wait()
+            self._opening.add(name)
+
+        try:
+            if evicted is not None:
+                await evicted.aclose()
+                print(f"데이터베이스 닫음 (최대 {self.max_open}개 초과): {evicted.name}", file=sys.stderr)
+            db = await asyncio.to_thread(Database, name, path, **self._options)
+        except BaseException:
+            async with self._cond:
+                self._opening.discard(name)
+                self._cond.notify_all()
+            raise
+
+        async with self._cond:
+            self._opening.discard(name)
+            db.active = 1
+            self._open[name] = db
+            self._cond.notify_all()
+        print(f"데이터베이스 열림: {name}", file=sys.stderr)
+        return db
+
+    async def _release(self, db: Database) -> None:
+        async with self._cond:
+            db.active -= 1
+            db.last_used = time.monotonic()
+            self._cond.notify_all()
+
+    @asynccontextmanager
+    async def use(self, name: str | None = None):
+        """
+        데이터베이스를 (필요하면 열어서) 빌려 줍니다. 블록을 벗어날 때까지는 닫히지 않습니다.
+
+        async with registry.use("tenant_a") as db:
+            rows = await db.engine.execute_async(...)
+        """
+        db = await self._acquire(name)
+        try:
+            yield db
+        finally:
+            await self._release(db)
+
+    async def reap_idle(self) -> list[str]:
+        """idle_timeout 동안 사용하지 않은 데이터베이스를 닫고, 닫은 이름 목록을 반환합니다."""
+        deadline = time.monotonic() - self.idle_timeout
+        async with self._cond:
+            expired = [db for db in self._open.values() if db.active == 0 and db.last_used < deadline]
+            for db in expired:
+                del self._open[db.name]
+            self._cond.notify_all()
+        for db in expired:
+            await db.aclose()
+        return [db.name for db in expired]
+
+    def open_databases(self) -> list[Database]:
+        return list(self._open.values())
+
+    def find_cursor(self, cursor_id: str) -> str | None:
+        """열린 데이터베이스 중 cursor_id 커서를 가진 데이터베이스 이름을 반환합니다."""
+        for db in self.open_databases():
+            if cursor_id in db.cursors:
+                return db.name
+        return None
+
+    def stats(self) -> dict:
+        return {
+            "configured": len(self._available()),
+            "open": [
+                {
+                    "name": db.name,
+                    "active_calls": db.active,
+                    "open_cursors": len(db.cursors),
+                    "idle_seconds": round(time.monotonic() - db.last_used, 1),
+                    **({"snapshot": db.snapshot.stats()} if db.snapshot is not None else {}),
+                    **({"aiosqlite": db.aengine.stats()} if db.aengine is not None else {}),
+                }
+                for db in self._open.values()
+            ],
+            "max_open": self.max_open,
+            "idle_timeout": self.idle_timeout,
+        }
+
+    async def close_all(self) -> None:
+        dbs = list(self._open.values())
+        self._open.clear()
+        for db in dbs:
+            await db.aclose()
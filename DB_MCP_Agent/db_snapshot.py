@@ -0,0 +1,187 @@
+# db_snapshot.py
+# 읽기 전용 데이터베이스를 메모리 스냅숏으로 서빙
+#  - 데이터베이스를 열 때 백업 API로 파일 전체를 공유 메모리 데이터베이스(memdb VFS)에 복사
+#    (WAL 모드 파일은 백업하면 헤더의 WAL 표시까지 복사되어 memdb에서 열 수 없으므로 VACUUM INTO 사용)
+#  - 모든 쿼리 연결은 스냅숏을 읽으므로 쿼리 경로에서 디스크 I/O와 페이지 캐시 미스가 없음
+#  - 새로 고침은 새 메모리 데이터베이스에 복사를 끝낸 뒤 한 번에 교체 (원자적)
+#    → 실행 중인 쿼리/열린 커서는 이전 스냅숏을 끝까지 읽고, 새 연결부터 새 스냅숏을 읽음
+#  - 이전 스냅숏의 메모리는 그 스냅숏을 읽는 마지막 연결이 닫힐 때 반환됨
+#
+# 사용법: python db_snapshot.py Chinook.db "SELECT ..." (디스크/스냅숏 실행 시간 비교)
+
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from urllib.parse import quote
+
+
+def _file_state(db_path: str) -> tuple:
+    """
+    원본 파일과 WAL 파일의 (크기, 수정 시각). 다른 프로세스의 커밋/체크포인트를 감지하는 데 사용.
+    빈 WAL 파일은 없는 것과 같이 취급 (읽기 연결을 열고 닫는 것만으로 생기고 지워짐)
+    """
+    state = []
+    for path in (db_path, db_path + "-wal"):
+        try:
+            st = os.stat(path)
+        except OSError:
+            st = None
+        state.append((st.st_size, st.st_mtime_ns) if st is not None and st.st_size else None)
+    return tuple(state)
+
+
+class Snapshot:
+    """
+    데이터베이스 파일 하나의 메모리 스냅숏입니다.
+
+    connect()는 현재 스냅숏에 대한 읽기 전용 연결을 반환합니다.
+    refresh()로 스냅숏을 교체하면 on_refresh()로 등록한 함수가 호출되므로,
+    연결 풀처럼 연결을 오래 들고 있는 쪽은 여기서 연결을 다시 엽니다.
+    refresh_interval(초)이 0보다 크면 파일이 바뀌지 않았어도 그 주기마다 다시 복사합니다.
+    """
+
+    def __init__(self, db_path: str, refresh_interval: float = 0.0):
+        self.db_path = os.path.abspath(db_path)
+        self.refresh_interval = refresh_interval
+        self.generation = 0
+        self.loaded_at = None       # 마지막으로 복사한 시각 (time.time())
+        self.load_ms = None         # 마지막 복사에 걸린 시간
+        self.size_bytes = 0
+        self.refreshes = 0
+        self._label = uuid.uuid4().hex[:12]
+        self._uri = None
+        self._anchor: sqlite3.Connection | None = None   # 스냅숏을 메모리에 유지하는 연결
+        self._source = None
+        self._loaded_mono = 0.0
+        self._listeners = []
+        self._closed = False
+        self._lock = threading.Lock()            # 교체(uri/anchor 변경)
+        self._refresh_lock = threading.Lock()    # 복사/교체/닫기는 한 번에 하나만
+        self.refresh(force=True)
+
+    # --------------------------------------------------------
+    # 연결
+    # --------------------------------------------------------
+    def connect(self, **kwargs) -> sqlite3.Connection:
+        """현재 스냅숏에 대한 읽기 전용 연결을 엽니다 (kwargs는 sqlite3.connect에 전달)."""
+        with self._lock:
+            if self._uri is None:
+                raise sqlite3.ProgrammingError("스냅숏이 닫혔습니다.")
+            return sqlite3.connect(self._uri, uri=True, check_same_thread=False, **kwargs)
+
+    def on_refresh(self, callback) -> None:
+        """스냅숏이 교체된 뒤 호출할 함수(인자 없음)를 등록합니다."""
+        self._listeners.append(callback)
+
+    # --------------------------------------------------------
+    # 복사 / 교체
+    # --------------------------------------------------------
+    def is_stale(self) -> bool:
+        """원본 파일이 바뀌었거나 주기 새로 고침 시간이 지났으면 True."""
+        if _file_state(self.db_path) != self._source:
+            return True
+        return self.refresh_interval > 0 and time.monotonic() - self._loaded_mono >= self.refresh_interval
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        필요하면(force이면 항상) 원본을 새 메모리 데이터베이스로 복사하고 교체합니다.
+        교체했으면 True. 복사 중 오류가 나면 기존 스냅숏을 그대로 두고 예외를 발생시킵니다.
+        """
+        with self._refresh_lock:
+            if self._closed:
+                return False
+            if not force and not self.is_stale():
+                return False
+            # 복사 전에 상태를 읽어 두므로, 복사 중에 바뀐 내용은 다음 확인 때 다시 복사됨
+            source = _file_state(self.db_path)
+            start = time.perf_counter()
+            generation = self.generation + 1
+            name = f"/chinook-snapshot-{self._label}-{generation}"
+            target = sqlite3.connect(f"file:{quote(name)}?vfs=memdb", uri=True, check_same_thread=False)
+            try:
+                src = sqlite3.connect(f"file:{quote(self.db_path)}?mode=ro", uri=True)
+                try:
+                    # 둘 다 읽기 트랜잭션 하나로 전체를 복사하므로 일관된 시점의 스냅숏
+                    if src.execute("PRAGMA journal_mode").fetchone()[0] == "wal":
+                        src.execute("VACUUM INTO ?", (f"file:{quote(name)}?vfs=memdb",))
+                    else:
+                        src.backup(target)
+                finally:
+                    src.close()
+                page_count = target.execute("PRAGMA page_count").fetchone()[0]
+                page_size = target.execute("PRAGMA page_size").fetchone()[0]
+            except BaseException:
+                target.close()
+                raise
+
+            with self._lock:
+                previous = self._anchor
+                self._anchor = target
+                self._uri = f"file:{quote(name)}?vfs=memdb&mode=ro"
+                self.generation = generation
+            self._source = source
+            self._loaded_mono = time.monotonic()
+            self.loaded_at = time.time()
+            self.load_ms = round((time.perf_counter() - start) * 1000, 2)
+            self.size_bytes = page_count * page_size
+            if previous is None:
+                return True
+            self.refreshes += 1
+
+            for callback in self._listeners:
+                try:
+                    callback()
+                except Exception as e:
+                    print(f"스냅숏 교체 후 처리 실패: {e}", file=sys.stderr)
+            # 이전 스냅숏을 아직 읽는 연결이 있으면 그 연결이 닫힐 때 메모리가 반환됨
+            previous.close()
+            return True
+
+    def stats(self) -> dict:
+        return {
+            "generation": self.generation,
+            "size_bytes": self.size_bytes,
+            "load_ms": self.load_ms,
+            "loaded_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.loaded_at)) if self.loaded_at else None,
+            "age_seconds": round(time.monotonic() - self._loaded_mono, 1),
+            "refreshes": self.refreshes,
+            "refresh_interval": self.refresh_interval,
+        }
+
+    def close(self) -> None:
+        """스냅숏을 닫습니다. 진행 중인 새로 고침이 있으면 끝날 때까지 기다립니다."""
+        with self._refresh_lock:
+            self._closed = True
+            with self._lock:
+                anchor, self._anchor, self._uri = self._anchor, None, None
+            if anchor is not None:
+                anchor.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="디스크와 메모리 스냅숏의 쿼리 실행 시간 비교")
+    parser.add_argument("db_path")
+    parser.add_argument("query")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    snapshot = Snapshot(args.db_path)
+    print(f"스냅숏 복사: {snapshot.size_bytes / 1024:.0f}KB, {snapshot.load_ms}ms")
+    disk = sqlite3.connect(f"file:{quote(os.path.abspath(args.db_path))}?mode=ro", uri=True)
+    memory = snapshot.connect()
+    for label, conn in (("disk", disk), ("snapshot", memory)):
+        timings = []
+        for _ in range(args.repeat):
+            t = time.perf_counter()
+            conn.execute(args.query).fetchall()
+            timings.append((time.perf_counter() - t) * 1000)
+        timings.sort()
+        print(f"{label:>9}: 중앙값 {timings[len(timings) // 2]:.3f}ms, 최대 {timings[-1]:.3f}ms")
+    memory.close()
+    disk.close()
+    snapshot.close()
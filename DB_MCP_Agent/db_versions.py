@@ -0,0 +1,117 @@
+# db_versions.py
+# 데이터베이스 변경 감지와 MCP 리소스 구독 관리
+#  - 감시 전용 읽기 전용 연결에서 PRAGMA schema_version / data_version을 확인하여
+#    스키마 변경과 (다른 연결/프로세스의) 데이터 변경을 감지
+#  - 변경될 때마다 버전 태그가 바뀌므로, 클라이언트는 태그가 같은 동안 리소스 내용을 캐시할 수 있음
+#  - resources/subscribe로 구독한 세션에 notifications/resources/updated를 보냄
+#
+# 업데이트 훅(sqlite3 update hook)은 같은 연결에서 실행한 변경만 알려 주므로,
+# 읽기 전용 서버에서는 다른 연결의 커밋을 감지하는 data_version 확인 방식을 사용합니다.
+
+import os
+import sqlite3
+import sys
+import threading
+import uuid
+import weakref
+from urllib.parse import quote
+
+
+class VersionTracker:
+    """
+    데이터베이스 하나의 스키마/데이터 버전을 추적합니다.
+
+    tag는 "인스턴스.스키마버전.변경횟수" 형식의 불투명한 문자열입니다.
+    인스턴스 부분은 추적을 시작할 때마다 새로 정하므로, 데이터베이스를 다시 열거나
+    서버를 다시 시작하면 (변경이 없었더라도) 태그가 달라져 클라이언트가 한 번 다시 읽습니다.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._token = uuid.uuid4().hex[:8]
+        self._lock = threading.Lock()
+        uri = f"file:{quote(os.path.abspath(db_path))}?mode=ro"
+        self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        self.schema_version, self._state = self._read()
+        self.generation = 0
+
+    def _read(self) -> tuple[int, tuple[int, int]]:
+        schema_version = self._conn.execute("PRAGMA schema_version").fetchone()[0]
+        data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        try:
+            mtime = os.stat(self.db_path).st_mtime_ns
+        except OSError:
+            mtime = 0
+        return schema_version, (data_version, mtime)
+
+    def poll(self) -> str | None:
+        """버전을 확인하고 바뀌었으면 "schema" 또는 "data", 그대로면 None을 반환합니다."""
+        with self._lock:
+            schema_version, state = self._read()
+            if schema_version != self.schema_version:
+                change = "schema"
+            elif state != self._state:
+                change = "data"
+            else:
+                return None
+            self.schema_version, self._state = schema_version, state
+            self.generation += 1
+            return change
+
+    @property
+    def tag(self) -> str:
+        return f"{self._token}.{self.schema_version}.{self.generation}"
+
+    def current_tag(self) -> str:
+        """변경 여부를 확인한 뒤 최신 버전 태그를 반환합니다."""
+        self.poll()
+        return self.tag
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class ResourceSubscriptions:
+    """
+    MCP 세션별로 구독한 리소스 URI를 보관합니다.
+    세션 객체는 약한 참조로 보관하므로 연결이 끊긴 세션은 자동으로 빠집니다.
+    """
+
+    def __init__(self):
+        self._by_session: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def add(self, session, uri: str) -> None:
+        self._by_session.setdefault(session, set()).add(uri)
+
+    def remove(self, session, uri: str) -> None:
+        uris = self._by_session.get(session)
+        if uris is not None:
+            uris.discard(uri)
+            if not uris:
+                del self._by_session[session]
+
+    def __bool__(self) -> bool:
+        return any(self._by_session.values())
+
+    def count(self) -> int:
+        return sum(len(uris) for uris in self._by_session.values())
+
+    async def notify(self, matches) -> int:
+        """
+        matches(uri)가 참인 구독마다 resources/updated 알림을 보내고 보낸 수를 반환합니다.
+        보내기에 실패한 세션(이미 끊긴 연결)은 구독 목록에서 제거합니다.
+        """
+        sent = 0
+        for session, uris in list(self._by_session.items()):
+            for uri in sorted(uris):
+                if not matches(uri):
+                    continue
+                try:
+                    await session.send_resource_updated(uri)
+                    sent += 1
+                except Exception as e:
+                    print(f"리소스 변경 알림 실패 (구독 해제): {uri}: {e.__class__.__name__}", file=sys.stderr)
+                    self._by_session.pop(session, None)
+                    break
+        return sent
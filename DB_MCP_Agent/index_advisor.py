@@ -0,0 +1,189 @@
+# index_advisor.py
+# 느린 쿼리 로그를 바탕으로 인덱스를 제안하는 어드바이저
+#  - 실행 계획에서 전체 스캔/내부 루프 스캔/자동 인덱스가 나온 테이블을 대상으로
+#  - WHERE/ON 조건의 컬럼(등호 → 범위 순)과 함께 조회되는 컬럼으로 커버링 인덱스 후보를 만듦
+#  - 원본 DB의 임시 복사본에 인덱스를 만들어 실행 전/후 시간을 측정
+
+import os
+import re
+import sqlite3
+import statistics
+import tempfile
+import time
+from urllib.parse import quote
+
+from query_plan import analyze_plan, table_aliases
+from sql_engine import BudgetExceeded, QueryCancelled, QueryControl
+
+# alias.column 연산자 형태의 조건 (JOIN ON 조건도 포함)
+_PREDICATE_RE = re.compile(
+    r"(?:(\w+)\.)?(\w+)\s*(=|==|<=|>=|<|>|\bLIKE\b|\bIN\b|\bBETWEEN\b)",
+    re.IGNORECASE,
+)
+_QUALIFIED_RE = re.compile(r"\b(\w+)\.(\w+)\b")
+
+# 커버링 인덱스에 포함할 최대 컬럼 수 (너무 넓은 인덱스는 쓰기/저장 비용이 큼)
+MAX_INDEX_COLUMNS = 4
+
+
+def _table_columns(catalog, table: str) -> dict[str, str]:
+    info = catalog.get(table)
+    return {c["name"].lower(): c["name"] for c in info["columns"]} if info else {}
+
+
+def _predicate_columns(query: str, table: str, aliases: dict[str, str], catalog) -> tuple[list, list]:
+    """query에서 table에 대한 등호 조건 컬럼과 범위 조건 컬럼을 찾습니다."""
+    columns = _table_columns(catalog, table)
+    single_table = len({t.lower() for t in aliases.values()}) <= 1
+    equality, ranges = [], []
+    for alias, column, op in _PREDICATE_RE.findall(query):
+        if alias:
+            if aliases.get(alias.lower(), "").lower() != table.lower():
+                continue
+        elif not single_table:
+            continue  # 여러 테이블 쿼리에서 한정자 없는 컬럼은 소속을 알 수 없음
+        name = columns.get(column.lower())
+        if not name:
+            continue
+        target = equality if op in ("=", "==") or op.upper() == "IN" else ranges
+        if name not in equality and name not in ranges:
+            target.append(name)
+    return equality, ranges
+
+
+def _referenced_columns(query: str, table: str, aliases: dict[str, str], catalog) -> list[str]:
+    """alias.column 형태로 참조되는 table의 컬럼 (커버링 후보)"""
+    columns = _table_columns(catalog, table)
+    found = []
+    for alias, column in _QUALIFIED_RE.findall(query):
+        if aliases.get(alias.lower(), "").lower() == table.lower():
+            name = columns.get(column.lower())
+            if name and name not in found:
+                found.append(name)
+    return found
+
+
+def _already_indexed(catalog, table: str, columns: list[str]) -> bool:
+    """기존 인덱스(또는 정수 기본키)가 같은 선두 컬럼을 이미 갖고 있는지 확인합니다."""
+    info = catalog.get(table)
+    lead = columns[0].lower()
+    for col in info["columns"]:
+        if col["primary_key"] and col["name"].lower() == lead and (col["type"] or "").upper() == "INTEGER":
+            return True
+    for index in info["indexes"]:
+        if [c.lower() for c in index["columns"][: len(columns)]] == [c.lower() for c in columns]:
+            return True
+    return False
+
+
+def suggest_for_query(query: str, catalog, plan_rows: list[tuple]) -> list[dict]:
+    """쿼리 하나의 실행 계획을 보고 테이블별 인덱스 후보를 만듭니다."""
+    plan = analyze_plan(plan_rows, query, catalog)
+    aliases = table_aliases(query)
+    targets = []
+    for table in plan["full_scans"] + plan["missing_indexes"]:
+        if table not in targets and catalog.get(table):
+            targets.append(table)
+
+    suggestions = []
+    for table in targets:
+        equality, ranges = _predicate_columns(query, table, aliases, catalog)
+        # 등호 조건 컬럼 → 범위 조건 컬럼(하나만 유효) 순서
+        key_columns = equality + ranges[:1]
+        if not key_columns or _already_indexed(catalog, table, key_columns):
+            continue
+        covering = list(key_columns)
+        for col in _referenced_columns(query, table, aliases, catalog):
+            if col not in covering and len(covering) < MAX_INDEX_COLUMNS:
+                covering.append(col)
+        name = f"idx_{table}_{'_'.join(covering)}".lower()
+        cols_sql = ", ".join(f'"{c}"' for c in covering)
+        suggestions.append({
+            "table": table,
+            "columns": covering,
+            "index_name": name,
+            "sql": f'CREATE INDEX "{name}" ON "{table}" ({cols_sql})',
+            "reason": [w for w in plan["warnings"] if table in w],
+        })
+    return suggestions
+
+
+def _time_query(conn: sqlite3.Connection, query: str, repeat: int, timeout: float) -> float | None:
+    """query를 repeat번 실행한 중앙값(ms). 시간 예산을 넘거나 중단되면 None."""
+    timings = []
+    for _ in range(repeat):
+        control = QueryControl(timeout)
+        control.attach(conn)
+        try:
+            start = time.perf_counter()
+            conn.execute(query).fetchall()
+            timings.append((time.perf_counter() - start) * 1000)
+        except sqlite3.OperationalError as e:
+            if isinstance(control.translate(e), (BudgetExceeded, QueryCancelled)):
+                return None
+            raise
+        finally:
+            control.detach()
+    return round(statistics.median(timings), 3)
+
+
+def test_suggestions(
+    db_path: str,
+    suggestions: list[dict],
+    repeat: int = 3,
+    timeout: float = 10.0,
+) -> list[dict]:
+    """
+    원본 DB를 임시 파일로 복사(백업 API)한 뒤, 제안별로 인덱스를 만들어
+    관련 쿼리의 실행 전/후 시간을 측정합니다. 원본 DB는 변경하지 않습니다.
+    """
+    with tempfile.TemporaryDirectory(prefix="chinook_advisor_") as tmp:
+        scratch_path = os.path.join(tmp, "scratch.db")
+        src = sqlite3.connect(f"file:{quote(os.path.abspath(db_path))}?mode=ro", uri=True)
+        scratch = sqlite3.connect(scratch_path)
+        try:
+            src.backup(scratch)
+            for s in suggestions:
+                queries = s.get("queries", [])
+                before = {q: _time_query(scratch, q, repeat, timeout) for q in queries}
+                scratch.execute(s["sql"])
+                scratch.commit()
+                after = {q: _time_query(scratch, q, repeat, timeout) for q in queries}
+                s["timings"] = [
+                    {
+                        "query": q,
+                        "before_ms": before[q],
+                        "after_ms": after[q],
+                        "speedup": round(before[q] / after[q], 2) if before[q] and after[q] else None,
+                        "plan_after": [r[3] for r in scratch.execute(f"EXPLAIN QUERY PLAN {q}")],
+                    }
+                    for q in queries
+                ]
+                # 다음 제안은 이 인덱스 없이 독립적으로 평가
+                scratch.execute(f'DROP INDEX IF EXISTS "{s["index_name"]}"')
+                scratch.commit()
+        finally:
+            src.close()
+            scratch.close()
+    return suggestions
+
+
+def build_suggestions(slow_queries: list[dict], catalog, explain) -> list[dict]:
+    """
+    느린 쿼리 목록(QueryLog.slow_queries)에서 인덱스 후보를 모읍니다.
+    같은 인덱스가 여러 쿼리에서 나오면 하나로 합치고 관련 쿼리를 함께 기록합니다.
+    explain: 쿼리 → EXPLAIN QUERY PLAN 결과 행을 반환하는 함수
+    실행 계획을 얻지 못한 쿼리(오류, 시간 예산 초과, 취소)는 건너뜁니다.
+    """
+    merged: dict[str, dict] = {}
+    for slow in slow_queries:
+        query = slow["sample_query"]
+        try:
+            plan_rows = explain(query)
+        except (sqlite3.Error, BudgetExceeded, QueryCancelled):
+            continue
+        for s in suggest_for_query(query, catalog, plan_rows):
+            entry = merged.setdefault(s["sql"], {**s, "queries": [], "total_ms": 0.0})
+            entry["queries"].append(query)
+            entry["total_ms"] = round(entry["total_ms"] + slow["total_ms"], 3)
+    return sorted(merged.values(), key=lambda s: s["total_ms"], reverse=True)
@@ -0,0 +1,257 @@
+# mcp_session_pool.py
+# 클라이언트 쪽 MCP 세션 풀
+#  - MultiServerMCPClient.get_tools()가 만든 도구는 호출할 때마다 세션을 새로 엶
+#    (stdio 서버면 `python agent_server.py`, `npx @notionhq/notion-mcp-server` 프로세스를 매번 다시 실행)
+#  - 이 풀은 서버마다 초기화된 세션을 pool_size개 열어 두고 대화 루프 내내 재사용
+#    → 도구 호출 비용이 프로세스 실행 + initialize에서 IPC 왕복 한 번으로 줄어듦
+#  - 세션 하나로 여러 요청을 동시에 보낼 수 있으므로(요청 ID로 구분) 호출은 진행 중인 요청이 가장 적은 세션으로 보냄
+#    (pool_size > 1이면 stdio 서버 프로세스도 여러 개 → 요청을 순서대로 처리하는 서버에서도 동시 실행)
+#  - 상태 확인: health_interval초마다 유휴 세션에 ping을 보내고, 응답이 없거나 끊긴 세션은 닫고 다시 연결
+#  - 보내기 전에 끊긴 것이 확실한 요청(쓰기 스트림이 닫힘)만 새 세션으로 한 번 다시 보냄
+#    (응답을 기다리다 끊긴 도구 호출은 서버에서 이미 실행되었을 수 있으므로 다시 보내지 않음)
+#
+# 사용법:
+#   async with MCPSessionPool(client.connections, pool_size=2) as pool:
+#       tools = await pool.get_tools()
+
+import asyncio
+import os
+import sys
+from datetime import timedelta
+
+import anyio
+from langchain_mcp_adapters.sessions import create_session
+from langchain_mcp_adapters.tools import load_mcp_tools
+from mcp import types
+from mcp.shared.exceptions import McpError
+
+# 서버별 세션 수
+MCP_POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", "1"))
+# 유휴 세션 상태 확인 주기 (초, 0이면 확인하지 않음)
+MCP_HEALTH_INTERVAL = float(os.getenv("MCP_HEALTH_INTERVAL", "30"))
+# 세션 열기(프로세스 실행 + initialize)와 ping 응답 제한 시간 (초)
+MCP_CONNECT_TIMEOUT = float(os.getenv("MCP_CONNECT_TIMEOUT", "60"))
+MCP_PING_TIMEOUT = float(os.getenv("MCP_PING_TIMEOUT", "10"))
+
+# 요청을 보내지 못한 채 연결이 끊겼을 때 발생하는 예외 (다시 보내도 안전)
+_NOT_SENT = (anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream)
+
+
+def _connection_lost(error: BaseException) -> bool:
+    return isinstance(error, _NOT_SENT) or (
+        isinstance(error, McpError) and error.error.code == types.CONNECTION_CLOSED
+    )
+
+
+class _Session:
+    """
+    세션 하나. 세션 컨텍스트(stdio 프로세스, 스트림)는 anyio 취소 범위 때문에
+    연 작업에서 닫아야 하므로, 전용 작업이 열고 close()가 신호를 보낼 때까지 유지합니다.
+    """
+
+    def __init__(self, connection: dict):
+        self.connection = connection
+        self.session = None
+        self.in_flight = 0
+        self.healthy = False
+        self._stop: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    async def open(self) -> None:
+        ready = asyncio.get_running_loop().create_future()
+        self._stop = asyncio.Event()
+        self._task = asyncio.create_task(self._run(ready))
+        try:
+            await asyncio.wait_for(asyncio.shield(ready), MCP_CONNECT_TIMEOUT)
+        except BaseException:
+            await self.close()
+            raise
+        self.healthy = True
+
+    async def _run(self, ready: asyncio.Future) -> None:
+        try:
+            async with create_session(self.connection) as session:
+                await session.initialize()
+                self.session = session
+                ready.set_result(None)
+                await self._stop.wait()
+        except BaseException as e:
+            if not ready.done():
+                if isinstance(e, asyncio.CancelledError):
+                    ready.cancel()
+                else:
+                    ready.set_exception(e)
+            elif not isinstance(e, asyncio.CancelledError):
+                # 이미 쓰던 세션의 전송 계층이 닫히며 난 오류: 다음 호출/상태 확인에서 다시 연결
+                self.healthy = False
+        finally:
+            self.session = None
+            self.healthy = False
+
+    async def ping(self) -> bool:
+        try:
+            await self.session.send_request(
+                types.ClientRequest(types.PingRequest()),
+                types.EmptyResult,
+                request_read_timeout_seconds=timedelta(seconds=MCP_PING_TIMEOUT),
+            )
+            return True
+        except Exception:
+            return False
+
+    async def close(self) -> None:
+        self.healthy = False
+        if self._task is None:
+            return
+        self._stop.set()
+        try:
+            # 서버 프로세스 종료를 기다림 (응답이 없으면 작업을 취소)
+            await asyncio.wait_for(self._task, MCP_PING_TIMEOUT)
+        except Exception:
+            pass
+        self._task = None
+
+
+class ServerSessions:
+    """
+    서버 하나의 세션 풀. ClientSession처럼 list_tools/call_tool을 제공하므로
+    load_mcp_tools()에 세션 대신 넘기면 도구 호출이 이 풀을 거칩니다.
+    """
+
+    def __init__(self, name: str, connection: dict, pool_size: int = MCP_POOL_SIZE):
+        self.name = name
+        self.connection = connection
+        self.size = max(1, pool_size)
+        self.slots: list[_Session] = []
+        self.calls = 0
+        self.errors = 0
+        self.reconnects = 0
+        self._lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        self.slots = [_Session(self.connection) for _ in range(self.size)]
+        results = await asyncio.gather(*(slot.open() for slot in self.slots), return_exceptions=True)
+        failures = [r for r in results if isinstance(r, BaseException)]
+        if len(failures) == len(self.slots):
+            raise failures[0]
+        for failure in failures:
+            # 일부만 실패하면 나머지로 시작하고, 실패한 자리는 상태 확인에서 다시 연결
+            print(f"MCP 세션 열기 실패 ({self.name}): {failure!r}", file=sys.stderr)
+
+    async def _reconnect(self, slot: _Session) -> None:
+        async with self._lock:
+            if slot.healthy:
+                return   # 다른 호출이 이미 다시 연결함
+            await slot.close()
+            await slot.open()
+            self.reconnects += 1
+            print(f"MCP 세션 다시 연결: {self.name}", file=sys.stderr)
+
+    async def _pick(self) -> _Session:
+        healthy = [s for s in self.slots if s.healthy]
+        if healthy:
+            return min(healthy, key=lambda s: s.in_flight)
+        # 모든 세션이 끊김: 호출하는 쪽에서 바로 하나를 다시 연결 (실패하면 예외가 호출자에게 감)
+        slot = self.slots[0]
+        await self._reconnect(slot)
+        return slot
+
+    async def _request(self, method: str, *args, attempts: int | None = None):
+        # 보내지 못한 요청은 세션 수만큼 다른 세션으로, 모두 끊겼으면 다시 연결한 세션으로 한 번 더 보냄
+        attempts = self.size + 1 if attempts is None else attempts
+        slot = await self._pick()
+        slot.in_flight += 1
+        self.calls += 1
+        try:
+            return await getattr(slot.session, method)(*args)
+        except Exception as e:
+            if not _connection_lost(e):
+                self.errors += 1
+                raise
+            slot.healthy = False
+            if attempts > 1 and isinstance(e, _NOT_SENT):
+                return await self._request(method, *args, attempts=attempts - 1)
+            self.errors += 1
+            raise
+        finally:
+            slot.in_flight -= 1
+
+    async def list_tools(self, cursor: str | None = None) -> types.ListToolsResult:
+        return await self._request("list_tools", cursor)
+
+    async def call_tool(self, name: str, arguments: dict | None = None) -> types.CallToolResult:
+        return await self._request("call_tool", name, arguments)
+
+    async def check(self) -> None:
+        """끊긴 세션을 다시 연결하고, 유휴 세션은 ping으로 확인합니다."""
+        for slot in self.slots:
+            if slot.healthy and slot.in_flight == 0 and not await slot.ping():
+                slot.healthy = False
+            if not slot.healthy:
+                try:
+                    await self._reconnect(slot)
+                except Exception as e:
+                    print(f"MCP 세션 다시 연결 실패 ({self.name}): {e!r}", file=sys.stderr)
+
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self.slots),
+            "healthy": sum(s.healthy for s in self.slots),
+            "in_flight": sum(s.in_flight for s in self.slots),
+            "calls": self.calls,
+            "errors": self.errors,
+            "reconnects": self.reconnects,
+        }
+
+    async def close(self) -> None:
+        await asyncio.gather(*(slot.close() for slot in self.slots))
+
+
+class MCPSessionPool:
+    """
+    MultiServerMCPClient의 connections 설정으로 서버마다 세션 풀을 엽니다.
+    async with 블록 동안 세션을 유지하며, get_tools()가 반환한 도구는 이 풀의 세션으로 호출됩니다.
+    """
+
+    def __init__(self, connections: dict, pool_size: int = MCP_POOL_SIZE,
+                 health_interval: float = MCP_HEALTH_INTERVAL):
+        self.servers = {name: ServerSessions(name, conn, pool_size) for name, conn in connections.items()}
+        self.health_interval = health_interval
+        self._health_task: asyncio.Task | None = None
+
+    async def __aenter__(self) -> "MCPSessionPool":
+        try:
+            await asyncio.gather(*(server.start() for server in self.servers.values()))
+        except BaseException:
+            await self.aclose()
+            raise
+        if self.health_interval > 0:
+            self._health_task = asyncio.create_task(self._health_loop())
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval)
+            await asyncio.gather(*(server.check() for server in self.servers.values()))
+
+    async def get_tools(self, server_name: str | None = None) -> list:
+        """모든 서버(또는 server_name 서버)의 도구를 LangChain 도구로 반환합니다."""
+        names = [server_name] if server_name is not None else list(self.servers)
+        tool_lists = await asyncio.gather(*(load_mcp_tools(self.servers[name]) for name in names))
+        return [tool for tools in tool_lists for tool in tools]
+
+    def stats(self) -> dict:
+        return {name: server.stats() for name, server in self.servers.items()}
+
+    async def aclose(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+        await asyncio.gather(*(server.close() for server in self.servers.values()))
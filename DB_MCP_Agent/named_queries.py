@@ -0,0 +1,167 @@
+# named_queries.py
+# 이름이 붙은 매개변수 쿼리 라이브러리
+#  - 대시보드/반복 작업에서 자주 묻는 질문을 설정 파일(JSON)에 SQL로 미리 정의
+#  - 값은 문자열로 이어 붙이지 않고 :이름 자리표시자에 바인딩하므로 SQL이 항상 같은 문자열
+#    → 연결마다 sqlite3 문장 캐시에서 컴파일된 문장(prepared statement)을 재사용
+#  - 데이터베이스를 열 때 EXPLAIN으로 한 번 컴파일해 보고 스키마와 맞지 않는 쿼리는 표시
+#
+# 설정 파일 형식 (named_queries.json):
+# {
+#   "invoices_for_customer_year": {
+#     "description": "고객의 특정 연도 주문 목록",
+#     "sql": "SELECT ... WHERE CustomerId = :customer_id AND strftime('%Y', InvoiceDate) = :year",
+#     "params": {
+#       "customer_id": {"type": "integer", "description": "고객 ID"},
+#       "year": {"type": "string", "description": "연도 (YYYY)", "default": "2013"}
+#     }
+#   }
+# }
+#
+# 사용법: python named_queries.py named_queries.json Chinook.db [이름 '{"매개변수": 값}']
+
+import json
+import re
+import sqlite3
+
+# 매개변수 타입별 파이썬 변환 함수 (LLM이 숫자를 문자열로 넘겨도 받아들임)
+_BOOL_WORDS = {"true": 1, "false": 0, "1": 1, "0": 0, "yes": 1, "no": 0}
+
+
+def _to_integer(value):
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, float) and not value.is_integer():
+        raise ValueError("정수가 아닙니다")
+    return int(value)
+
+
+def _to_boolean(value):
+    if isinstance(value, str):
+        if value.strip().lower() not in _BOOL_WORDS:
+            raise ValueError("true/false가 아닙니다")
+        return _BOOL_WORDS[value.strip().lower()]
+    return int(bool(value))
+
+
+_CONVERTERS = {
+    "integer": _to_integer,
+    "number": float,
+    "string": str,
+    "boolean": _to_boolean,
+}
+
+# SQL의 :이름 자리표시자 (문자열 리터럴 안의 ':'는 제외하기 위해 리터럴을 먼저 지움)
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+_PARAM_RE = re.compile(r"(?<![:\w]):([A-Za-z_]\w*)")
+
+
+class NamedQuery:
+    """이름, 설명, SQL, 매개변수 정의(타입/설명/기본값)를 가진 쿼리 하나입니다."""
+
+    def __init__(self, name: str, sql: str, description: str = "", params: dict | None = None):
+        self.name = name
+        self.sql = sql.strip().rstrip(";")
+        self.description = description
+        self.params = params or {}
+
+        placeholders = set(_PARAM_RE.findall(_LITERAL_RE.sub("''", self.sql)))
+        declared = set(self.params)
+        if placeholders != declared:
+            raise ValueError(
+                f"{name}: SQL의 자리표시자({', '.join(sorted(placeholders)) or '없음'})와 "
+                f"params 정의({', '.join(sorted(declared)) or '없음'})가 다릅니다."
+            )
+        for param, spec in self.params.items():
+            if spec.get("type", "string") not in _CONVERTERS:
+                raise ValueError(f"{name}: 매개변수 {param}의 타입을 알 수 없습니다: {spec.get('type')}")
+
+    def bind(self, values: dict | None) -> dict:
+        """
+        호출 값을 정의된 타입으로 변환하고 기본값을 채워 바인딩용 dict를 반환합니다.
+        정의되지 않은 매개변수나 빠진 필수 매개변수가 있으면 ValueError.
+        """
+        values = dict(values or {})
+        unknown = set(values) - set(self.params)
+        if unknown:
+            raise ValueError(f"{self.name}: 알 수 없는 매개변수: {', '.join(sorted(unknown))}")
+        bound = {}
+        for param, spec in self.params.items():
+            if param in values and values[param] is not None:
+                try:
+                    bound[param] = _CONVERTERS[spec.get("type", "string")](values[param])
+                except (TypeError, ValueError) as e:
+                    raise ValueError(
+                        f"{self.name}: 매개변수 {param}은(는) {spec.get('type', 'string')} 타입이어야 합니다: "
+                        f"{values[param]!r} ({e})"
+                    ) from None
+            elif "default" in spec:
+                bound[param] = spec["default"]
+            else:
+                raise ValueError(f"{self.name}: 필수 매개변수가 없습니다: {param}")
+        return bound
+
+    def describe(self) -> dict:
+        return {
+            "name": self.name,
+            "description": self.description,
+            "params": {
+                param: {k: v for k, v in spec.items() if k in ("type", "description", "default")}
+                for param, spec in self.params.items()
+            },
+        }
+
+
+def load_named_queries(path: str | None) -> dict[str, NamedQuery]:
+    """설정 파일을 읽어 {이름: NamedQuery}를 반환합니다. 형식 오류가 있으면 ValueError."""
+    if not path:
+        return {}
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    return {
+        name: NamedQuery(name, spec["sql"], spec.get("description", ""), spec.get("params"))
+        for name, spec in config.items()
+    }
+
+
+def check_named_queries(conn: sqlite3.Connection, queries: dict[str, NamedQuery]) -> dict[str, str]:
+    """
+    각 쿼리를 EXPLAIN으로 컴파일해 보고(실행하지 않음) 실패한 쿼리의 {이름: 오류}를 반환합니다.
+    테이블/컬럼 이름이 데이터베이스 스키마와 맞지 않는 쿼리를 미리 찾아냅니다.
+    """
+    errors = {}
+    for name, query in queries.items():
+        try:
+            conn.execute(f"EXPLAIN {query.sql}", {p: None for p in query.params}).fetchall()
+        except sqlite3.Error as e:
+            errors[name] = str(e)
+    return errors
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="이름 붙은 쿼리 목록 확인/실행")
+    parser.add_argument("config")
+    parser.add_argument("db_path")
+    parser.add_argument("name", nargs="?", default=None)
+    parser.add_argument("params", nargs="?", default="{}", help='매개변수 JSON (예: \'{"customer_id": 5}\')')
+    args = parser.parse_args()
+
+    library = load_named_queries(args.config)
+    conn = sqlite3.connect(args.db_path)
+    problems = check_named_queries(conn, library)
+    if args.name is None:
+        for query_name, named in library.items():
+            status = f"오류: {problems[query_name]}" if query_name in problems else "ok"
+            print(f"  {query_name:<32} {status}")
+    else:
+        named = library[args.name]
+        bound_params = named.bind(json.loads(args.params))
+        for label in ("첫 실행", "재실행(캐시된 문장)"):
+            start = time.perf_counter()
+            result = conn.execute(named.sql, bound_params).fetchall()
+            print(f"{label}: {len(result)}행, {(time.perf_counter() - start) * 1000:.3f}ms")
+        for row in result[:10]:
+            print(f"  {row}")
+    conn.close()
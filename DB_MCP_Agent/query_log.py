@@ -0,0 +1,176 @@
+# query_log.py
+# execute_sql_query 호출 기록 (느린 쿼리 로그)
+#  - 정규화한 쿼리 텍스트, 실행 시간, 반환 행 수를 고정 크기 링 버퍼에 보관
+#  - 필요하면 별도 SQLite 파일에도 기록하여 서버 재시작 후에도 분석 가능
+#  - 실행 시간 예산을 넘어 중단된 쿼리도 (적어도 예산만큼 걸린 것으로) 느린 쿼리에 포함
+#    (문법/권한 오류처럼 실행되지 않은 쿼리는 제외)
+
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from sql_cache import normalize_sql
+from sql_engine import BudgetExceeded
+
+# 리터럴 값을 ?로 바꿔 "같은 모양"의 쿼리를 하나로 묶음
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+
+
+def fingerprint_sql(query: str) -> str:
+    """값만 다른 쿼리들이 같은 키를 갖도록 리터럴을 ?로 치환합니다."""
+    text = _STRING_RE.sub("?", normalize_sql(query))
+    return _NUMBER_RE.sub("?", text)
+
+
+class QueryLog:
+    """
+    최근 쿼리 실행 기록을 보관하는 링 버퍼입니다.
+    persist_path를 지정하면 같은 내용을 SQLite 파일(query_log 테이블)에도 추가합니다.
+    파일 쓰기는 전용 스레드 하나에서 모아서 하므로 record()는 쓰기를 기다리지 않습니다
+    (쓰는 동안 쌓인 기록은 다음 한 번의 트랜잭션으로 함께 씀).
+    """
+
+    def __init__(self, capacity: int = 1000, persist_path: str | None = None):
+        self.capacity = capacity
+        self._entries: deque = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._store = None
+        self._writer = None
+        self._pending: list[tuple] = []
+        self._flush_scheduled = False
+        if persist_path:
+            self._store = sqlite3.connect(persist_path, check_same_thread=False)
+            self._store.execute("PRAGMA journal_mode=WAL")
+            self._store.execute("PRAGMA synchronous=NORMAL")
+            self._store.execute(
+                "CREATE TABLE IF NOT EXISTS query_log ("
+                " ts REAL, fingerprint TEXT, query TEXT, duration_ms REAL,"
+                " rows INTEGER, cached INTEGER, error TEXT, database TEXT, budget_exceeded TEXT)"
+            )
+            # 데이터베이스/예산 초과 컬럼이 없던 이전 형식의 로그 파일이면 컬럼을 추가
+            columns = {row[1] for row in self._store.execute("PRAGMA table_info(query_log)")}
+            if "database" not in columns:
+                self._store.execute("ALTER TABLE query_log ADD COLUMN database TEXT")
+            if "budget_exceeded" not in columns:
+                self._store.execute("ALTER TABLE query_log ADD COLUMN budget_exceeded TEXT")
+            self._store.commit()
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="query-log")
+
+    def record(
+        self,
+        query: str,
+        duration_ms: float,
+        rows: int | None,
+        cached: bool = False,
+        error: str | Exception | None = None,
+        database: str | None = None,
+    ) -> None:
+        """
+        쿼리 실행 한 건을 기록합니다. error에 예외를 주면 메시지를 기록하고,
+        예산 초과(BudgetExceeded)이면 종류("time"/"rows")를 budget_exceeded에 남깁니다.
+        실행 시간 예산을 넘은 쿼리는 적어도 예산만큼 걸린 것으로 기록합니다.
+        """
+        budget = error.kind if isinstance(error, BudgetExceeded) else None
+        if budget == "time" and error.limit:
+            duration_ms = max(duration_ms, error.limit * 1000)
+        entry = {
+            "ts": time.time(),
+            "database": database,
+            "fingerprint": fingerprint_sql(query),
+            "query": normalize_sql(query),
+            "duration_ms": round(duration_ms, 3),
+            "rows": rows,
+            "cached": cached,
+            "error": str(error) if error is not None else None,
+            "budget_exceeded": budget,
+        }
+        with self._lock:
+            self._entries.append(entry)
+            if self._writer is None:
+                return
+            self._pending.append(
+                (entry["ts"], entry["fingerprint"], entry["query"], entry["duration_ms"],
+                 rows, int(cached), entry["error"], database, budget)
+            )
+            if self._flush_scheduled:
+                return   # 이미 예약된 쓰기가 이 기록도 함께 씀
+            self._flush_scheduled = True
+        self._writer.submit(self._flush)
+
+    def _flush(self) -> None:
+        """쌓인 기록을 한 트랜잭션으로 파일에 씁니다 (쓰기 스레드에서 실행)."""
+        with self._lock:
+            batch, self._pending = self._pending, []
+            self._flush_scheduled = False
+            store = self._store
+        if not batch or store is None:
+            return
+        try:
+            with store:
+                store.executemany(
+                    "INSERT INTO query_log"
+                    " (ts, fingerprint, query, duration_ms, rows, cached, error, database, budget_exceeded)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    batch,
+                )
+        except sqlite3.Error as e:
+            print(f"쿼리 기록 저장 실패 ({len(batch)}건): {e}", file=sys.stderr)
+
+    def entries(self) -> list[dict]:
+        with self._lock:
+            return list(self._entries)
+
+    def slow_queries(self, limit: int = 10, min_ms: float = 0.0, database: str | None = None) -> list[dict]:
+        """
+        캐시 적중을 제외한 기록을 (데이터베이스, fingerprint)별로 묶어 총 실행 시간이 큰 순서로 반환합니다.
+        예산을 넘어 중단된 쿼리(timeouts에 횟수)는 포함하고, 그 밖의 오류(문법/권한 등)는 제외합니다.
+        database를 지정하면 해당 데이터베이스의 기록만 봅니다.
+        """
+        groups: dict[tuple, dict] = {}
+        for e in self.entries():
+            if e["cached"] or (e["error"] and not e["budget_exceeded"]):
+                continue
+            if database is not None and e["database"] != database:
+                continue
+            g = groups.setdefault((e["database"], e["fingerprint"]), {
+                "database": e["database"],
+                "fingerprint": e["fingerprint"],
+                "sample_query": e["query"],
+                "calls": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "rows": e["rows"],
+                "timeouts": 0,
+            })
+            g["calls"] += 1
+            if e["budget_exceeded"] == "time":
+                g["timeouts"] += 1
+            g["total_ms"] += e["duration_ms"]
+            if e["duration_ms"] >= g["max_ms"]:
+                g["max_ms"] = e["duration_ms"]
+                g["sample_query"] = e["query"]
+        result = []
+        for g in groups.values():
+            g["avg_ms"] = round(g["total_ms"] / g["calls"], 3)
+            g["total_ms"] = round(g["total_ms"], 3)
+            if g["avg_ms"] >= min_ms:
+                result.append(g)
+        result.sort(key=lambda g: g["total_ms"], reverse=True)
+        return result[:limit]
+
+    def close(self) -> None:
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            # 남은 기록을 쓰고 쓰기 스레드를 끝낸 뒤 파일을 닫음 (이후 기록은 메모리에만)
+            writer.submit(self._flush)
+            writer.shutdown(wait=True)
+        with self._lock:
+            if self._store is not None:
+                self._store.close()
+                self._store = None
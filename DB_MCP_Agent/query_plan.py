@@ -0,0 +1,205 @@
+# query_plan.py
+# EXPLAIN QUERY PLAN 결과를 구조화하여 분석
+#  - 전체 테이블 스캔(SCAN), 임시 B-트리(USE TEMP B-TREE), 인덱스 미사용 조인을 표시
+#  - sqlite_stat1(없으면 카탈로그의 행 수)로 단계별 예상 행 수와 전체 비용을 추정
+#  - 예상 비용이 한도를 넘는 쿼리는 실행 전에 거부할 수 있음
+
+import math
+import re
+
+# FROM / JOIN / 쉼표 뒤의 "테이블 [AS] 별칭"을 찾아 별칭 → 테이블 매핑을 만듦
+_TABLE_REF_RE = re.compile(
+    r"(?:\bFROM|\bJOIN|,)\s+(\"[^\"]+\"|\[[^\]]+\]|`[^`]+`|\w+)(?:\s+(?:AS\s+)?(\w+))?",
+    re.IGNORECASE,
+)
+_NOT_ALIAS = {
+    "on", "where", "join", "inner", "left", "right", "cross", "natural", "full", "outer",
+    "group", "order", "limit", "using", "union", "except", "intersect", "from", "as",
+    "having", "window", "select", "indexed", "not",
+}
+
+# 인덱스가 없을 때 등호 조건 하나로 걸러지는 행 수 (SQLite 기본 가정과 같은 10)
+_DEFAULT_ROWS_PER_KEY = 10
+# SEARCH 단계의 조건 괄호 (외부 조인의 안쪽 테이블이면 뒤에 " LEFT-JOIN" 등이 붙음)
+_CONSTRAINTS_RE = re.compile(r"\((.*)\)(?:\s+(?:LEFT|RIGHT|FULL)-JOIN)?\s*$")
+
+
+class QueryCostExceeded(Exception):
+    """예상 비용이 한도를 넘어 쿼리 실행을 거부했을 때 발생합니다."""
+
+    def __init__(self, plan: dict, limit: int):
+        self.plan = plan
+        self.limit = limit
+        super().__init__(
+            f"쿼리 비용 초과: 예상 비용 {plan['estimated_cost']:,}이(가) 한도 {limit:,}을(를) 넘어 실행하지 않았습니다. "
+            "아래 실행 계획의 경고를 참고하여 조건/인덱스 컬럼을 활용하도록 쿼리를 다시 작성하세요."
+        )
+
+
+def plan_summary(plan: dict) -> dict:
+    """에이전트에게 돌려줄 요약본 (단계별 detail, 경고, 추정치만 포함)"""
+    return {
+        "estimated_cost": plan["estimated_cost"],
+        "estimated_rows": plan["estimated_rows"],
+        "plan": [step["detail"] for step in plan["steps"]],
+        "warnings": plan["warnings"],
+    }
+
+
+def _unquote(name: str) -> str:
+    return name.strip('"[]`')
+
+
+def table_aliases(query: str) -> dict[str, str]:
+    """쿼리 텍스트에서 별칭(소문자) → 테이블 이름 매핑을 추출합니다."""
+    aliases = {}
+    for table, alias in _TABLE_REF_RE.findall(query):
+        table = _unquote(table)
+        aliases.setdefault(table.lower(), table)
+        if alias and alias.lower() not in _NOT_ALIAS:
+            aliases[alias.lower()] = table
+    return aliases
+
+
+def _parse_step(detail: str) -> dict:
+    """EXPLAIN QUERY PLAN의 detail 문자열 하나를 구조화합니다."""
+    step = {"operation": "OTHER", "name": None, "index": None, "covering": False,
+            "automatic_index": False, "constraints": None}
+
+    if detail.startswith("USE TEMP B-TREE"):
+        step["operation"] = "TEMP_BTREE"
+        step["purpose"] = detail.replace("USE TEMP B-TREE FOR ", "")
+        return step
+    if detail == "SCAN CONSTANT ROW":
+        step["operation"] = "CONSTANT"
+        return step
+    if detail.startswith("CORRELATED "):
+        # 바깥 행마다 다시 실행되는 서브쿼리 (CORRELATED SCALAR/LIST SUBQUERY)
+        step["operation"] = "CORRELATED"
+        return step
+
+    m = re.match(r"^(SCAN|SEARCH) (\S+)(.*)$", detail)
+    if not m:
+        return step
+    step["operation"], step["name"], rest = m.group(1), m.group(2), m.group(3)
+    if "USING" in rest:
+        step["covering"] = "COVERING INDEX" in rest
+        step["automatic_index"] = "AUTOMATIC" in rest
+        if "PRIMARY KEY" in rest:
+            step["index"] = "PRIMARY KEY"
+        else:
+            idx = re.search(r"INDEX (\S+)", rest)
+            if idx and not idx.group(1).startswith("("):
+                step["index"] = idx.group(1)
+    constraints = _CONSTRAINTS_RE.search(rest)
+    if constraints:
+        step["constraints"] = constraints.group(1)
+    return step
+
+
+def _stat_table_rows(index_stats: dict, table: str) -> int | None:
+    """sqlite_stat1의 첫 번째 값(테이블 전체 행 수)을 반환합니다."""
+    for (tbl, _), stats in index_stats.items():
+        if tbl == table:
+            return stats[0]
+    return None
+
+
+def _search_rows(step: dict, table: str, table_rows: int, index_stats: dict) -> int:
+    """SEARCH 단계 한 번에 읽는 예상 행 수"""
+    constraints = step["constraints"] or ""
+    if step["index"] == "PRIMARY KEY" and "=" in constraints and ">" not in constraints and "<" not in constraints:
+        return 1
+    equalities = constraints.count("=") - constraints.count(">=") - constraints.count("<=")
+    stats = index_stats.get((table, step["index"]))
+    if stats and len(stats) > 1 and equalities > 0:
+        # 등호 조건 수에 해당하는 "키당 평균 행 수"
+        return max(1, stats[min(equalities, len(stats) - 1)])
+    if equalities > 0:
+        return max(1, min(table_rows, _DEFAULT_ROWS_PER_KEY))
+    # 범위 조건만 있는 경우 전체의 1/4로 가정
+    return max(1, table_rows // 4)
+
+
+def analyze_plan(plan_rows: list[tuple], query: str, catalog) -> dict:
+    """
+    EXPLAIN QUERY PLAN 결과 행(id, parent, notused, detail)을 분석합니다.
+    같은 parent 아래의 SCAN/SEARCH 단계는 중첩 루프로 보고 예상 행 수를 곱해 비용을 추정합니다.
+    상관 서브쿼리 아래 단계의 비용은 그 서브쿼리가 실행되는 횟수(바깥 루프의 예상 행 수)를 곱해 더합니다.
+    """
+    aliases = table_aliases(query)
+    index_stats = catalog.index_stats if catalog is not None else {}
+
+    steps, warnings = [], []
+    full_scans, temp_btrees, missing_indexes = [], [], []
+    loops: dict[int, int] = {}        # parent → 누적 루프 행 수
+    loop_depth: dict[int, int] = {}   # parent → 지금까지 나온 SCAN/SEARCH 단계 수
+    repeats: dict[int, int] = {}      # 상관 서브쿼리 id → 예상 실행 횟수
+
+    for node_id, parent, _, detail in plan_rows:
+        step = {"id": node_id, "parent": parent, "detail": detail, **_parse_step(detail)}
+        op = step["operation"]
+
+        if op in ("SCAN", "SEARCH"):
+            name = step["name"]
+            table = aliases.get(name.lower(), name)
+            info = catalog.get(table) if catalog is not None else None
+            step["table"] = info["name"] if info else table
+            table_rows = _stat_table_rows(index_stats, step["table"])
+            if table_rows is None and info:
+                table_rows = info["row_count"]
+
+            if op == "SCAN":
+                rows = table_rows if table_rows is not None else 1
+                # 커버링 인덱스 스캔도 모든 행을 읽지만 테이블보다 가벼움
+                step["full_scan"] = step["index"] is None and info is not None
+                if step["full_scan"]:
+                    full_scans.append(step["table"])
+                    warnings.append(f"전체 테이블 스캔: {step['table']} ({rows:,}행)")
+                if loop_depth.get(parent, 0) > 0 and info is not None:
+                    missing_indexes.append(step["table"])
+                    warnings.append(
+                        f"조인 내부 루프에서 {step['table']}을(를) 매번 전체 스캔합니다. "
+                        "조인 조건이 빠졌거나 조인 컬럼에 인덱스가 필요합니다."
+                    )
+            else:
+                rows = _search_rows(step, step["table"], table_rows or 1, index_stats)
+                step["full_scan"] = False
+                if step["automatic_index"]:
+                    missing_indexes.append(step["table"])
+                    warnings.append(
+                        f"{step['table']}에 자동 임시 인덱스를 만듭니다 ({step['constraints']}). "
+                        "해당 컬럼에 인덱스가 없습니다."
+                    )
+
+            step["estimated_rows"] = rows
+            loops[parent] = loops.get(parent, 1) * max(rows, 1)
+            loop_depth[parent] = loop_depth.get(parent, 0) + 1
+
+        elif op == "CORRELATED":
+            # 여기까지 바깥 루프(및 그 바깥 상관 서브쿼리)가 만든 행마다 한 번씩 실행
+            repeats[node_id] = loops.get(parent, 1) * repeats.get(parent, 1)
+
+        elif op == "TEMP_BTREE":
+            temp_btrees.append(step["purpose"])
+            warnings.append(f"임시 B-트리 사용: {step['purpose']} (정렬/그룹화를 위한 추가 작업)")
+
+        steps.append(step)
+
+    # 각 루프 그룹의 비용을 합하고, 임시 B-트리는 n log n 정렬 비용을 더함
+    estimated_rows = loops.get(0, 1)
+    estimated_cost = sum(rows * repeats.get(parent, 1) for parent, rows in loops.items()) if loops else 1
+    if temp_btrees:
+        n = max(estimated_rows, 2)
+        estimated_cost += int(len(temp_btrees) * n * math.log2(n))
+
+    return {
+        "steps": steps,
+        "full_scans": full_scans,
+        "temp_btrees": temp_btrees,
+        "missing_indexes": sorted(set(missing_indexes)),
+        "estimated_rows": int(estimated_rows),
+        "estimated_cost": int(estimated_cost),
+        "stats_source": "sqlite_stat1" if index_stats else "row_counts",
+        "warnings": warnings,
+    }
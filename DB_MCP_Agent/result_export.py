@@ -0,0 +1,354 @@
+# result_export.py
+# 큰 쿼리 결과를 Arrow/Parquet 파일로 내보내기
+#  - 결과를 텍스트로 만들지 않고 fetchmany로 읽은 행을 Arrow RecordBatch로 바꿔 바로 파일에 씀
+#    (전체 결과를 메모리에 올리지 않음)
+#  - parquet: 압축(zstd)된 컬럼 파일, arrow: 압축하지 않은 Arrow IPC 파일 (memory-map으로 복사 없이 읽기)
+#  - 파일은 스풀 디렉터리에 export_id 이름으로 저장되고, 보관 시간이 지나면 삭제
+#  - 내보내기는 오래 걸릴 수 있으므로 스풀의 작은 전용 스레드 풀(workers개)에서 실행
+#    → 동시에 실행되는 내보내기 수를 제한하고, 쿼리 엔진의 스레드를 차지하지 않음
+#  - pyarrow는 내보내기를 실행할 때만 불러옴 (서버 시작 시간에 영향 없음)
+#
+# 사용법: python result_export.py Chinook.db "SELECT * FROM Track" [--format parquet] [--dir /tmp/exports]
+
+import asyncio
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import quote
+
+from sql_engine import BudgetExceeded, QueryControl
+
+EXPORT_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+# 한 번에 읽어 Arrow 배치 하나로 만드는 행 수 (Parquet에서는 row group 하나)
+BATCH_ROWS = 65536
+# 컬럼 타입을 정하기 위해 최대 몇 행까지 미리 읽어 둘지 (앞부분이 모두 NULL인 컬럼 대비)
+INFER_ROWS = 4 * BATCH_ROWS
+
+_FILE_RE = re.compile(r"^([0-9a-f]{12})\.(parquet|arrow)$")
+
+
+# --------------------------------------------------------
+# 파이썬 값 → Arrow 배치
+# --------------------------------------------------------
+def _infer_type(pa, values: list):
+    """SQLite 값 목록에서 Arrow 타입을 정합니다. 값이 모두 NULL이면 None."""
+    kinds = {type(v) for v in values if v is not None}
+    if not kinds:
+        return None
+    if kinds <= {int}:
+        return pa.int64()
+    if kinds <= {int, float}:
+        return pa.float64()
+    if kinds <= {bytes}:
+        return pa.binary()
+    # 문자열이거나 타입이 섞여 있으면 문자열로 저장
+    return pa.string()
+
+
+# 숫자/바이너리 컬럼에 넣을 수 있는 파이썬 타입 (pyarrow는 실수를 정수 컬럼에 넣으면 조용히 잘라냄)
+_ALLOWED = {"int64": (int,), "double": (int, float), "binary": (bytes,)}
+
+
+def _to_array(pa, name: str, values: list, arrow_type):
+    if arrow_type == pa.string():
+        values = [v if v is None or isinstance(v, str) else str(v) for v in values]
+    else:
+        allowed = _ALLOWED[str(arrow_type)]
+        bad = next((v for v in values if v is not None and not isinstance(v, allowed)), None)
+        if bad is not None:
+            raise ValueError(
+                f"컬럼 {name}의 값 {bad!r}의 타입이 앞부분({arrow_type})과 다릅니다. "
+                f"쿼리에서 CAST({name} AS REAL) 또는 CAST({name} AS TEXT)로 타입을 맞춰 주세요."
+            )
+    return pa.array(values, type=arrow_type)
+
+
+def _to_batch(pa, schema, rows: list[tuple]):
+    columns = list(zip(*rows)) if rows else [[] for _ in schema]
+    arrays = [_to_array(pa, field.name, list(col), field.type) for field, col in zip(schema, columns)]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class _ColumnStats:
+    """배치를 쓸 때마다 컬럼별 NULL 수와 최솟값/최댓값을 누적합니다."""
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.nulls = [0] * len(schema)
+        self.mins = [None] * len(schema)
+        self.maxs = [None] * len(schema)
+
+    def add(self, pa, pc, batch) -> None:
+        for i, (field, array) in enumerate(zip(self.schema, batch.columns)):
+            self.nulls[i] += array.null_count
+            if not (pa.types.is_integer(field.type) or pa.types.is_floating(field.type)):
+                continue
+            if array.null_count == len(array):
+                continue
+            result = pc.min_max(array)
+            low, high = result["min"].as_py(), result["max"].as_py()
+            self.mins[i] = low if self.mins[i] is None else min(self.mins[i], low)
+            self.maxs[i] = high if self.maxs[i] is None else max(self.maxs[i], high)
+
+    def summary(self) -> list[dict]:
+        columns = []
+        for i, field in enumerate(self.schema):
+            item = {"name": field.name, "type": str(field.type), "null_count": self.nulls[i]}
+            if self.mins[i] is not None:
+                item["min"] = self.mins[i]
+                item["max"] = self.maxs[i]
+            columns.append(item)
+        return columns
+
+
+# --------------------------------------------------------
+# 내보내기
+# --------------------------------------------------------
+def _connect(db_path: str) -> sqlite3.Connection:
+    uri = f"file:{quote(os.path.abspath(db_path))}?mode=ro"
+    return sqlite3.connect(uri, uri=True, check_same_thread=False)
+
+
+def write_export(
+    db_path: str,
+    query: str,
+    path: str,
+    fmt: str = "parquet",
+    control: QueryControl | None = None,
+    max_rows: int | None = None,
+    batch_rows: int = BATCH_ROWS,
+    connect=None,
+) -> dict:
+    """
+    쿼리 결과를 path에 fmt 형식으로 씁니다 (동기). 쓰는 동안에는 임시 파일을 쓰고 끝나면 이름을 바꿉니다.
+    연결 풀을 오래 점유하지 않도록 전용 읽기 전용 연결(connect가 있으면 connect()로 연 연결)을 사용하며,
+    control의 시간 예산/취소와 max_rows 한도를 넘으면 쓰던 파일을 지우고 예외를 발생시킵니다.
+    행 수, 배치 수, 파일 크기, 컬럼별 타입/NULL 수/최솟값/최댓값을 반환합니다.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"지원하지 않는 내보내기 형식입니다: {fmt} (사용 가능: {', '.join(EXPORT_FORMATS)})")
+    control = control or QueryControl()
+    start = time.perf_counter()
+    tmp_path = path + ".part"
+    conn = connect() if connect is not None else _connect(db_path)
+    writer = sink = None
+    try:
+        control.attach(conn)
+        try:
+            cursor = conn.execute(query)
+            names = [d[0] for d in cursor.description or ()]
+            if not names:
+                raise ValueError("결과 컬럼이 없는 문장은 내보낼 수 없습니다.")
+
+            # 모든 컬럼의 타입이 정해질 때까지(최대 INFER_ROWS행) 앞부분을 모아 둠
+            pending: list[list[tuple]] = []
+            types = [None] * len(names)
+            buffered = 0
+            while buffered < INFER_ROWS and any(t is None for t in types):
+                rows = cursor.fetchmany(batch_rows)
+                if not rows:
+                    break
+                pending.append(rows)
+                buffered += len(rows)
+                for i, col in enumerate(zip(*rows)):
+                    if types[i] is None:
+                        types[i] = _infer_type(pa, list(col))
+            # 끝까지 값이 없는 컬럼은 문자열로 저장
+            schema = pa.schema([pa.field(n, t or pa.string()) for n, t in zip(names, types)])
+
+            if fmt == "parquet":
+                import pyarrow.parquet as pq
+                writer = pq.ParquetWriter(tmp_path, schema, compression="zstd")
+            else:
+                sink = pa.OSFile(tmp_path, "wb")
+                writer = pa.ipc.new_file(sink, schema)
+
+            stats = _ColumnStats(schema)
+            total = batches = 0
+            while True:
+                rows = pending.pop(0) if pending else cursor.fetchmany(batch_rows)
+                if not rows:
+                    break
+                total += len(rows)
+                if max_rows is not None and total > max_rows:
+                    raise BudgetExceeded("rows", max_rows)
+                batch = _to_batch(pa, schema, rows)
+                writer.write_batch(batch)
+                stats.add(pa, pc, batch)
+                batches += 1
+            cursor.close()
+        except sqlite3.OperationalError as e:
+            translated = control.translate(e)
+            if translated is e:
+                raise
+            raise translated from e
+        finally:
+            control.detach()
+
+        writer.close()
+        writer = None
+        if sink is not None:
+            sink.close()
+            sink = None
+        os.replace(tmp_path, path)
+    except BaseException:
+        if writer is not None:
+            try:
+                writer.close()
+            except Exception:
+                pass
+        if sink is not None:
+            sink.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        conn.close()
+
+    return {
+        "format": fmt,
+        "path": path,
+        "rows": total,
+        "batches": batches,
+        "bytes": os.path.getsize(path),
+        "columns": stats.summary(),
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+def open_export(path: str):
+    """
+    내보낸 파일을 pyarrow.Table로 엽니다.
+    Arrow IPC 파일은 memory-map으로 열어 데이터를 복사하지 않고, Parquet은 memory-map으로 읽습니다.
+    """
+    import pyarrow as pa
+
+    if path.endswith(".arrow"):
+        return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    import pyarrow.parquet as pq
+    return pq.read_table(path, memory_map=True)
+
+
+# --------------------------------------------------------
+# 스풀 디렉터리
+# --------------------------------------------------------
+class ExportSpool:
+    """
+    내보낸 파일을 보관하는 디렉터리입니다.
+    파일 이름은 export_id + 확장자이며, ttl(초)이 지난 파일은 reap()에서 삭제합니다.
+    이 형식의 파일 이름만 다루므로 다른 파일이 있는 디렉터리를 지정해도 안전합니다.
+    내보내기는 run()으로 전용 스레드 풀(workers개)에서 실행하며, 넘치는 요청은 빈 스레드를 기다립니다.
+    """
+
+    def __init__(self, directory: str, ttl: float = 3600.0, workers: int = 2):
+        self.directory = os.path.abspath(directory)
+        self.ttl = ttl
+        self._exports: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="export")
+        os.makedirs(self.directory, exist_ok=True)
+
+    async def run(self, fn, *args, **kwargs):
+        """내보내기 함수를 전용 스레드 풀에서 실행합니다."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+
+    def close(self) -> None:
+        """스레드 풀을 닫습니다 (기다리는 내보내기는 취소, 내보낸 파일은 남겨 둠)."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def new_path(self, fmt: str) -> tuple[str, str]:
+        """새 export_id와 파일 경로를 만듭니다."""
+        export_id = uuid.uuid4().hex[:12]
+        return export_id, os.path.join(self.directory, export_id + EXPORT_FORMATS[fmt])
+
+    def add(self, export_id: str, summary: dict) -> dict:
+        summary = {"export_id": export_id, **summary, "created_at": time.time()}
+        with self._lock:
+            self._exports[export_id] = summary
+        return summary
+
+    def _files(self) -> dict[str, str]:
+        found = {}
+        for entry in os.scandir(self.directory):
+            match = _FILE_RE.match(entry.name)
+            if match and entry.is_file():
+                found[match.group(1)] = entry.path
+        return found
+
+    def get(self, export_id: str) -> dict | None:
+        """내보내기 요약을 반환합니다. 서버를 다시 시작해 요약이 없으면 파일 정보만 반환합니다."""
+        with self._lock:
+            summary = self._exports.get(export_id)
+        if summary is not None:
+            return summary if os.path.exists(summary["path"]) else None
+        path = self._files().get(export_id)
+        if path is None:
+            return None
+        ext = os.path.splitext(path)[1]
+        fmt = next(f for f, e in EXPORT_FORMATS.items() if e == ext)
+        return {"export_id": export_id, "format": fmt, "path": path, "bytes": os.path.getsize(path),
+                "created_at": os.path.getmtime(path)}
+
+    def remove(self, export_id: str) -> bool:
+        with self._lock:
+            self._exports.pop(export_id, None)
+        path = self._files().get(export_id)
+        if path is None:
+            return False
+        os.remove(path)
+        return True
+
+    def reap(self) -> int:
+        """보관 시간이 지난 파일을 지우고 지운 개수를 반환합니다."""
+        deadline = time.time() - self.ttl
+        removed = 0
+        for export_id, path in self._files().items():
+            try:
+                if os.path.getmtime(path) < deadline:
+                    os.remove(path)
+                    removed += 1
+                    with self._lock:
+                        self._exports.pop(export_id, None)
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def stats(self) -> dict:
+        files = self._files()
+        return {
+            "directory": self.directory,
+            "files": len(files),
+            "bytes": sum(os.path.getsize(p) for p in files.values()),
+            "ttl_seconds": self.ttl,
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+
+    parser = argparse.ArgumentParser(description="쿼리 결과를 Parquet/Arrow 파일로 내보내기")
+    parser.add_argument("db_path")
+    parser.add_argument("query")
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="parquet")
+    parser.add_argument("--dir", default=os.path.join(tempfile.gettempdir(), "chinook_exports"))
+    args = parser.parse_args()
+
+    spool = ExportSpool(args.dir)
+    new_id, new_path = spool.new_path(args.format)
+    result = write_export(args.db_path, args.query, new_path, args.format)
+    for key, value in result.items():
+        print(f"{key:>10}: {value}")
+    start_open = time.perf_counter()
+    table = open_export(new_path)
+    print(f"다시 열기: {table.num_rows}행, {(time.perf_counter() - start_open) * 1000:.2f}ms")
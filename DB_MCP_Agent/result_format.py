@@ -0,0 +1,162 @@
+# result_format.py
+# SQL 결과를 모델에 전달하기 위한 간결한 텍스트 인코딩
+#  - tsv: 컬럼 헤더 한 줄 + 탭으로 구분한 행 (기본값, 가장 짧음)
+#  - json: {"columns": [...], "rows": [[...], ...]} (컬럼 이름을 행마다 반복하지 않음)
+#  - markdown: 표 형식 (사람이 읽기 좋음)
+#  - repr: 예전 출력과 같은 파이썬 튜플 목록
+#  - 결과 행은 이미 메모리에 있고 응답도 문자열 하나이므로 스트리밍하지 않음.
+#    다만 행마다 토큰 수를 세어 예산을 넘는 행부터는 직렬화하지 않음 (큰 결과의 인코딩 비용을 한도만큼으로 제한)
+#
+# 사용법: python result_format.py Chinook.db "SELECT * FROM Track" [--format tsv] [--max-tokens 2000]
+
+import json
+import os
+import sys
+
+FORMATS = ("tsv", "json", "markdown", "repr")
+
+# 토큰 수를 셀 tiktoken 인코딩 이름
+TOKEN_ENCODING = os.getenv("CHINOOK_TOKEN_ENCODING", "cl100k_base")
+# 생략 안내 문구를 위해 남겨 두는 토큰 수
+_NOTE_RESERVE = 80
+
+_counter = None
+
+
+def _estimate_tokens(text: str) -> int:
+    """tiktoken을 쓸 수 없을 때의 근사치 (영문/숫자 약 4글자당 1토큰, 그 외 문자는 글자당 1토큰)"""
+    ascii_chars = sum(1 for c in text if c < "\x80")
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def token_counter():
+    """
+    문자열 → 토큰 수 함수를 반환합니다 (처음 호출할 때 한 번만 준비).
+    tiktoken이 없거나 인코딩 파일을 받을 수 없으면(오프라인) 근사치로 셉니다.
+    """
+    global _counter
+    if _counter is None:
+        try:
+            import tiktoken
+            encoding = tiktoken.get_encoding(TOKEN_ENCODING)
+            _counter = lambda text: len(encoding.encode_ordinary(text))
+        except Exception as e:
+            print(f"tiktoken을 사용할 수 없어 토큰 수를 근사치로 계산합니다: {e.__class__.__name__}", file=sys.stderr)
+            _counter = _estimate_tokens
+    return _counter
+
+
+# --------------------------------------------------------
+# 값 / 행 인코딩
+# --------------------------------------------------------
+def _text(value) -> str:
+    if value is None:
+        return "NULL"
+    if isinstance(value, bytes):
+        return f"<blob {len(value)} bytes>"
+    return str(value)
+
+
+def _json_value(value):
+    if isinstance(value, bytes):
+        return f"<blob {len(value)} bytes>"
+    return value
+
+
+def _tsv_cell(value) -> str:
+    return _text(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def _md_cell(value) -> str:
+    return _text(value).replace("|", "\\|").replace("\r", "").replace("\n", "<br>")
+
+
+def _header(fmt: str, columns: list[str]) -> str:
+    if fmt == "tsv":
+        return "\t".join(_tsv_cell(c) for c in columns) + "\n"
+    if fmt == "markdown":
+        return "| " + " | ".join(_md_cell(c) for c in columns) + " |\n|" + "---|" * len(columns) + "\n"
+    if fmt == "json":
+        return '{"columns":' + json.dumps(columns, ensure_ascii=False, separators=(",", ":")) + ',"rows":['
+    return "["
+
+
+def _row(fmt: str, row: tuple, first: bool) -> str:
+    if fmt == "tsv":
+        return "\t".join(_tsv_cell(v) for v in row) + "\n"
+    if fmt == "markdown":
+        return "| " + " | ".join(_md_cell(v) for v in row) + " |\n"
+    if fmt == "json":
+        values = [_json_value(v) for v in row]
+        return ("" if first else ",") + json.dumps(values, ensure_ascii=False, separators=(",", ":"))
+    return ("" if first else ", ") + repr(row)
+
+
+def _footer(fmt: str, shown: int, total: int, max_tokens: int | None) -> str:
+    omitted = total - shown
+    if fmt == "json":
+        tail = f',"truncated":true,"omitted_rows":{omitted}' if omitted else ""
+        return f'],"row_count":{total}{tail}}}'
+    closing = "]" if fmt == "repr" else ""
+    if not omitted:
+        return closing
+    note = (f"… {omitted}행 생략 (전체 {total}행 중 {shown}행 표시, 토큰 한도 {max_tokens}). "
+            "집계/LIMIT로 결과를 줄이거나 execute_sql_query_paged로 나눠 읽으세요.")
+    return f"{closing}\n{note}" if closing else note
+
+
+# --------------------------------------------------------
+# 결과 인코딩
+# --------------------------------------------------------
+def encode_rows(columns: list[str], rows: list[tuple], fmt: str = "tsv", max_tokens: int | None = None) -> str:
+    """
+    결과를 fmt 형식의 문자열로 만듭니다.
+    max_tokens를 넘는 행부터는 직렬화하지 않고, 끝에 생략된 행 수를 알려 줍니다.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"지원하지 않는 결과 형식입니다: {fmt} (사용 가능: {', '.join(FORMATS)})")
+    if fmt == "repr" and not rows:
+        return ""   # 예전 출력과 같게 빈 결과는 빈 문자열
+    count = token_counter() if max_tokens else None
+    budget = max_tokens - _NOTE_RESERVE if max_tokens else None
+
+    parts = [_header(fmt, columns)]
+    used = count(parts[0]) if count else 0
+    shown = 0
+    for row in rows:
+        chunk = _row(fmt, row, shown == 0)
+        if count:
+            cost = count(chunk)
+            # 적어도 한 행은 보여 줌 (한 행이 한도보다 커도 결과를 알 수 있도록)
+            if shown and used + cost > budget:
+                break
+            used += cost
+        parts.append(chunk)
+        shown += 1
+    parts.append(_footer(fmt, shown, len(rows), max_tokens))
+    return "".join(parts)
+
+
+if __name__ == "__main__":
+    import argparse
+    import sqlite3
+
+    parser = argparse.ArgumentParser(description="쿼리 결과를 형식별로 인코딩하고 크기 비교")
+    parser.add_argument("db_path")
+    parser.add_argument("query")
+    parser.add_argument("--format", choices=FORMATS + ("all",), default="all")
+    parser.add_argument("--max-tokens", type=int, default=None)
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db_path)
+    cursor = conn.execute(args.query)
+    result_columns = [d[0] for d in cursor.description or ()]
+    result_rows = cursor.fetchall()
+    conn.close()
+
+    count = token_counter()
+    for name in FORMATS if args.format == "all" else (args.format,):
+        text = encode_rows(result_columns, result_rows, name, args.max_tokens)
+        if args.format != "all":
+            print(text)
+        print(f"{name:>8}: {len(text.encode()):>8} bytes, {count(text):>7} tokens")
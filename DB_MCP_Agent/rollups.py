@@ -0,0 +1,485 @@
+# rollups.py
+# 자주 묻는 집계(국가별 매출, 장르별 트랙 통계, 아티스트별 매출 등)를 요약 테이블로 유지
+#  - 그룹별 누적값(행 수, 합계, NULL이 아닌 값 수)을 담는 상태 테이블(rollup_<이름>_state)과
+#    COUNT(DISTINCT ...)용 보조 테이블(rollup_<이름>_<입력>: 키, 값, 등장 횟수),
+#    상태 테이블에서 평균/반올림/이름을 계산하는 뷰(rollup_<이름>)를 원본 데이터베이스에 한 번 설치
+#  - 원본 테이블에 INSERT/UPDATE/DELETE가 일어나면 트리거가 바뀐 행의 값만 더하고 뺌
+#    (INSERT: count += 1, sum += NEW.x / DELETE: OLD로 반대 / UPDATE: 둘 다) → 쓰기 한 번에 인덱스 조회 몇 번
+#  - 서버는 읽기 전용 연결로 뷰만 읽으므로 전체 조인 없이 수십~수백 행으로 답할 수 있음
+#  - 트리거는 원본 테이블과 같은 파일에 있어야 하므로 설치는 원본 파일을 바꾸는 작업
+#    → 아래 CLI로 한 번 설치하거나 서버에서 CHINOOK_ROLLUPS=1로 명시했을 때만 설치하고,
+#      그 외에는 이미 설치된 요약만 읽기 전용으로 찾아서 사용 (installed_rollups)
+#
+# 사용법: python rollups.py Chinook.db [--check] [--drop]
+
+import hashlib
+import os
+import sqlite3
+import time
+from urllib.parse import quote
+
+ROLLUP_PREFIX = "rollup_"
+META_TABLE = "rollup_meta"
+
+
+class Source:
+    """
+    요약에 값을 더하는 원본 테이블 하나입니다.
+
+    key: 바뀐 행이 속한 그룹 키 식, values: {입력 이름: 식}
+         두 식 모두 {row} 자리에 NEW/OLD(설치 시 전체 계산에서는 원본 테이블 별칭)가 들어감
+    update_of: UPDATE 트리거를 걸 컬럼 (쉼표로 구분)
+    rows: 지정하면 행 하나가 아니라 이 SELECT의 결과 행들을 옮김 (예: 트랙의 앨범이 바뀌면
+          그 트랙의 InvoiceLine 전체를 이전 아티스트에서 빼고 새 아티스트에 더함).
+          외래키를 강제하지 않으므로 판매 기록이 남은 트랙/앨범을 지우거나 다시 추가할 때도(DELETE/INSERT)
+          같은 방식으로 그 행들을 빼거나 더함. {values} 자리에는 별칭 il 기준의 입력 목록이 들어감
+    """
+
+    def __init__(self, table: str, key: str, values: dict[str, str], update_of: str, rows: str | None = None):
+        self.table = table
+        self.key = key
+        self.values = values
+        self.update_of = update_of
+        self.rows = rows
+
+    def events(self) -> list[str]:
+        return ["INSERT", "DELETE", f"UPDATE OF {self.update_of}"]
+
+    def select_list(self, row: str) -> str:
+        return ", ".join(f"{expr.format(row=row)} AS {name}" for name, expr in self.values.items())
+
+    def row_query(self, row: str) -> str:
+        return self.rows.format(row=row, values=self.select_list("il"))
+
+    def __repr__(self) -> str:
+        # 트리거 종류도 포함: 바뀌면 이미 설치된 요약의 트리거를 다시 만듦
+        return repr((self.table, self.key, self.values, self.update_of, self.rows, self.events()))
+
+
+class Rollup:
+    """
+    요약 테이블 하나의 정의입니다.
+
+    query: 같은 결과를 원본 테이블에서 직접 계산하는 GROUP BY 쿼리 (--check로 비교할 때 사용)
+    column: 그룹 키 컬럼 이름
+    measures: (출력 컬럼, 집계, 입력 이름, 반올림 자릿수) 목록
+              집계는 count(행 수), sum, avg, distinct(COUNT(DISTINCT 입력)) 중 하나
+    sources: 값을 더하는 원본 테이블 목록 (첫 번째가 그룹 행의 기준 테이블)
+    lookup: (출력 컬럼, 조인 절, 식) — 키 다음에 붙일 이름 컬럼 (뷰에서 읽을 때 조인하므로 이름 변경에 트리거가 필요 없음)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        query: str,
+        column: str,
+        measures: list[tuple],
+        sources: list[Source],
+        lookup: tuple[str, str, str] | None = None,
+    ):
+        self.name = name
+        self.description = description
+        self.query = query
+        self.column = column
+        self.measures = measures
+        self.sources = sources
+        self.lookup = lookup
+
+    @property
+    def table(self) -> str:
+        return ROLLUP_PREFIX + self.name
+
+    @property
+    def state_table(self) -> str:
+        return f"{self.table}_state"
+
+    def distinct_table(self, value: str) -> str:
+        return f"{self.table}_{value}"
+
+    @property
+    def columns(self) -> list[str]:
+        """뷰(rollup_<이름>)의 컬럼 이름"""
+        names = [self.column] + ([self.lookup[0]] if self.lookup else [])
+        return names + [m[0] for m in self.measures]
+
+    @property
+    def signature(self) -> str:
+        """정의가 바뀌면 요약 테이블과 트리거를 다시 만들기 위한 해시"""
+        text = repr((self.query, self.column, self.measures, self.sources, self.lookup))
+        return hashlib.sha1(text.encode()).hexdigest()
+
+    def full_query(self) -> str:
+        return self.query
+
+    def _sums(self) -> list[str]:
+        # 합계/평균 입력 (상태 테이블에 "입력"(합계)과 "입력_n"(NULL이 아닌 값 수) 컬럼으로 보관)
+        return list(dict.fromkeys(m[2] for m in self.measures if m[1] in ("sum", "avg")))
+
+    def _distincts(self) -> list[str]:
+        return list(dict.fromkeys(m[2] for m in self.measures if m[1] == "distinct"))
+
+    # --------------------------------------------------------
+    # 설치 SQL
+    # --------------------------------------------------------
+    def create_sql(self) -> list[str]:
+        """상태/보조 테이블, 초기 값 계산, 뷰를 만드는 문 목록"""
+        key = f'"{self.column}"'
+        state = f'"{self.state_table}"'
+        sums = self._sums()
+        sum_cols = "".join(f', "{s}" NOT NULL DEFAULT 0, "{s}_n" INTEGER NOT NULL DEFAULT 0' for s in sums)
+        base = self.sources[0]
+        src = f'SELECT {base.key.format(row="src")} AS k, {base.select_list("src")} FROM "{base.table}" src'
+        statements = [
+            f'CREATE TABLE {state} ({key}, "_rows" INTEGER NOT NULL DEFAULT 0{sum_cols})',
+            f'CREATE UNIQUE INDEX "{self.state_table}_key" ON {state} ({key})',
+            f'INSERT INTO {state} ({key}, "_rows"' + "".join(f', "{s}", "{s}_n"' for s in sums) + ") "
+            "SELECT k, COUNT(*)" + "".join(f", coalesce(SUM({s}), 0), COUNT({s})" for s in sums)
+            + f" FROM ({src}) GROUP BY k",
+        ]
+        for value in self._distincts():
+            helper = f'"{self.distinct_table(value)}"'
+            statements += [
+                f'CREATE TABLE {helper} ({key}, value NOT NULL, n INTEGER NOT NULL DEFAULT 0)',
+                f'CREATE UNIQUE INDEX "{self.distinct_table(value)}_key" ON {helper} ({key}, value)',
+                f"INSERT INTO {helper} SELECT k, {value}, COUNT(*) FROM ({src}) "
+                f"WHERE {value} IS NOT NULL GROUP BY k, {value}",
+            ]
+        statements.append(f'CREATE VIEW "{self.table}" AS {self.view_query()}')
+        return statements
+
+    def view_query(self) -> str:
+        columns = [f"s.{self.column}"]
+        joins = ""
+        if self.lookup:
+            columns.append(f"{self.lookup[2]} AS {self.lookup[0]}")
+            joins = f" {self.lookup[1]}"
+        for name, func, value, digits in self.measures:
+            if func == "count":
+                expr = 's."_rows"'
+            elif func == "distinct":
+                expr = (f'(SELECT COUNT(*) FROM "{self.distinct_table(value)}" d '
+                        f"WHERE d.{self.column} IS s.{self.column})")
+            elif func == "sum":
+                expr = f'CASE WHEN s."{value}_n" > 0 THEN s."{value}" END'
+            else:  # avg (0으로 나누면 NULL)
+                expr = f'CAST(s."{value}" AS REAL) / s."{value}_n"'
+            if digits is not None:
+                expr = f"ROUND({expr}, {digits})"
+            columns.append(f"{expr} AS {name}")
+        return f'SELECT {", ".join(columns)} FROM "{self.state_table}" s{joins}'
+
+    def _delta_sql(self, source: Source, row: str, sign: str) -> list[str]:
+        """바뀐 행(row: NEW/OLD)의 값을 그룹 하나에 더하거나(+) 빼는(-) 문 목록"""
+        # 단항 +: 키 식의 자료형 선호(affinity)를 없애 타입 없는 키 컬럼과 비교할 때도 키 인덱스를 사용
+        #        (없으면 서브쿼리 키(아티스트)에서 상태 테이블 전체를 훑음)
+        key = "+" + source.key.format(row=row)
+        column = f'"{self.column}"'
+        state = f'"{self.state_table}"'
+        if source.rows:
+            # 여러 행을 한 번에 옮김: 옮길 행들의 집계를 더하거나 뺌
+            rows = source.row_query(row)
+            count = f"(SELECT COUNT(*) FROM ({rows}))"
+            total = lambda name: f"(SELECT coalesce(SUM({name}), 0) FROM ({rows}))"
+            nonnull = lambda name: f"(SELECT COUNT({name}) FROM ({rows}))"
+        else:
+            count = "1"
+            total = lambda name: f"coalesce({source.values[name].format(row=row)}, 0)"
+            nonnull = lambda name: f"({source.values[name].format(row=row)} IS NOT NULL)"
+
+        body = []
+        if sign == "+":
+            body.append(
+                f"INSERT INTO {state} ({column}) SELECT {key} "
+                f"WHERE NOT EXISTS (SELECT 1 FROM {state} WHERE {column} IS {key});"
+            )
+        sets = [f'"_rows" = "_rows" {sign} {count}']
+        for name in self._sums():
+            sets.append(f'"{name}" = "{name}" {sign} {total(name)}')
+            sets.append(f'"{name}_n" = "{name}_n" {sign} {nonnull(name)}')
+        # IS: NULL 키(예: 장르 없는 트랙)도 같은 그룹으로 비교 (키 인덱스 사용)
+        body.append(f"UPDATE {state} SET {', '.join(sets)} WHERE {column} IS {key};")
+        body.append(f'DELETE FROM {state} WHERE {column} IS {key} AND "_rows" <= 0;')
+
+        for name in self._distincts():
+            helper = f'"{self.distinct_table(name)}"'
+            if source.rows:
+                match = f"value IN (SELECT {name} FROM ({rows}) WHERE {name} IS NOT NULL)"
+                new_values = f"SELECT DISTINCT {key} AS k, {name} FROM ({rows}) WHERE {name} IS NOT NULL"
+                times = f"(SELECT COUNT(*) FROM ({rows}) r WHERE r.{name} = {helper}.value)"
+            else:
+                value = source.values[name].format(row=row)
+                match = f"value = {value}"
+                new_values = f"SELECT {key} AS k, {value} AS {name} WHERE {value} IS NOT NULL"
+                times = "1"
+            if sign == "+":
+                body.append(
+                    f"INSERT INTO {helper} ({column}, value) SELECT * FROM ({new_values}) v "
+                    f"WHERE NOT EXISTS (SELECT 1 FROM {helper} h WHERE h.{column} IS {key} AND h.value = v.{name});"
+                )
+            body.append(f"UPDATE {helper} SET n = n {sign} {times} WHERE {column} IS {key} AND {match};")
+            if sign == "-":
+                body.append(f"DELETE FROM {helper} WHERE {column} IS {key} AND {match} AND n <= 0;")
+        return body
+
+    def trigger_sql(self) -> list[tuple[str, str]]:
+        """(트리거 이름, CREATE TRIGGER 문) 목록"""
+        triggers = []
+        for source in self.sources:
+            for event in source.events():
+                action = event.split()[0].lower()
+                name = f"{self.table}_{source.table.lower()}_{action}"
+                body = []
+                if action in ("delete", "update"):
+                    body += self._delta_sql(source, "OLD", "-")
+                if action in ("insert", "update"):
+                    body += self._delta_sql(source, "NEW", "+")
+                triggers.append((
+                    name,
+                    f'CREATE TRIGGER "{name}" AFTER {event} ON "{source.table}"\nBEGIN\n  '
+                    + "\n  ".join(body) + "\nEND",
+                ))
+        return triggers
+
+
+# --------------------------------------------------------
+# 요약 정의 (Chinook 형태의 데이터베이스 기준)
+# --------------------------------------------------------
+_ARTIST_OF_TRACK = "(SELECT a2.ArtistId FROM Track t2 JOIN Album a2 ON a2.AlbumId = t2.AlbumId WHERE t2.TrackId = {row}.TrackId)"
+_LINE_VALUES = {"invoice": "{row}.InvoiceId", "units": "{row}.Quantity", "amount": "{row}.UnitPrice * {row}.Quantity"}
+
+ROLLUPS = [
+    Rollup(
+        "sales_by_country",
+        "청구 국가별 주문 수, 고객 수, 매출 합계, 주문당 평균 금액",
+        "SELECT i.BillingCountry AS country, COUNT(*) AS invoices, "
+        "COUNT(DISTINCT i.CustomerId) AS customers, ROUND(SUM(i.Total), 2) AS revenue, "
+        "ROUND(AVG(i.Total), 2) AS avg_invoice "
+        "FROM Invoice i GROUP BY i.BillingCountry",
+        column="country",
+        measures=[
+            ("invoices", "count", None, None),
+            ("customers", "distinct", "customer", None),
+            ("revenue", "sum", "total", 2),
+            ("avg_invoice", "avg", "total", 2),
+        ],
+        sources=[
+            Source("Invoice", "{row}.BillingCountry", {"customer": "{row}.CustomerId", "total": "{row}.Total"},
+                   update_of="BillingCountry, CustomerId, Total"),
+        ],
+    ),
+    Rollup(
+        "sales_by_month",
+        "월(YYYY-MM)별 주문 수와 매출 합계",
+        "SELECT strftime('%Y-%m', i.InvoiceDate) AS month, COUNT(*) AS invoices, "
+        "ROUND(SUM(i.Total), 2) AS revenue "
+        "FROM Invoice i GROUP BY strftime('%Y-%m', i.InvoiceDate)",
+        column="month",
+        measures=[
+            ("invoices", "count", None, None),
+            ("revenue", "sum", "total", 2),
+        ],
+        sources=[
+            Source("Invoice", "strftime('%Y-%m', {row}.InvoiceDate)", {"total": "{row}.Total"},
+                   update_of="InvoiceDate, Total"),
+        ],
+    ),
+    Rollup(
+        "genre_track_stats",
+        "장르별 트랙 수, 평균/전체 재생 시간(ms), 평균 단가",
+        "SELECT t.GenreId AS genre_id, g.Name AS genre, COUNT(*) AS tracks, "
+        "ROUND(AVG(t.Milliseconds), 1) AS avg_ms, SUM(t.Milliseconds) AS total_ms, "
+        "ROUND(AVG(t.UnitPrice), 2) AS avg_price "
+        "FROM Track t LEFT JOIN Genre g ON g.GenreId = t.GenreId GROUP BY t.GenreId",
+        column="genre_id",
+        lookup=("genre", "LEFT JOIN Genre g ON g.GenreId = s.genre_id", "g.Name"),
+        measures=[
+            ("tracks", "count", None, None),
+            ("avg_ms", "avg", "ms", 1),
+            ("total_ms", "sum", "ms", None),
+            ("avg_price", "avg", "price", 2),
+        ],
+        sources=[
+            Source("Track", "{row}.GenreId", {"ms": "{row}.Milliseconds", "price": "{row}.UnitPrice"},
+                   update_of="GenreId, Milliseconds, UnitPrice"),
+        ],
+    ),
+    Rollup(
+        "artist_revenue",
+        "아티스트별 판매 수량, 주문 수, 매출 합계 (InvoiceLine 기준)",
+        "SELECT al.ArtistId AS artist_id, ar.Name AS artist, SUM(il.Quantity) AS units, "
+        "COUNT(DISTINCT il.InvoiceId) AS invoices, ROUND(SUM(il.UnitPrice * il.Quantity), 2) AS revenue "
+        "FROM InvoiceLine il JOIN Track t ON t.TrackId = il.TrackId "
+        "JOIN Album al ON al.AlbumId = t.AlbumId JOIN Artist ar ON ar.ArtistId = al.ArtistId "
+        "GROUP BY al.ArtistId",
+        column="artist_id",
+        lookup=("artist", "JOIN Artist ar ON ar.ArtistId = s.artist_id", "ar.Name"),
+        measures=[
+            ("units", "sum", "units", None),
+            ("invoices", "distinct", "invoice", None),
+            ("revenue", "sum", "amount", 2),
+        ],
+        sources=[
+            Source("InvoiceLine", _ARTIST_OF_TRACK, _LINE_VALUES,
+                   update_of="TrackId, InvoiceId, UnitPrice, Quantity"),
+            # 트랙/앨범의 소속이 바뀌면 그 판매 기록 전체를 이전 아티스트에서 새 아티스트로 옮김
+            Source("Track", "(SELECT ArtistId FROM Album WHERE AlbumId = {row}.AlbumId)", _LINE_VALUES,
+                   update_of="AlbumId",
+                   rows="SELECT {values} FROM InvoiceLine il WHERE il.TrackId = {row}.TrackId"),
+            Source("Album", "{row}.ArtistId", _LINE_VALUES,
+                   update_of="ArtistId",
+                   rows="SELECT {values} FROM Track t3 JOIN InvoiceLine il ON il.TrackId = t3.TrackId "
+                        "WHERE t3.AlbumId = {row}.AlbumId"),
+        ],
+    ),
+]
+
+
+def get_rollup(name: str) -> Rollup | None:
+    name = name.strip().lower()
+    if name.startswith(ROLLUP_PREFIX):
+        name = name[len(ROLLUP_PREFIX):]
+    return next((r for r in ROLLUPS if r.name == name), None)
+
+
+def rollup_tables(rollups: list[Rollup] = ROLLUPS) -> set[str]:
+    """상태/보조/메타 테이블 이름 (관련 테이블 검색 등에서 제외할 때 사용)"""
+    names = {META_TABLE}
+    for r in rollups:
+        names.add(r.state_table)
+        names.update(r.distinct_table(value) for value in r._distincts())
+    return names
+
+
+# --------------------------------------------------------
+# 설치 / 제거
+# --------------------------------------------------------
+def _existing(conn: sqlite3.Connection, kind: str) -> set[str]:
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = ?", (kind,))}
+
+
+def _drop(conn: sqlite3.Connection, table: str) -> None:
+    # 뷰 rollup_<이름>과 이름이 rollup_<이름>_로 시작하는 트리거/상태 테이블/보조 테이블
+    # (이전 형식에서는 rollup_<이름>이 테이블)
+    objects = conn.execute(
+        "SELECT type, name FROM sqlite_master WHERE type IN ('trigger', 'view', 'table') "
+        "AND (name = ? OR name LIKE ? ESCAPE '\\') ORDER BY type = 'table'",
+        (table, table.replace("_", "\\_") + "\\_%"),
+    ).fetchall()
+    for kind, name in objects:
+        conn.execute(f'DROP {kind.upper()} IF EXISTS "{name}"')
+
+
+def install_rollups(db_path: str, rollups: list[Rollup] = ROLLUPS) -> list[str]:
+    """
+    요약 테이블과 트리거를 설치(또는 정의가 바뀐 것만 다시 생성)하고 사용 가능한 요약 이름을 반환합니다.
+    원본 테이블이 없는 요약은 건너뜁니다. 이미 최신이면 아무것도 쓰지 않습니다.
+    """
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        tables = _existing(conn, "table")
+        wanted = {r.name: r for r in rollups if all(src.table in tables for src in r.sources)}
+        current = {}
+        if META_TABLE in tables:
+            current = dict(conn.execute(f"SELECT name, signature FROM {META_TABLE}"))
+        stale = [r for r in wanted.values() if current.get(r.name) != r.signature or r.state_table not in tables]
+        removed = [name for name in current if name not in wanted]
+        if not stale and not removed:
+            return list(wanted)
+
+        with conn:  # 하나의 트랜잭션: 중간 상태가 다른 연결에 보이지 않음
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {META_TABLE} ("
+                " name TEXT PRIMARY KEY, signature TEXT, description TEXT, built_at REAL)"
+            )
+            for name in removed:
+                _drop(conn, ROLLUP_PREFIX + name)
+                conn.execute(f"DELETE FROM {META_TABLE} WHERE name = ?", (name,))
+            for r in stale:
+                _drop(conn, r.table)
+                for sql in r.create_sql():
+                    conn.execute(sql)
+                for _, sql in r.trigger_sql():
+                    conn.execute(sql)
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {META_TABLE} VALUES (?, ?, ?, ?)",
+                    (r.name, r.signature, r.description, time.time()),
+                )
+        return list(wanted)
+    finally:
+        conn.close()
+
+
+def installed_rollups(db_path: str, rollups: list[Rollup] = ROLLUPS) -> list[str]:
+    """
+    파일에 이미 설치되어 있고 정의가 최신인 요약 이름을 반환합니다.
+    읽기 전용 연결로 메타 테이블만 읽으므로 파일에 아무것도 쓰지 않습니다.
+    """
+    uri = f"file:{quote(os.path.abspath(db_path))}?mode=ro"
+    conn = sqlite3.connect(uri, uri=True)
+    try:
+        tables = _existing(conn, "table")
+        if META_TABLE not in tables:
+            return []
+        current = dict(conn.execute(f"SELECT name, signature FROM {META_TABLE}"))
+        return [r.name for r in rollups if current.get(r.name) == r.signature and r.state_table in tables]
+    finally:
+        conn.close()
+
+
+def drop_rollups(db_path: str) -> None:
+    """설치한 요약 뷰, 상태/보조 테이블, 트리거, 메타 테이블을 모두 제거합니다."""
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        with conn:
+            tables = _existing(conn, "table")
+            if META_TABLE in tables:
+                for (name,) in conn.execute(f"SELECT name FROM {META_TABLE}").fetchall():
+                    _drop(conn, ROLLUP_PREFIX + name)
+            conn.execute(f"DROP TABLE IF EXISTS {META_TABLE}")
+    finally:
+        conn.close()
+
+
+def check_rollups(conn: sqlite3.Connection, rollups: list[Rollup] = ROLLUPS) -> dict[str, bool]:
+    """
+    요약 뷰 내용이 전체 재계산 결과와 같은지 비교합니다.
+    합계는 더하고 뺀 순서에 따라 부동소수점 오차가 쌓이므로 반올림한 값은 마지막 자리 1까지 같은 것으로 봅니다.
+    """
+    views = _existing(conn, "view")
+    result = {}
+    for r in rollups:
+        if r.table not in views:
+            continue
+        digits = {m[0]: m[3] for m in r.measures}
+        tolerance = [10.0 ** -digits[c] if digits.get(c) is not None else 0.0 for c in r.columns]
+        stored = sorted(conn.execute(f'SELECT * FROM "{r.table}"').fetchall(), key=repr)
+        fresh = sorted(conn.execute(r.full_query()).fetchall(), key=repr)
+        result[r.name] = len(stored) == len(fresh) and all(
+            a == b or (isinstance(a, float) and isinstance(b, float) and abs(a - b) <= tol + 1e-9)
+            for row_a, row_b in zip(stored, fresh)
+            for a, b, tol in zip(row_a, row_b, tolerance)
+        )
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="요약 테이블(rollup) 설치/검증/제거")
+    parser.add_argument("db_path")
+    parser.add_argument("--check", action="store_true", help="요약 테이블이 전체 재계산 결과와 같은지 확인")
+    parser.add_argument("--drop", action="store_true", help="요약 테이블과 트리거 제거")
+    args = parser.parse_args()
+
+    if args.drop:
+        drop_rollups(args.db_path)
+        print("요약 테이블을 제거했습니다.")
+    else:
+        names = install_rollups(args.db_path)
+        print(f"요약 테이블: {', '.join(names) or '없음'}")
+        if args.check:
+            conn = sqlite3.connect(args.db_path)
+            for name, ok in check_rollups(conn).items():
+                print(f"  {name}: {'일치' if ok else '불일치'}")
+            conn.close()
@@ -0,0 +1,483 @@
+# sampling.py
+# 큰 테이블의 층화 표본(stratified sample)으로 COUNT/SUM/AVG를 근사 계산
+#  - 테이블마다 층(stratum)을 나누는 식을 정하고, 층마다 같은 비율(fraction)로 행을 무작위 추출
+#    (작은 층은 최소 MIN_STRATUM_ROWS행까지 더 많이 뽑아 GROUP BY 결과에서 빠지지 않게 함)
+#  - 표본은 원본 옆의 별도 파일(표본 DB, 기본 <원본>.samples)의 sample_<테이블>에,
+#    층별 전체/표본 행 수는 sample_strata에 저장 (원본은 읽기 전용으로 붙여서 읽기만 함)
+#  - 근사 집계는 원본 연결에 표본 DB를 읽기 전용으로 붙여(ATTACH) 원본 테이블과 조인
+#  - 추정값: 층별 가중치(전체 행 수 / 표본 행 수)를 곱한 합계, AVG는 비율 추정
+#    오차 범위: 층화 무작위 추출의 분산(유한 모집단 보정 포함)으로 계산한 95% 신뢰구간
+#  - 표본은 임시 테이블에서 만든 뒤 짧은 쓰기 트랜잭션으로 교체하므로 근사 집계를 오래 막지 않음
+#
+# 사용법: python sampling.py Chinook.db [--fraction 0.01] [--build] "SUM(UnitPrice * Quantity)" ...
+#         [--group-by "g.Name"] [--joins "JOIN Track t ON ..."] [--where "..."] (정확한 값과 비교)
+#        python sampling.py Chinook.db --drop  (이전 버전이 원본 파일에 만든 표본 테이블 제거)
+
+import hashlib
+import math
+import os
+import re
+import sqlite3
+import time
+from urllib.parse import quote
+
+SAMPLE_PREFIX = "sample_"
+META_TABLE = "sample_meta"
+STRATA_TABLE = "sample_strata"
+# 근사 집계 때 표본 DB를 붙이는 스키마 이름
+SAMPLE_SCHEMA = "samples"
+# 표본 DB와 원본을 붙일 때 쓰는 SQLite 파일 VFS
+FILE_VFS = "win32" if os.name == "nt" else "unix"
+# 층마다 최소로 뽑는 행 수 (층의 전체 행 수가 더 적으면 전부)
+MIN_STRATUM_ROWS = 50
+# 95% 신뢰구간의 정규분포 분위수
+Z_95 = 1.959964
+# 이보다 적은 표본 행으로 계산한 추정값은 오차 범위를 믿기 어려우므로 표시
+MIN_SUPPORT = 30
+
+
+class SampleSpec:
+    """
+    표본 하나의 정의입니다.
+
+    table: 원본 테이블, strata: 층을 나누는 식 (원본 테이블 이름으로 컬럼을 참조, 하위 쿼리 가능)
+    자주 묻는 GROUP BY 기준으로 층을 나누면 작은 그룹도 표본에 충분히 들어갑니다.
+    """
+
+    def __init__(self, table: str, strata: str, description: str):
+        self.table = table
+        self.strata = strata
+        self.description = description
+
+    @property
+    def sample_table(self) -> str:
+        return SAMPLE_PREFIX + self.table
+
+    def signature(self, fraction: float, min_rows: int) -> str:
+        """정의나 추출 비율이 바뀌면 표본을 다시 만들기 위한 해시"""
+        text = repr((self.table, self.strata, fraction, min_rows))
+        return hashlib.sha1(text.encode()).hexdigest()
+
+
+# --------------------------------------------------------
+# 표본 정의 (Chinook 형태의 데이터베이스 기준)
+# --------------------------------------------------------
+SAMPLES = [
+    SampleSpec(
+        "InvoiceLine",
+        "(SELECT t.GenreId FROM Track t WHERE t.TrackId = InvoiceLine.TrackId)",
+        "주문 항목 (트랙 장르별 층화)",
+    ),
+    SampleSpec(
+        "Invoice",
+        "Invoice.BillingCountry",
+        "주문 (청구 국가별 층화)",
+    ),
+]
+
+
+def get_sample(table: str) -> SampleSpec | None:
+    table = table.strip().lower()
+    if table.startswith(SAMPLE_PREFIX.lower()):
+        table = table[len(SAMPLE_PREFIX):]
+    return next((s for s in SAMPLES if s.table.lower() == table), None)
+
+
+def sample_tables(specs: list[SampleSpec] = SAMPLES) -> set[str]:
+    """표본과 메타 테이블 이름 (이전 버전이 원본에 만든 표본을 관련 테이블 검색 등에서 제외할 때 사용)"""
+    return {s.sample_table for s in specs} | {META_TABLE, STRATA_TABLE}
+
+
+def default_sample_path(db_path: str) -> str:
+    """원본 파일 옆의 표본 DB 경로 (*.db가 아니므로 데이터베이스 폴더 검색에 잡히지 않음)"""
+    return os.path.abspath(db_path) + ".samples"
+
+
+def _ro_uri(path: str) -> str:
+    # ATTACH는 VFS를 지정하지 않으면 붙이는 연결의 VFS를 물려받으므로(스냅샷 연결은 memdb),
+    # 파일 VFS를 명시해야 스냅샷 모드에서도 디스크의 표본 DB를 엶
+    return f"file:{quote(os.path.abspath(path))}?mode=ro&vfs={FILE_VFS}"
+
+
+# --------------------------------------------------------
+# 표본 만들기
+# --------------------------------------------------------
+def _existing_tables(conn: sqlite3.Connection, schema: str = "main") -> set[str]:
+    return {row[0] for row in conn.execute(f"SELECT name FROM {schema}.sqlite_master WHERE type = 'table'")}
+
+
+def _build_one(conn: sqlite3.Connection, spec: SampleSpec, fraction: float, min_rows: int) -> tuple[int, int]:
+    """
+    spec의 표본을 임시 테이블에 만들고 표본 DB의 표본을 교체합니다. (전체 행 수, 표본 행 수)
+    conn은 표본 DB 연결이며 원본은 src로 붙어 있어, 원본 테이블 이름은 그대로 원본을 가리킵니다.
+    """
+    conn.execute("DROP TABLE IF EXISTS temp._sample_rates")
+    conn.execute("DROP TABLE IF EXISTS temp._sample_rows")
+    conn.execute("CREATE TEMP TABLE _sample_rates (stratum PRIMARY KEY, population INTEGER, rate REAL)")
+    populations = conn.execute(
+        f'SELECT {spec.strata} AS stratum, COUNT(*) FROM "{spec.table}" GROUP BY stratum'
+    ).fetchall()
+    conn.executemany(
+        "INSERT INTO temp._sample_rates VALUES (?, ?, ?)",
+        [(stratum, n, min(1.0, max(fraction, min_rows / n))) for stratum, n in populations],
+    )
+    # 층마다 정해진 비율로 베르누이 추출 (전체를 한 번만 읽고 정렬하지 않음)
+    # CROSS JOIN: 원본 행을 바깥 루프로 고정 (그렇지 않으면 random() 조건이 층마다 한 번만 평가될 수 있음)
+    conn.execute(
+        f'CREATE TEMP TABLE _sample_rows AS SELECT s.* FROM '
+        f'(SELECT "{spec.table}".*, {spec.strata} AS _stratum FROM "{spec.table}") s '
+        f"CROSS JOIN temp._sample_rates r ON r.stratum IS s._stratum "
+        f"WHERE r.rate >= 1.0 OR (random() & 1073741823) < r.rate * 1073741824.0"
+    )
+    sampled = dict(conn.execute("SELECT _stratum, COUNT(*) FROM temp._sample_rows GROUP BY _stratum").fetchall())
+    conn.commit()  # 여기까지는 읽기와 임시 테이블 쓰기뿐
+
+    with conn:  # 교체는 하나의 짧은 쓰기 트랜잭션: 다른 연결에는 이전/새 표본 중 하나만 보임
+        conn.execute(f'DROP TABLE IF EXISTS main."{spec.sample_table}"')
+        conn.execute(f'CREATE TABLE main."{spec.sample_table}" AS SELECT * FROM temp._sample_rows')
+        conn.execute(f"DELETE FROM main.{STRATA_TABLE} WHERE table_name = ?", (spec.table,))
+        conn.executemany(
+            f"INSERT INTO main.{STRATA_TABLE} VALUES (?, ?, ?, ?)",
+            [(spec.table, stratum, n, sampled.get(stratum, 0)) for stratum, n in populations],
+        )
+        conn.execute(
+            f"INSERT OR REPLACE INTO main.{META_TABLE} VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (spec.table, spec.signature(fraction, min_rows), spec.description, fraction,
+             sum(n for _, n in populations), sum(sampled.values()), time.time()),
+        )
+    conn.execute("DROP TABLE temp._sample_rates")
+    conn.execute("DROP TABLE temp._sample_rows")
+    return sum(n for _, n in populations), sum(sampled.values())
+
+
+def build_samples(
+    db_path: str,
+    fraction: float = 0.01,
+    min_rows: int = MIN_STRATUM_ROWS,
+    specs: list[SampleSpec] = SAMPLES,
+    force: bool = False,
+    sample_path: str | None = None,
+) -> list[str]:
+    """
+    원본(db_path)을 읽기 전용으로 읽어 표본 DB(sample_path, 기본 <원본>.samples)에 표본을 만들고
+    다시 만든 원본 테이블 이름 목록을 반환합니다. 원본 파일에는 쓰지 않습니다.
+    force가 아니면 표본이 없거나 정의/비율이 바뀐 것만 만듭니다. 원본 테이블이 없는 정의는 건너뜁니다.
+    """
+    sample_path = sample_path or default_sample_path(db_path)
+    conn = sqlite3.connect(f"file:{quote(os.path.abspath(sample_path))}", uri=True, timeout=30)
+    try:
+        conn.execute("ATTACH DATABASE ? AS src", (_ro_uri(db_path),))
+        tables = _existing_tables(conn, "src")
+        with conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS main.{META_TABLE} ("
+                " table_name TEXT PRIMARY KEY, signature TEXT, description TEXT, fraction REAL,"
+                " population INTEGER, sampled INTEGER, built_at REAL)"
+            )
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS main.{STRATA_TABLE} ("
+                " table_name TEXT, stratum, population INTEGER, sampled INTEGER)"
+            )
+        current = dict(conn.execute(f"SELECT table_name, signature FROM main.{META_TABLE}"))
+        samples = _existing_tables(conn)
+        built = []
+        for spec in specs:
+            if spec.table not in tables:
+                continue
+            if not force and current.get(spec.table) == spec.signature(fraction, min_rows) \
+                    and spec.sample_table in samples:
+                continue
+            _build_one(conn, spec, fraction, min_rows)
+            built.append(spec.table)
+        return built
+    finally:
+        conn.close()
+
+
+def drop_samples(db_path: str, specs: list[SampleSpec] = SAMPLES) -> None:
+    """이전 버전이 원본 파일에 만든 표본/메타 테이블을 제거합니다."""
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        with conn:
+            for name in sorted(sample_tables(specs)):
+                conn.execute(f'DROP TABLE IF EXISTS "{name}"')
+    finally:
+        conn.close()
+
+
+def list_samples(conn: sqlite3.Connection) -> list[dict]:
+    """만들어 둔 표본 목록 (원본 테이블, 설명, 비율, 전체/표본 행 수, 만든 시각)"""
+    if META_TABLE not in _existing_tables(conn):
+        return []
+    return [
+        {
+            "table": table,
+            "description": description,
+            "fraction": fraction,
+            "population": population,
+            "sampled": sampled,
+            "built_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(built_at)),
+            "age_seconds": round(time.time() - built_at, 1),
+        }
+        for table, description, fraction, population, sampled, built_at in conn.execute(
+            f"SELECT table_name, description, fraction, population, sampled, built_at FROM {META_TABLE} ORDER BY 1"
+        )
+    ]
+
+
+# --------------------------------------------------------
+# 근사 집계
+# --------------------------------------------------------
+_AGG_RE = re.compile(r"^\s*(COUNT|SUM|AVG)\s*\((.*)\)\s*$", re.IGNORECASE | re.DOTALL)
+_TABLE_RE = re.compile(r'^\s*"?([A-Za-z_]\w*)"?(?:\s+(?:AS\s+)?"?([A-Za-z_]\w*)"?)?\s*$', re.IGNORECASE)
+
+
+def _parse_aggregate(text: str) -> tuple[str, str | None]:
+    """"SUM(expr)" → ("sum", "expr"), "COUNT(*)" → ("count", None)"""
+    m = _AGG_RE.match(text)
+    if not m:
+        raise ValueError(f"COUNT(...), SUM(...), AVG(...) 형식의 집계만 근사할 수 있습니다: {text}")
+    func, expr = m.group(1).lower(), m.group(2).strip()
+    if not expr:
+        raise ValueError(f"집계할 식이 없습니다: {text}")
+    if re.match(r"(?i)distinct\b", expr):
+        raise ValueError(f"DISTINCT 집계는 표본으로 추정할 수 없습니다: {text}")
+    if expr == "*":
+        if func != "count":
+            raise ValueError(f"*는 COUNT에서만 사용할 수 있습니다: {text}")
+        return func, None
+    return func, expr
+
+
+def _variance(population: int, n: int, total: float, squares: float) -> float:
+    """층 하나의 합계 추정량 분산 (비복원 단순 무작위 추출, 유한 모집단 보정 포함)"""
+    if n <= 1 or n >= population:
+        return 0.0
+    s2 = max(0.0, (squares - total * total / n) / (n - 1))
+    return population * population * (1 - n / population) * s2 / n
+
+
+def _interval(estimate: float | None, variance: float, support: int) -> dict:
+    if estimate is None:
+        return {"estimate": None, "ci95": None, "stderr": None, "sample_rows": support}
+    stderr = math.sqrt(variance)
+    result = {
+        "estimate": round(estimate, 4),
+        "ci95": [round(estimate - Z_95 * stderr, 4), round(estimate + Z_95 * stderr, 4)],
+        "stderr": round(stderr, 4),
+        "rel_error": round(Z_95 * stderr / abs(estimate), 4) if estimate else None,
+        "sample_rows": support,
+    }
+    if support < MIN_SUPPORT and stderr > 0:
+        result["low_support"] = True
+    return result
+
+
+def _estimate(func: str, strata: dict, cells: dict) -> dict:
+    """
+    한 그룹의 집계 하나를 추정합니다.
+    strata: {층: (전체 행 수, 표본 행 수)}, cells: {층: (표본 행 수, 값 있는 행 수, 합, 제곱합)}
+    cells에 없는 층은 이 그룹(WHERE 조건)에 해당하는 표본 행이 없는 층 (값 0)
+    """
+    support = sum(c[0] for c in cells.values())
+    if func in ("count", "sum"):
+        estimate = variance = 0.0
+        for stratum, (_, n_x, total, squares) in cells.items():
+            population, n = strata[stratum]
+            if func == "count":
+                total = squares = n_x
+            estimate += population / n * total
+            variance += _variance(population, n, total, squares)
+        return _interval(estimate, variance, support)
+
+    # AVG: 합계 추정 / 값 있는 행 수 추정 (비율 추정량, 선형화 분산)
+    y_hat = sum(strata[h][0] / strata[h][1] * c[2] for h, c in cells.items())
+    x_hat = sum(strata[h][0] / strata[h][1] * c[1] for h, c in cells.items())
+    if x_hat == 0:
+        return _interval(None, 0.0, support)
+    ratio = y_hat / x_hat
+    variance = 0.0
+    for stratum, (_, n_x, total, squares) in cells.items():
+        population, n = strata[stratum]
+        # 잔차 d = y - ratio * x (x는 값이 있으면 1)의 합과 제곱합
+        d_total = total - ratio * n_x
+        d_squares = squares - 2 * ratio * total + ratio * ratio * n_x
+        variance += _variance(population, n, d_total, d_squares)
+    return _interval(ratio, variance / (x_hat * x_hat), support)
+
+
+def approximate(
+    conn: sqlite3.Connection,
+    table: str,
+    aggregates: list[str],
+    group_by: list[str] | None = None,
+    where: str | None = None,
+    joins: str | None = None,
+    limit: int = 50,
+    sample_path: str | None = None,
+) -> dict:
+    """
+    table의 표본으로 aggregates(COUNT/SUM/AVG)를 group_by별로 추정하고 95% 신뢰구간을 붙여 반환합니다.
+    conn은 원본 연결이며, 표본 DB(sample_path)를 읽기 전용으로 붙였다가 끝나면 뗍니다.
+    표본 테이블은 원본 테이블 이름(또는 "InvoiceLine il"처럼 준 별칭)으로 참조하므로,
+    where/joins/group_by/집계 식은 원본 테이블에 쓰는 것과 같게 작성합니다.
+    그룹은 첫 번째 집계의 추정값이 큰 순서로 최대 limit개 반환합니다.
+    """
+    m = _TABLE_RE.match(table)
+    if not m:
+        raise ValueError(f"테이블 이름이 올바르지 않습니다: {table}")
+    spec = get_sample(m.group(1))
+    if spec is None:
+        raise LookupError(
+            f"표본이 정의되지 않은 테이블입니다: {m.group(1)} (사용 가능: {', '.join(s.table for s in SAMPLES)})"
+        )
+    alias = m.group(2) or spec.table
+    if not aggregates:
+        raise ValueError("집계를 하나 이상 지정하세요 (예: COUNT(*), SUM(UnitPrice * Quantity)).")
+    parsed = [_parse_aggregate(a) for a in aggregates]
+    group_by = [g for g in (group_by or []) if g.strip()]
+
+    # 집계마다 (값 있는 행 수, 합, 제곱합)을 층별로 계산 (COUNT(*)는 행 수만)
+    select = [f"{g} AS _g{i}" for i, g in enumerate(group_by)]
+    select += [f'"{alias}"._stratum AS _stratum', "COUNT(*)"]
+    for func, expr in parsed:
+        if expr is None:
+            select += ["COUNT(*)", "0", "0"]
+        else:
+            select += [f"COUNT({expr})", f"TOTAL({expr})", f"TOTAL(({expr}) * ({expr}))"]
+    group_cols = [f"_g{i}" for i in range(len(group_by))] + ["_stratum"]
+    sql = (
+        f'SELECT {", ".join(select)} FROM {SAMPLE_SCHEMA}."{spec.sample_table}" AS "{alias}" {joins or ""} '
+        f'{f"WHERE {where}" if where else ""} GROUP BY {", ".join(group_cols)}'
+    )
+
+    not_ready = LookupError(
+        f"{spec.table}의 표본이 아직 준비되지 않았습니다. 잠시 후 다시 시도하거나 정확한 쿼리를 사용하세요."
+    )
+    if sample_path is None or not os.path.exists(sample_path):
+        raise not_ready
+    conn.execute(f"ATTACH DATABASE ? AS {SAMPLE_SCHEMA}", (_ro_uri(sample_path),))
+    try:
+        # 표본과 층 정보를 같은 읽기 트랜잭션에서 읽어, 그 사이에 표본이 교체되어도 서로 맞도록 함
+        conn.execute("BEGIN")
+        try:
+            tables = _existing_tables(conn, SAMPLE_SCHEMA)
+            meta = None
+            if spec.sample_table in tables and META_TABLE in tables:
+                meta = conn.execute(
+                    f"SELECT fraction, population, sampled, built_at FROM {SAMPLE_SCHEMA}.{META_TABLE} "
+                    "WHERE table_name = ?",
+                    (spec.table,),
+                ).fetchone()
+            if meta is None:
+                raise not_ready
+            strata = {
+                stratum: (population, sampled)
+                for stratum, population, sampled in conn.execute(
+                    f"SELECT stratum, population, sampled FROM {SAMPLE_SCHEMA}.{STRATA_TABLE} WHERE table_name = ?",
+                    (spec.table,),
+                )
+            }
+            rows = conn.execute(sql).fetchall()
+        finally:
+            conn.rollback()
+    finally:
+        conn.execute(f"DETACH DATABASE {SAMPLE_SCHEMA}")
+
+    groups: dict[tuple, dict] = {}
+    width = len(group_by)
+    for row in rows:
+        key, stratum, n_rows = tuple(row[:width]), row[width], row[width + 1]
+        if strata.get(stratum, (0, 0))[1] == 0:
+            continue
+        cells = groups.setdefault(key, [{} for _ in parsed])
+        values = row[width + 2:]
+        for i, (func, expr) in enumerate(parsed):
+            n_x, total, squares = values[3 * i: 3 * i + 3]
+            cells[i][stratum] = (n_rows, n_x, total, squares)
+
+    results = []
+    for key, cells in groups.items():
+        item = {g: v for g, v in zip(group_by, key)}
+        for text, (func, _), cell in zip(aggregates, parsed, cells):
+            item[text.strip()] = _estimate(func, strata, cell)
+        results.append(item)
+    if not group_by and not results:
+        # 조건에 맞는 표본 행이 없으면 COUNT/SUM은 0, AVG는 알 수 없음
+        results.append({a.strip(): _estimate(f, strata, {}) for a, (f, _) in zip(aggregates, parsed)})
+    first = aggregates[0].strip()
+    results.sort(key=lambda r: r[first]["estimate"] if r[first]["estimate"] is not None else float("-inf"),
+                 reverse=True)
+
+    fraction, population, sampled, built_at = meta
+    return {
+        "table": spec.table,
+        "sample": {
+            "fraction": fraction,
+            "population": population,
+            "sampled": sampled,
+            "strata": len(strata),
+            "built_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(built_at)),
+        },
+        "confidence": 0.95,
+        "groups": len(results),
+        "truncated": len(results) > limit,
+        "rows": results[:limit],
+    }
+
+
+def exact_query(table: str, aggregates: list[str], group_by=None, where=None, joins=None) -> str:
+    """approximate()와 같은 인자로 원본 테이블에서 정확한 값을 구하는 SQL (비교용)"""
+    group_by = [g for g in (group_by or []) if g.strip()]
+    select = ", ".join(group_by + [a.strip() for a in aggregates])
+    where_sql = f"WHERE {where}" if where else ""
+    group_sql = f"GROUP BY {', '.join(group_by)}" if group_by else ""
+    return f"SELECT {select} FROM {table} {joins or ''} {where_sql} {group_sql}"
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="층화 표본 만들기 / 근사 집계와 정확한 값 비교")
+    parser.add_argument("db_path")
+    parser.add_argument("aggregates", nargs="*", default=["COUNT(*)"])
+    parser.add_argument("--table", default="InvoiceLine")
+    parser.add_argument("--group-by", action="append", default=[])
+    parser.add_argument("--where", default=None)
+    parser.add_argument("--joins", default=None)
+    parser.add_argument("--fraction", type=float, default=0.01)
+    parser.add_argument("--build", action="store_true", help="표본이 최신이어도 다시 만듦")
+    parser.add_argument("--samples", default=None, help="표본 DB 경로 (기본 <원본>.samples)")
+    parser.add_argument("--drop", action="store_true", help="이전 버전이 원본 파일에 만든 표본 테이블 제거")
+    args = parser.parse_args()
+
+    if args.drop:
+        drop_samples(args.db_path)
+        print("원본 파일의 표본 테이블을 제거했습니다.")
+        raise SystemExit(0)
+    samples_path = args.samples or default_sample_path(args.db_path)
+    start = time.perf_counter()
+    rebuilt = build_samples(args.db_path, args.fraction, force=args.build, sample_path=samples_path)
+    print(f"표본 생성: {', '.join(rebuilt) or '변경 없음'} ({(time.perf_counter() - start) * 1000:.1f}ms)")
+    conn = sqlite3.connect(_ro_uri(args.db_path), uri=True)
+    start = time.perf_counter()
+    result = approximate(conn, args.table, args.aggregates, args.group_by, args.where, args.joins, limit=10,
+                         sample_path=samples_path)
+    approx_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    exact = conn.execute(exact_query(args.table, args.aggregates, args.group_by, args.where, args.joins)).fetchall()
+    exact_ms = (time.perf_counter() - start) * 1000
+    print(json.dumps(result["sample"], ensure_ascii=False))
+    width = len(args.group_by)
+    exact_by_key = {tuple(row[:width]): row[width:] for row in exact}
+    for item in result["rows"]:
+        key = tuple(item[g] for g in args.group_by)
+        for i, text in enumerate(args.aggregates):
+            est = item[text.strip()]
+            truth = exact_by_key.get(key, [None] * len(args.aggregates))[i]
+            inside = est["ci95"] is not None and truth is not None \
+                and est["ci95"][0] <= round(truth, 4) <= est["ci95"][1]
+            print(f"  {key} {text}: 추정 {est['estimate']} {est['ci95']} / 정확 {truth} {'✓' if inside else '✗'}")
+    print(f"근사 {approx_ms:.2f}ms, 정확 {exact_ms:.2f}ms")
+    conn.close()
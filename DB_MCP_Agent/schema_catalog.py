@@ -0,0 +1,193 @@
+# schema_catalog.py
+# 서버 시작 시 한 번 만들어 두는 스키마 카탈로그
+#  - 테이블별 컬럼/타입, 외래키, 인덱스, 행 수, 샘플 행을 메모리에 보관
+#  - 스키마 조회 도구는 매번 DB를 반영(reflection)하지 않고 딕셔너리만 읽음
+#  - PRAGMA schema_version이 바뀐 경우에만 다시 생성
+
+import os
+import sqlite3
+import threading
+from urllib.parse import quote
+
+
+def _quote_ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+class SchemaCatalog:
+    """
+    테이블 이름(대소문자 무시)으로 스키마 정보를 바로 찾을 수 있는 카탈로그입니다.
+    """
+
+    def __init__(self, db_path: str, sample_rows: int = 3, exclude: set[str] | None = None):
+        self.db_path = db_path
+        self.sample_rows = sample_rows
+        # 카탈로그에서 숨길 테이블 이름 (요약/검색/표본 관리용 테이블 등)
+        self.exclude = set(exclude or ())
+        self.tables: dict[str, dict] = {}
+        # sqlite_stat1 통계: {(테이블, 인덱스): [전체 행 수, 키당 평균 행 수, ...]}
+        self.index_stats: dict[tuple[str, str], list[int]] = {}
+        self.schema_version = None
+        self._by_lower: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+        uri = f"file:{quote(os.path.abspath(db_path))}?mode=ro"
+        self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        self.build()
+
+    # --------------------------------------------------------
+    # 카탈로그 생성
+    # --------------------------------------------------------
+    def _read_version(self) -> int:
+        return self._conn.execute("PRAGMA schema_version").fetchone()[0]
+
+    def _describe_table(self, name: str, create_sql: str) -> dict:
+        conn = self._conn
+        ident = _quote_ident(name)
+
+        columns = [
+            {
+                "name": col_name,
+                "type": col_type,
+                "not_null": bool(not_null),
+                "default": default,
+                "primary_key": bool(pk),
+            }
+            for _, col_name, col_type, not_null, default, pk in conn.execute(f"PRAGMA table_info({ident})")
+        ]
+
+        foreign_keys = [
+            {"column": src, "references_table": ref_table, "references_column": ref_col}
+            for _, _, ref_table, src, ref_col, *_ in conn.execute(f"PRAGMA foreign_key_list({ident})")
+        ]
+
+        indexes = []
+        for _, index_name, unique, origin, _ in conn.execute(f"PRAGMA index_list({ident})"):
+            index_cols = [row[2] for row in conn.execute(f"PRAGMA index_info({_quote_ident(index_name)})")]
+            sql_row = conn.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'index' AND name = ?", (index_name,)
+            ).fetchone()
+            indexes.append({
+                "name": index_name,
+                "columns": index_cols,
+                "unique": bool(unique),
+                "origin": origin,   # c: CREATE INDEX, u: UNIQUE 제약, pk: 기본키
+                "sql": sql_row[0] if sql_row else None,
+            })
+
+        row_count = conn.execute(f"SELECT COUNT(*) FROM {ident}").fetchone()[0]
+        samples = conn.execute(f"SELECT * FROM {ident} LIMIT {int(self.sample_rows)}").fetchall()
+
+        table = {
+            "name": name,
+            "sql": create_sql,
+            "columns": columns,
+            "foreign_keys": foreign_keys,
+            "indexes": indexes,
+            "row_count": row_count,
+            "sample_rows": [list(r) for r in samples],
+        }
+        table["info"] = self._render_info(table)
+        return table
+
+    def _read_index_stats(self) -> dict[tuple[str, str], list[int]]:
+        """ANALYZE로 만들어진 sqlite_stat1이 있으면 인덱스별 통계를 읽습니다."""
+        exists = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+        ).fetchone()
+        if not exists:
+            return {}
+        stats = {}
+        for tbl, idx, stat in self._conn.execute("SELECT tbl, idx, stat FROM sqlite_stat1"):
+            numbers = []
+            for token in (stat or "").split():
+                if not token.isdigit():
+                    break   # "unordered" 같은 옵션 토큰 이후는 무시
+                numbers.append(int(token))
+            if numbers:
+                stats[(tbl, idx)] = numbers
+        return stats
+
+    def _read_internal_tables(self) -> set[str]:
+        """전문 검색(FTS5) 인덱스 같은 가상 테이블과 그 내부(shadow) 테이블 이름"""
+        try:
+            return {
+                name for _, name, kind, *_ in self._conn.execute("PRAGMA table_list")
+                if kind in ("virtual", "shadow")
+            }
+        except sqlite3.Error:
+            # PRAGMA table_list가 없는 SQLite(3.37 미만)
+            return set()
+
+    def _render_info(self, table: dict) -> str:
+        """SQLDatabase.get_table_info와 같은 형식(DDL + 샘플 행)의 텍스트를 만듭니다."""
+        lines = [f"\n{table['sql']}"]
+        for index in table["indexes"]:
+            if index["sql"]:
+                lines.append(f"{index['sql']}")
+        header = "\t".join(c["name"] for c in table["columns"])
+        rows = "\n".join("\t".join(str(v)[:100] for v in row) for row in table["sample_rows"])
+        lines.append(
+            f"\n/*\n{len(table['sample_rows'])} rows from {table['name']} table "
+            f"(total {table['row_count']} rows):\n{header}\n{rows}\n*/"
+        )
+        return "\n".join(lines)
+
+    def build(self) -> None:
+        """모든 사용자 테이블을 읽어 카탈로그를 새로 만듭니다."""
+        with self._lock:
+            version = self._read_version()
+            master = self._conn.execute(
+                "SELECT name, sql FROM sqlite_master "
+                "WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+            ).fetchall()
+            hidden = self._read_internal_tables() | self.exclude
+            tables = {name: self._describe_table(name, sql) for name, sql in master if name not in hidden}
+            index_stats = self._read_index_stats()
+            # 완성된 딕셔너리를 한 번에 교체하여 조회 중인 요청이 중간 상태를 보지 않도록 함
+            self.tables = tables
+            self.index_stats = index_stats
+            self._by_lower = {name.lower(): name for name in tables}
+            self.schema_version = version
+
+    def reload_index_stats(self) -> None:
+        """ANALYZE 뒤에 sqlite_stat1만 다시 읽습니다 (스키마가 그대로이면 build()가 실행되지 않으므로)."""
+        with self._lock:
+            self.index_stats = self._read_index_stats()
+
+    def refresh_if_changed(self) -> bool:
+        """스키마 버전이 바뀌었으면 카탈로그를 다시 만들고 True를 반환합니다."""
+        with self._lock:
+            changed = self._read_version() != self.schema_version
+        if changed:
+            self.build()
+        return changed
+
+    # --------------------------------------------------------
+    # 조회
+    # --------------------------------------------------------
+    def table_names(self) -> list[str]:
+        self.refresh_if_changed()
+        return list(self.tables)
+
+    def get(self, table_name: str) -> dict | None:
+        self.refresh_if_changed()
+        name = self._by_lower.get(table_name.strip().strip('"').lower())
+        return self.tables.get(name) if name else None
+
+    def table_info(self, table_names: list[str]) -> str:
+        """여러 테이블의 스키마 텍스트를 이어 붙여 반환합니다. 없는 테이블이 있으면 ValueError."""
+        found, missing = [], []
+        for name in table_names:
+            table = self.get(name)
+            if table is None:
+                missing.append(name)
+            else:
+                found.append(table["info"])
+        if missing:
+            raise ValueError(f"테이블을 찾을 수 없습니다: {', '.join(missing)}")
+        return "\n\n".join(found)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,236 @@
+# server_metrics.py
+# 도구/리소스 호출 지표 (호출 수, 지연 시간 히스토그램, 반환 행 수, 응답 크기, 캐시 적중률)
+#  - 지연 시간은 고정 버킷 히스토그램으로 누적 (호출마다 bisect 한 번 + 정수 더하기, 샘플을 보관하지 않음)
+#  - p50/p95/p99는 히스토그램 버킷 안에서 선형 보간한 근삿값
+#  - 호출 하나의 기록은 contextvar로 전달하므로, 쿼리 실행 경로에서 행 수/캐시 적중을 바로 더할 수 있음
+#  - prometheus_client가 있으면 같은 지표를 Prometheus 텍스트 형식으로 내보냄 (수집 시점에 읽기만 함)
+
+import bisect
+import contextvars
+import threading
+import time
+
+# 지연 시간 버킷 상한 (초). 마지막 버킷(+Inf)은 자동으로 추가
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_current: contextvars.ContextVar = contextvars.ContextVar("server_metrics_call", default=None)
+
+
+class CallRecord:
+    """진행 중인 호출 하나에서 쿼리 실행 경로가 채우는 값 (반환 행 수, 결과 캐시 적중/미스, 쿼리 오류)."""
+
+    __slots__ = ("rows", "cache_hits", "cache_misses", "query_errors")
+
+    def __init__(self):
+        self.rows = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.query_errors = 0
+
+
+def note_query(rows: int | None, cached: bool | None = None, error: bool = False) -> None:
+    """
+    현재 호출(도구/리소스)에 쿼리 결과를 더합니다. 지표를 수집하지 않는 호출이면 아무것도 하지 않습니다.
+    cached가 None이면 결과 캐시를 거치지 않은 실행입니다.
+    """
+    record = _current.get()
+    if record is None:
+        return
+    if rows:
+        record.rows += rows
+    if cached is not None:
+        if cached:
+            record.cache_hits += 1
+        else:
+            record.cache_misses += 1
+    if error:
+        record.query_errors += 1
+
+
+class _Series:
+    """도구 하나(또는 리소스 종류 하나)의 누적 지표."""
+
+    __slots__ = ("calls", "errors", "buckets", "total", "max", "rows", "bytes",
+                 "cache_hits", "cache_misses", "query_errors")
+
+    def __init__(self, bucket_count: int):
+        self.calls = 0
+        self.errors = 0
+        self.buckets = [0] * bucket_count
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.bytes = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.query_errors = 0
+
+
+def _percentile(counts: list[int], bounds: tuple, calls: int, maximum: float, q: float) -> float:
+    """히스토그램에서 q 분위수를 버킷 안 선형 보간으로 추정합니다 (관측 최댓값을 넘지 않음)."""
+    target = q * calls
+    cumulative = 0
+    for i, count in enumerate(counts):
+        if count and cumulative + count >= target:
+            lower = bounds[i - 1] if i > 0 else 0.0
+            upper = bounds[i] if i < len(bounds) else maximum
+            value = lower + (upper - lower) * (target - cumulative) / count
+            return min(value, maximum)
+        cumulative += count
+    return maximum
+
+
+class ServerMetrics:
+    """
+    도구/리소스별 호출 지표를 누적합니다.
+
+    begin()으로 호출을 시작하고 finish()로 실행 시간, 오류 여부, 응답 크기를 기록합니다.
+    그 사이 같은 컨텍스트에서 note_query()로 더한 행 수/캐시 적중도 함께 합산됩니다.
+    """
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.started_at = time.time()
+        self._series: dict[tuple[str, str], _Series] = {}
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------------
+    # 기록
+    # --------------------------------------------------------
+    def begin(self) -> tuple[CallRecord, contextvars.Token, float]:
+        record = CallRecord()
+        return record, _current.set(record), time.perf_counter()
+
+    def finish(self, call: tuple, kind: str, name: str, error: bool = False, size: int = 0) -> float:
+        """begin()이 반환한 값으로 호출 하나를 기록하고 실행 시간(초)을 반환합니다."""
+        record, token, start = call
+        elapsed = time.perf_counter() - start
+        _current.reset(token)
+        index = bisect.bisect_left(self.buckets, elapsed)
+        with self._lock:
+            series = self._series.get((kind, name))
+            if series is None:
+                series = self._series[(kind, name)] = _Series(len(self.buckets) + 1)
+            series.calls += 1
+            series.errors += bool(error)
+            series.buckets[index] += 1
+            series.total += elapsed
+            if elapsed > series.max:
+                series.max = elapsed
+            series.rows += record.rows
+            series.bytes += size
+            series.cache_hits += record.cache_hits
+            series.cache_misses += record.cache_misses
+            series.query_errors += record.query_errors
+        return elapsed
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+            self.started_at = time.time()
+
+    # --------------------------------------------------------
+    # 조회
+    # --------------------------------------------------------
+    def _copy(self) -> list[tuple[str, str, _Series]]:
+        """잠금 안에서 현재 값을 복사합니다 (보고서/수집은 잠금 밖에서 계산)."""
+        copies = []
+        with self._lock:
+            for (kind, name), series in self._series.items():
+                copy = _Series(0)
+                for slot in _Series.__slots__:
+                    setattr(copy, slot, getattr(series, slot))
+                copy.buckets = list(series.buckets)
+                copies.append((kind, name, copy))
+        return sorted(copies, key=lambda item: (item[0], item[1]))
+
+    def snapshot(self) -> dict:
+        """
+        {"tools": {이름: 지표}, "resources": {종류: 지표}} 형식의 보고서를 반환합니다.
+        지연 시간은 밀리초이며, 분위수는 히스토그램에서 추정한 값입니다.
+        """
+        report = {
+            "since": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started_at)),
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "buckets_ms": [b * 1000 for b in self.buckets],
+            "tools": {},
+            "resources": {},
+        }
+        for kind, name, s in self._copy():
+            lookups = s.cache_hits + s.cache_misses
+            entry = {
+                "calls": s.calls,
+                "errors": s.errors,
+                "latency_ms": {
+                    "mean": round(s.total / s.calls * 1000, 3),
+                    "p50": round(_percentile(s.buckets, self.buckets, s.calls, s.max, 0.50) * 1000, 3),
+                    "p95": round(_percentile(s.buckets, self.buckets, s.calls, s.max, 0.95) * 1000, 3),
+                    "p99": round(_percentile(s.buckets, self.buckets, s.calls, s.max, 0.99) * 1000, 3),
+                    "max": round(s.max * 1000, 3),
+                },
+                "histogram": s.buckets,
+                "rows": s.rows,
+                "bytes": s.bytes,
+            }
+            if lookups:
+                entry["cache"] = {
+                    "hits": s.cache_hits,
+                    "misses": s.cache_misses,
+                    "hit_rate": round(s.cache_hits / lookups, 4),
+                }
+            if s.query_errors:
+                entry["query_errors"] = s.query_errors
+            report["tools" if kind == "tool" else "resources"][name] = entry
+        return report
+
+    def prometheus_registry(self, extra=None):
+        """
+        이 지표를 내보내는 prometheus_client CollectorRegistry를 만듭니다.
+        extra()가 주어지면 수집할 때마다 호출하여 {데이터베이스: cache.stats()}를 함께 내보냅니다.
+        prometheus_client가 설치되어 있지 않으면 ImportError.
+        """
+        from prometheus_client import CollectorRegistry
+        from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, HistogramMetricFamily
+
+        metrics = self
+
+        class _Collector:
+            def collect(self):
+                labels = ["kind", "name"]
+                latency = HistogramMetricFamily(
+                    "chinook_mcp_request_duration_seconds", "MCP 도구/리소스 호출 지연 시간", labels=labels)
+                calls = CounterMetricFamily("chinook_mcp_requests", "MCP 호출 수", labels=labels)
+                errors = CounterMetricFamily("chinook_mcp_request_errors", "오류로 끝난 MCP 호출 수", labels=labels)
+                rows = CounterMetricFamily("chinook_mcp_rows_returned", "쿼리가 반환한 행 수", labels=labels)
+                size = CounterMetricFamily("chinook_mcp_response_bytes", "직렬화한 응답 크기(바이트)", labels=labels)
+                lookups = CounterMetricFamily(
+                    "chinook_mcp_result_cache_lookups", "호출별 결과 캐시 조회", labels=labels + ["result"])
+                for kind, name, s in metrics._copy():
+                    cumulative, buckets = 0, []
+                    for bound, count in zip(list(metrics.buckets) + [float("inf")], s.buckets):
+                        cumulative += count
+                        buckets.append((str(bound) if bound != float("inf") else "+Inf", cumulative))
+                    latency.add_metric([kind, name], buckets, s.total)
+                    calls.add_metric([kind, name], s.calls)
+                    errors.add_metric([kind, name], s.errors)
+                    rows.add_metric([kind, name], s.rows)
+                    size.add_metric([kind, name], s.bytes)
+                    lookups.add_metric([kind, name, "hit"], s.cache_hits)
+                    lookups.add_metric([kind, name, "miss"], s.cache_misses)
+                yield from (latency, calls, errors, rows, size, lookups)
+
+                if extra is not None:
+                    entries = GaugeMetricFamily(
+                        "chinook_result_cache_entries", "데이터베이스별 결과 캐시 항목 수", labels=["database"])
+                    cache = CounterMetricFamily(
+                        "chinook_result_cache_lookups", "데이터베이스별 결과 캐시 조회", labels=["database", "result"])
+                    for database, stats in extra().items():
+                        entries.add_metric([database], stats["entries"])
+                        cache.add_metric([database, "hit"], stats["hits"])
+                        cache.add_metric([database, "miss"], stats["misses"])
+                    yield entries
+                    yield cache
+
+        registry = CollectorRegistry(auto_describe=False)
+        registry.register(_Collector())
+        return registry
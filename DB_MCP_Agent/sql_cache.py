@@ -0,0 +1,147 @@
+# sql_cache.py
+# execute_sql_query 결과용 LRU 캐시
+#  - 정규화한 SQL 텍스트를 키로 사용
+#  - PRAGMA data_version 또는 DB 파일 mtime이 바뀌면 전체 무효화
+#  - 쿼리 실행 전에 version()을 받아 두고 put()에 넘기면, 실행 중에 데이터가 바뀐 결과는 저장하지 않음
+#  - 적중/미스/축출 카운터 제공
+
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from urllib.parse import quote
+
+# 문자열 리터럴('...')과 따옴표 식별자("...")는 정규화 대상에서 제외
+_LITERAL_RE = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")")
+_SPACE_RE = re.compile(r"\s+")
+
+# 실행할 때마다 결과가 달라지는 함수가 포함된 쿼리는 캐시하지 않음
+_VOLATILE_RE = re.compile(
+    r"\b(random|randomblob|current_timestamp|current_date|current_time|changes|last_insert_rowid)\b"
+    r"|'now'",
+    re.IGNORECASE,
+)
+
+
+def normalize_sql(query: str) -> str:
+    """
+    리터럴 밖의 연속 공백을 하나로 합치고 끝의 세미콜론을 제거합니다.
+    리터럴 내부와 대소문자는 결과에 영향을 줄 수 있으므로 그대로 둡니다.
+    """
+    parts = _LITERAL_RE.split(query.strip())
+    for i in range(0, len(parts), 2):
+        parts[i] = _SPACE_RE.sub(" ", parts[i])
+    return "".join(parts).strip().rstrip(";").strip()
+
+
+def is_cacheable(normalized: str) -> bool:
+    """결정적인(deterministic) 조회 쿼리만 캐시합니다."""
+    head = normalized[:6].lower()
+    if not (head.startswith("select") or head.startswith("with")):
+        return False
+    return _VOLATILE_RE.search(normalized) is None
+
+
+class QueryCache:
+    """
+    크기 제한이 있는 LRU 쿼리 결과 캐시입니다.
+    조회 시마다 데이터베이스 버전을 확인하여 변경이 감지되면 전체를 비웁니다.
+
+        version = cache.version()       # 쿼리 실행 전
+        rows = run(query)
+        cache.put(key, rows, version)   # 그 사이 데이터가 바뀌었거나 비웠으면 저장하지 않음
+    """
+
+    def __init__(self, db_path: str, max_entries: int = 256, max_rows: int = 10_000):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_rows = max_rows  # 이보다 큰 결과는 캐시하지 않음
+        self._entries: OrderedDict[str, list[tuple]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        # data_version은 "다른 연결"의 커밋을 감지하므로 감시 전용 연결을 유지
+        uri = f"file:{quote(os.path.abspath(db_path))}?mode=ro"
+        self._watch = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        self._version = self._current_version()
+        self._generation = 0    # clear()할 때마다 증가 (비우기 전에 실행한 결과를 저장하지 않도록)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _current_version(self) -> tuple[int, int]:
+        data_version = self._watch.execute("PRAGMA data_version").fetchone()[0]
+        try:
+            mtime = os.stat(self.db_path).st_mtime_ns
+        except OSError:
+            mtime = 0
+        return data_version, mtime
+
+    def _check_version(self) -> None:
+        # 호출자가 self._lock을 잡고 있어야 함
+        version = self._current_version()
+        if version != self._version:
+            self._version = version
+            if self._entries:
+                self._entries.clear()
+                self.invalidations += 1
+
+    def get(self, key: str) -> list[tuple] | None:
+        with self._lock:
+            self._check_version()
+            rows = self._entries.get(key)
+            if rows is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return rows
+
+    def version(self) -> tuple[int, int, int]:
+        """현재 캐시 버전 (비운 횟수, data_version, mtime). 쿼리를 실행하기 전에 받아 put()에 넘깁니다."""
+        with self._lock:
+            self._check_version()
+            return (self._generation, *self._version)
+
+    def put(self, key: str, rows: list[tuple], version: tuple | None = None) -> None:
+        """
+        결과를 저장합니다. version을 주면 그 뒤로 데이터가 바뀌었거나 캐시를 비운 경우
+        (실행하는 동안 바뀐 데이터로 만든 결과일 수 있으므로) 저장하지 않습니다.
+        """
+        if len(rows) > self.max_rows:
+            return
+        with self._lock:
+            if version is not None:
+                self._check_version()
+                if version != (self._generation, *self._version):
+                    return
+            self._entries[key] = rows
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._watch.close()
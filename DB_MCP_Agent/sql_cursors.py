@@ -0,0 +1,185 @@
+# sql_cursors.py
+# 대용량 결과를 페이지 단위로 전달하기 위한 서버 측 커서 관리
+#  - 커서마다 전용 읽기 전용 연결을 열어 두고 fetchmany로 한 페이지씩 읽음
+#  - 전체 결과를 메모리에 올리지 않으므로 테이블 크기와 무관하게 첫 행까지의 시간이 일정
+#  - 일정 시간 사용되지 않은 커서는 자동으로 닫힘
+#  - 페이지를 읽을 때마다 실행 시간 예산을 적용
+
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from urllib.parse import quote
+
+from sql_engine import QueryControl
+
+
+class ResultCursor:
+    """열려 있는 쿼리 하나와 현재까지 읽은 페이지 정보를 보관합니다."""
+
+    def __init__(self, conn: sqlite3.Connection, query: str, page_size: int):
+        self.id = uuid.uuid4().hex[:12]
+        self.conn = conn
+        self.cursor = conn.execute(query)
+        self.columns = [d[0] for d in self.cursor.description or ()]
+        self.page_size = page_size
+        self.page = -1              # 마지막으로 읽은 페이지 번호
+        self.last_rows: list = []   # 같은 페이지 재요청에 대비해 직전 페이지만 보관
+        self.exhausted = False
+        self.last_used = time.monotonic()
+        self.lock = threading.Lock()
+
+    def fetch(self, page: int) -> dict:
+        """
+        page 번호의 행들을 반환합니다.
+        커서는 앞으로만 진행하므로 직전 페이지 재요청 또는 다음 페이지만 허용합니다.
+        """
+        with self.lock:
+            self.last_used = time.monotonic()
+            if page == self.page + 1:
+                rows = [] if self.exhausted else self.cursor.fetchmany(self.page_size)
+                # 한 행을 미리 읽지 않고, 페이지가 꽉 차지 않았으면 끝으로 판단
+                if len(rows) < self.page_size:
+                    self.exhausted = True
+                self.page = page
+                self.last_rows = [list(r) for r in rows]
+            elif page != self.page:
+                raise ValueError(
+                    f"커서는 순차적으로만 읽을 수 있습니다. 요청 가능한 페이지: {self.page} 또는 {self.page + 1}"
+                )
+            return {
+                "cursor_id": self.id,
+                "page": self.page,
+                "columns": self.columns,
+                "rows": self.last_rows,
+                "has_more": not self.exhausted,
+            }
+
+    def close(self) -> None:
+        with self.lock:
+            try:
+                self.cursor.close()
+            finally:
+                self.conn.close()
+
+
+class CursorRegistry:
+    """
+    열린 커서들을 ID로 관리합니다.
+    커서마다 별도 연결을 사용하므로 연결 풀을 오래 점유하지 않습니다.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        idle_timeout: float = 300.0,
+        max_cursors: int = 32,
+        timeout: float | None = None,
+        connect=None,
+    ):
+        self.db_path = db_path
+        self._factory = connect  # 파일 대신 사용할 연결 함수 (메모리 스냅숏)
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout  # 페이지 하나를 읽는 데 허용하는 최대 시간(초)
+        self.max_cursors = max_cursors
+        self._cursors: dict[str, ResultCursor] = {}
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._factory is not None:
+            # 커서는 연 시점의 스냅숏을 끝까지 읽으므로 스냅숏이 교체되어도 페이지가 일관됨
+            return self._factory()
+        uri = f"file:{quote(os.path.abspath(self.db_path))}?mode=ro"
+        return sqlite3.connect(uri, uri=True, check_same_thread=False)
+
+    @contextmanager
+    def _budget(self, conn: sqlite3.Connection):
+        control = QueryControl(self.timeout)
+        control.attach(conn)
+        try:
+            yield
+        except sqlite3.OperationalError as e:
+            translated = control.translate(e)
+            if translated is e:
+                raise
+            raise translated from e
+        finally:
+            control.detach()
+
+    def open(self, query: str, page_size: int) -> dict:
+        """커서를 열고 첫 페이지(0)를 반환합니다. 결과가 한 페이지로 끝나면 바로 닫습니다."""
+        conn = self._connect()
+        try:
+            with self._budget(conn):
+                cur = ResultCursor(conn, query, page_size)
+                first = cur.fetch(0)
+        except Exception:
+            conn.close()
+            raise
+
+        if not first["has_more"]:
+            cur.close()
+            first["cursor_id"] = None
+            return first
+
+        with self._lock:
+            # 최대 개수를 넘으면 가장 오래 사용되지 않은 커서부터 닫음
+            while len(self._cursors) >= self.max_cursors:
+                oldest = min(self._cursors.values(), key=lambda c: c.last_used)
+                self._cursors.pop(oldest.id).close()
+            self._cursors[cur.id] = cur
+        return first
+
+    def fetch(self, cursor_id: str, page: int) -> dict:
+        with self._lock:
+            cur = self._cursors.get(cursor_id)
+        if cur is None:
+            raise LookupError(f"커서를 찾을 수 없습니다 (만료되었거나 이미 닫힘): {cursor_id}")
+        try:
+            with self._budget(cur.conn):
+                result = cur.fetch(page)
+        except ValueError:
+            # 잘못된 페이지 번호: 커서는 그대로 유지
+            raise
+        except Exception:
+            # 예산 초과 등으로 중단된 커서는 더 이상 이어 읽을 수 없으므로 닫음
+            self.close(cursor_id)
+            raise
+        # 마지막 페이지까지 읽었으면 연결을 바로 반환
+        if not result["has_more"]:
+            self.close(cursor_id)
+        return result
+
+    def close(self, cursor_id: str) -> bool:
+        with self._lock:
+            cur = self._cursors.pop(cursor_id, None)
+        if cur is None:
+            return False
+        cur.close()
+        return True
+
+    def reap_idle(self) -> int:
+        """idle_timeout 동안 사용되지 않은 커서를 닫고, 닫은 개수를 반환합니다."""
+        deadline = time.monotonic() - self.idle_timeout
+        with self._lock:
+            expired = [c for c in self._cursors.values() if c.last_used < deadline]
+            for c in expired:
+                del self._cursors[c.id]
+        for c in expired:
+            c.close()
+        return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._cursors)
+
+    def __contains__(self, cursor_id: str) -> bool:
+        return cursor_id in self._cursors
+
+    def close_all(self) -> None:
+        with self._lock:
+            cursors = list(self._cursors.values())
+            self._cursors.clear()
+        for c in cursors:
+            c.close()
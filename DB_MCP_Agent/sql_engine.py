@@ -0,0 +1,323 @@
+# sql_engine.py
+# Chinook MCP 서버용 읽기 전용 SQLite 실행 엔진
+#  - mode=ro URI로 연 연결들을 풀(pool)로 관리 (또는 connect 함수로 연 메모리 스냅숏 연결)
+#  - 쿼리는 전용 스레드 풀에서 실행하여 이벤트 루프를 막지 않음
+#  - 진행 핸들러(progress handler)와 interrupt()로 시간/행 수 예산 및 취소 처리
+
+import asyncio
+import functools
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import quote
+
+
+# 진행 핸들러를 호출할 SQLite VM 명령 간격 (작을수록 반응이 빠르고 부하가 큼)
+PROGRESS_STEPS = 1000
+# 연결마다 보관하는 컴파일된 문장(prepared statement) 수
+# 자유 형식 쿼리가 많아도 이름 붙은 쿼리(named_queries.py)의 문장이 밀려나지 않을 만큼 크게 설정
+STATEMENT_CACHE_SIZE = 256
+
+
+# --------------------------------------------------------
+# 0️⃣ 쿼리 예산 / 취소
+# --------------------------------------------------------
+class BudgetExceeded(Exception):
+    """쿼리가 실행 시간 또는 행 수 한도를 넘었을 때 발생합니다."""
+
+    def __init__(self, kind: str, limit):
+        self.kind = kind      # "time" 또는 "rows"
+        self.limit = limit
+        if kind == "time":
+            detail = f"실행 시간이 {limit}초를 넘었습니다"
+        else:
+            detail = f"결과 행 수가 {limit}개를 넘었습니다"
+        super().__init__(
+            f"쿼리 예산 초과: {detail}. "
+            "WHERE 조건, 집계 또는 LIMIT를 추가하여 쿼리를 다시 작성하세요."
+        )
+
+
+class QueryCancelled(Exception):
+    """클라이언트 요청 취소 등으로 실행 중인 쿼리가 중단되었을 때 발생합니다."""
+
+
+class ResultRows(list):
+    """
+    쿼리 결과 행 목록에 컬럼 이름을 붙인 것입니다.
+    list를 그대로 상속하므로 기존처럼 행 목록으로 쓸 수 있고, str()도 list와 같습니다.
+    """
+
+    def __init__(self, rows=(), columns: list[str] | None = None):
+        super().__init__(rows)
+        self.columns = columns or []
+
+
+class QueryControl:
+    """
+    실행 중인 쿼리 하나의 마감 시간과 취소 상태를 관리합니다.
+    attach()한 연결에 진행 핸들러를 걸어 두고, cancel()은 다른 스레드에서
+    conn.interrupt()를 호출하여 실행 중인 문장을 즉시 중단시킵니다.
+    """
+
+    def __init__(self, timeout: float | None = None):
+        self.timeout = timeout
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.cancelled = False
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def restart(self) -> None:
+        """마감 시간을 지금부터 다시 계산합니다 (실행할 스레드를 기다린 시간을 예산에서 뺄 때)."""
+        self.deadline = time.monotonic() + self.timeout if self.timeout else None
+
+    def _check(self) -> int:
+        # 0이 아닌 값을 반환하면 SQLite가 실행을 중단 (OperationalError: interrupted)
+        if self.cancelled:
+            return 1
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            return 1
+        return 0
+
+    def attach(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            self._conn = conn
+            conn.set_progress_handler(self._check, PROGRESS_STEPS)
+            if self.cancelled:
+                conn.interrupt()
+
+    def detach(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.set_progress_handler(None, 0)
+                self._conn = None
+
+    def cancel(self) -> None:
+        with self._lock:
+            self.cancelled = True
+            if self._conn is not None:
+                self._conn.interrupt()
+
+    def translate(self, exc: sqlite3.Error) -> Exception:
+        """중단으로 인한 sqlite3 오류를 예산 초과/취소 예외로 바꿉니다."""
+        if "interrupt" not in str(exc):
+            return exc
+        if self.cancelled:
+            return QueryCancelled("쿼리가 취소되었습니다.")
+        return BudgetExceeded("time", self.timeout)
+
+
+# --------------------------------------------------------
+# 1️⃣ 읽기 전용 연결 풀
+# --------------------------------------------------------
+class ConnectionPool:
+    """
+    읽기 전용 SQLite 연결을 미리 만들어 두고 재사용하는 풀입니다.
+    각 연결은 한 번에 하나의 스레드만 사용하며, 사용 후 풀로 반환됩니다.
+    connect를 주면 파일 대신 connect(**kwargs)가 반환하는 연결(예: 메모리 스냅숏)을 사용합니다.
+    """
+
+    def __init__(self, db_path: str, size: int = 8, enable_wal: bool = False, connect=None):
+        self.db_path = db_path
+        self.size = size
+        self._factory = connect
+        # 크기 제한 없음: reconnect() 도중 반환된 이전 연결이 잠시 함께 들어 있을 수 있음 (acquire에서 닫음)
+        self._idle: queue.Queue = queue.Queue()
+        self._all: list[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+        # WAL 모드는 원본 파일 헤더에 기록되고 -wal/-shm 파일이 생기므로 enable_wal일 때만 쓰기 연결로 한 번 설정
+        # (쓸 수 없는 파일이면 건너뛰고, 읽기 전용 파일 시스템 등으로 실패하면 기본 저널 모드로 계속 진행)
+        if enable_wal:
+            self._enable_wal()
+
+        for _ in range(size):
+            conn = self._connect()
+            self._all.append(conn)
+            self._idle.put(conn)
+
+    def _enable_wal(self) -> None:
+        if not os.access(self.db_path, os.W_OK):
+            print(f"쓸 수 없는 파일이므로 WAL 모드를 설정하지 않음: {self.db_path}", file=sys.stderr)
+            return
+        try:
+            conn = sqlite3.connect(self.db_path)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"WAL 모드 설정 실패 (기본 모드로 진행): {e}", file=sys.stderr)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._factory is not None:
+            conn = self._factory(cached_statements=STATEMENT_CACHE_SIZE)
+        else:
+            # mode=ro: 이 연결로는 어떤 쓰기도 불가능
+            uri = f"file:{quote(os.path.abspath(self.db_path))}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE)
+        conn.execute("PRAGMA query_only=ON")
+        return conn
+
+    def acquire(self, timeout: float | None = None) -> sqlite3.Connection:
+        while True:
+            try:
+                conn = self._idle.get(timeout=timeout)
+            except queue.Empty:
+                raise TimeoutError("사용 가능한 데이터베이스 연결이 없습니다.") from None
+            with self._lock:
+                if conn in self._all:
+                    return conn
+            # reconnect() 이전의 연결: 닫고 새 연결을 기다림
+            conn.close()
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            current = conn in self._all
+        if current:
+            self._idle.put(conn)
+        else:
+            conn.close()
+
+    def reconnect(self) -> None:
+        """
+        모든 연결을 새로 엽니다 (메모리 스냅숏 교체 후 새 스냅숏을 읽도록).
+        쉬고 있는 이전 연결은 바로 닫고, 사용 중인 연결은 반환될 때 닫습니다.
+        """
+        fresh = [self._connect() for _ in range(self.size)]
+        with self._lock:
+            self._all = fresh
+        while True:
+            try:
+                stale = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            stale.close()
+        for conn in fresh:
+            self._idle.put(conn)
+
+    @contextmanager
+    def connection(self, timeout: float | None = None):
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self) -> None:
+        with self._lock:
+            conns, self._all = self._all, []
+        for conn in conns:
+            conn.close()
+
+
+# --------------------------------------------------------
+# 2️⃣ 실행 엔진
+# --------------------------------------------------------
+class SQLEngine:
+    """
+    연결 풀과 전용 스레드 풀을 묶은 실행 엔진입니다.
+    sqlite3는 쿼리 실행 중 GIL을 해제하므로, 여러 도구 호출이
+    서로 다른 연결에서 실제로 동시에 실행됩니다.
+    """
+
+    def __init__(self, db_path: str, pool_size: int = 8, enable_wal: bool = False, connect=None):
+        self.db_path = db_path
+        self.pool = ConnectionPool(db_path, size=pool_size, enable_wal=enable_wal, connect=connect)
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="sql")
+
+    def execute(
+        self,
+        query: str,
+        params: tuple | dict = (),
+        timeout: float | None = None,
+        max_rows: int | None = None,
+        control: QueryControl | None = None,
+    ) -> ResultRows:
+        """
+        풀에서 연결을 빌려 쿼리를 실행하고 모든 행을 반환합니다. (동기)
+        반환값은 행 목록이며 columns 속성에 컬럼 이름이 들어 있습니다.
+        timeout(초) 또는 max_rows를 넘으면 BudgetExceeded가 발생합니다.
+        """
+        control = control or QueryControl(timeout)
+        with self.pool.connection() as conn:
+            control.attach(conn)
+            cursor = None
+            try:
+                cursor = conn.execute(query, params)
+                columns = [d[0] for d in cursor.description or ()]
+                if max_rows is None:
+                    return ResultRows(cursor.fetchall(), columns)
+                # 한도보다 한 행만 더 읽어 초과 여부를 판단 (전체를 읽지 않음)
+                rows = cursor.fetchmany(max_rows + 1)
+                if len(rows) > max_rows:
+                    raise BudgetExceeded("rows", max_rows)
+                return ResultRows(rows, columns)
+            except sqlite3.OperationalError as e:
+                translated = control.translate(e)
+                if translated is e:
+                    raise
+                raise translated from e
+            finally:
+                if cursor is not None:
+                    cursor.close()
+                control.detach()
+
+    def call(self, fn, *args, control: QueryControl | None = None):
+        """
+        풀에서 연결을 빌려 fn(conn, *args)를 실행합니다. (동기)
+        여러 문장을 한 연결(한 읽기 트랜잭션)에서 실행해야 할 때 사용하며, 예산/취소는 execute와 같습니다.
+        """
+        control = control or QueryControl()
+        with self.pool.connection() as conn:
+            control.attach(conn)
+            try:
+                return fn(conn, *args)
+            except sqlite3.OperationalError as e:
+                translated = control.translate(e)
+                if translated is e:
+                    raise
+                raise translated from e
+            finally:
+                control.detach()
+
+    async def run(self, fn, *args, **kwargs):
+        """임의의 블로킹 함수를 엔진 스레드 풀에서 실행합니다."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    async def execute_async(
+        self,
+        query: str,
+        params: tuple | dict = (),
+        timeout: float | None = None,
+        max_rows: int | None = None,
+    ) -> ResultRows:
+        """
+        이벤트 루프를 막지 않고 쿼리를 실행합니다.
+        호출한 작업이 취소되면(예: MCP 클라이언트의 요청 취소) 실행 중인 문장도 중단합니다.
+        """
+        control = QueryControl(timeout)
+        try:
+            return await self.run(self.execute, query, params, max_rows=max_rows, control=control)
+        except asyncio.CancelledError:
+            control.cancel()
+            raise
+
+    async def call_async(self, fn, *args, timeout: float | None = None):
+        """call()을 이벤트 루프를 막지 않고 실행합니다. 호출한 작업이 취소되면 실행 중인 문장도 중단합니다."""
+        control = QueryControl(timeout)
+        try:
+            return await self.run(self.call, fn, *args, control=control)
+        except asyncio.CancelledError:
+            control.cancel()
+            raise
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        self.pool.close()
@@ -0,0 +1,161 @@
+# sql_engine_async.py
+# aiosqlite 기반 비동기 읽기 전용 실행 엔진 (SQLEngine.execute_async와 같은 인터페이스)
+#  - 연결 풀은 asyncio.Queue: 빈 연결을 기다리는 호출은 스레드를 점유하지 않고 이벤트 루프에서 대기
+#  - aiosqlite 연결은 연결마다 전용 스레드 하나에서 실행되므로, 공유 스레드 풀로 작업을 넘기지 않고
+#    각 연결의 작업 큐로 바로 보냄 (쿼리 하나에 큐 왕복 4번: 진행 핸들러, 실행, 행 읽기, 커서 닫기)
+#  - 연결은 처음 쿼리할 때 이벤트 루프에서 열고, aclose()로 닫음 (서버 lifespan/레지스트리가 관리)
+#  - 시간/행 수 예산과 취소는 sql_engine.QueryControl을 그대로 사용
+#    (진행 핸들러가 마감 시간/취소 표시를 확인하므로 연결 스레드에서 실행 중인 문장도 바로 중단됨)
+#
+# aiosqlite는 이 엔진을 사용할 때만 불러옴 (CHINOOK_SQL_BACKEND=aiosqlite)
+
+import asyncio
+import os
+import sqlite3
+from urllib.parse import quote
+
+from sql_engine import PROGRESS_STEPS, STATEMENT_CACHE_SIZE, BudgetExceeded, QueryControl, ResultRows
+
+
+class AsyncSQLEngine:
+    """
+    aiosqlite 연결 풀로 쿼리를 실행하는 엔진입니다.
+    connect를 주면 파일 대신 connect(**kwargs)가 반환하는 연결(예: 메모리 스냅숏)을 사용합니다.
+    reconnect()는 어느 스레드에서나 호출할 수 있으며, 이후 반환되는 연결부터 새로 엽니다.
+    """
+
+    def __init__(self, db_path: str, pool_size: int = 8, connect=None):
+        self.db_path = db_path
+        self.size = pool_size
+        self._factory = connect
+        self._idle: asyncio.Queue | None = None
+        self._all: set = set()
+        self._generation = 0
+        self._open_lock: asyncio.Lock | None = None
+        self._closed = False
+
+    # --------------------------------------------------------
+    # 연결 풀
+    # --------------------------------------------------------
+    def _connector(self) -> sqlite3.Connection:
+        # aiosqlite 연결 스레드에서 호출됨
+        if self._factory is not None:
+            conn = self._factory(cached_statements=STATEMENT_CACHE_SIZE)
+        else:
+            uri = f"file:{quote(os.path.abspath(self.db_path))}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE)
+        conn.execute("PRAGMA query_only=ON")
+        return conn
+
+    async def _connect(self):
+        import aiosqlite
+
+        conn = aiosqlite.Connection(self._connector, 64)
+        # 닫지 못한 연결이 있어도 프로세스 종료를 막지 않도록
+        conn.daemon = True
+        await conn
+        conn.generation = self._generation
+        self._all.add(conn)
+        return conn
+
+    async def _ensure_open(self) -> None:
+        if self._idle is not None:
+            return
+        if self._open_lock is None:
+            self._open_lock = asyncio.Lock()
+        async with self._open_lock:
+            if self._idle is not None:
+                return
+            if self._closed:
+                raise sqlite3.ProgrammingError("엔진이 닫혔습니다.")
+            idle = asyncio.Queue()
+            for conn in await asyncio.gather(*(self._connect() for _ in range(self.size))):
+                idle.put_nowait(conn)
+            self._idle = idle
+
+    async def _acquire(self):
+        await self._ensure_open()
+        conn = await self._idle.get()
+        if conn is not None and conn.generation == self._generation:
+            return conn
+        if conn is not None:
+            # reconnect() 이전의 연결 (스냅숏 교체 전): 닫고 새로 엶
+            await self._discard(conn)
+        try:
+            return await self._connect()
+        except BaseException:
+            self._idle.put_nowait(None)   # 자리를 잃지 않도록 빈 자리를 넣어 두고 다음 acquire에서 다시 연결
+            raise
+
+    def _release(self, conn) -> None:
+        if self._closed:
+            asyncio.ensure_future(self._discard(conn))
+        else:
+            self._idle.put_nowait(conn)
+
+    async def _discard(self, conn) -> None:
+        self._all.discard(conn)
+        try:
+            await conn.close()
+        except Exception:
+            pass
+
+    def reconnect(self) -> None:
+        """모든 연결을 새로 열도록 표시합니다 (메모리 스냅숏 교체 후)."""
+        self._generation += 1
+
+    # --------------------------------------------------------
+    # 실행
+    # --------------------------------------------------------
+    async def execute_async(
+        self,
+        query: str,
+        params: tuple | dict = (),
+        timeout: float | None = None,
+        max_rows: int | None = None,
+    ) -> ResultRows:
+        """
+        쿼리를 실행하고 모든 행을 반환합니다. 반환값과 예외는 SQLEngine.execute_async와 같습니다.
+        호출한 작업이 취소되면 진행 핸들러가 실행 중인 문장을 중단합니다.
+        """
+        control = QueryControl(timeout)
+        conn = await self._acquire()
+        try:
+            # 같은 연결의 작업은 순서대로 실행되므로 이 쿼리에만 적용됨
+            await conn.set_progress_handler(control._check, PROGRESS_STEPS)
+            async with conn.execute(query, params) as cursor:
+                columns = [d[0] for d in cursor.description or ()]
+                if max_rows is None:
+                    return ResultRows(await cursor.fetchall(), columns)
+                rows = await cursor.fetchmany(max_rows + 1)
+                if len(rows) > max_rows:
+                    raise BudgetExceeded("rows", max_rows)
+                return ResultRows(rows, columns)
+        except asyncio.CancelledError:
+            control.cancel()
+            raise
+        except sqlite3.OperationalError as e:
+            translated = control.translate(e)
+            if translated is e:
+                raise
+            raise translated from e
+        finally:
+            self._release(conn)
+
+    def stats(self) -> dict:
+        return {
+            "backend": "aiosqlite",
+            "pool_size": self.size,
+            "open_connections": len(self._all),
+            "idle_connections": self._idle.qsize() if self._idle is not None else 0,
+        }
+
+    async def aclose(self) -> None:
+        """모든 연결을 닫습니다. 사용 중인 연결은 반환될 때 닫습니다."""
+        self._closed = True
+        if self._idle is None:
+            return
+        while not self._idle.empty():
+            conn = self._idle.get_nowait()
+            if conn is not None:
+                await self._discard(conn)
@@ -0,0 +1,229 @@
+# table_index.py
+# 질문과 관련 있는 테이블을 찾는 벡터 인덱스
+#  - 스키마 카탈로그의 테이블/컬럼 이름, 외래키, (선택) 설명 문서로 테이블별 문서를 만들어 임베딩
+#  - 질문을 같은 방식으로 임베딩하고 코사인 유사도로 상위 k개 테이블을 반환
+#  - 기본 임베딩은 외부 모델 없이 동작하는 해싱 임베딩(단어 + 글자 3-gram)이며,
+#    CHINOOK_EMBEDDING="모듈:함수"로 로컬 임베딩 모델을 연결할 수 있음
+#
+# 사용법: python table_index.py Chinook.db "which country has the highest sales" [--k 5]
+
+import importlib
+import json
+import math
+import re
+import threading
+import zlib
+
+# 해싱 임베딩 차원
+HASH_DIM = 1024
+
+_WORD_RE = re.compile(r"[A-Za-z]+|\d+|[^\W\d_]+", re.UNICODE)
+_CAMEL_RE = re.compile(r"(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])")
+
+
+def split_identifier(text: str) -> list[str]:
+    """InvoiceLine, billing_country 같은 식별자와 문장을 소문자 단어 목록으로 나눕니다."""
+    words = []
+    for token in _WORD_RE.findall(_CAMEL_RE.sub(" ", text)):
+        words.append(token.lower())
+    return words
+
+
+# 의미 없이 거의 모든 질문에 나오는 영어 단어 (해싱 임베딩에서 제외)
+_STOPWORDS = {
+    "a", "an", "the", "of", "in", "on", "for", "to", "by", "per", "and", "or", "with", "from", "at", "as",
+    "is", "are", "was", "were", "be", "has", "have", "had", "do", "does", "did", "which", "what", "who",
+    "whom", "how", "many", "much", "each", "every", "all", "any", "me", "show", "list", "give", "find",
+    "top", "most", "highest", "lowest", "best", "number", "count", "total", "average", "id",
+}
+
+
+# 한국어 조사/접미사와 떼어낸 뒤 남아야 하는 최소 글자 수 (국가별 → 국가, 월별 → 월, 국가 → 국가)
+_KO_SUFFIXES = (
+    ("별로", 1), ("별", 1), ("에서", 2), ("으로", 2), ("의", 2), ("을", 2), ("를", 2), ("은", 2),
+    ("는", 2), ("이", 2), ("가", 2), ("에", 2), ("로", 2), ("과", 2), ("와", 2), ("도", 2),
+)
+
+
+def _stem(word: str) -> str:
+    """복수형/진행형과 한국어 조사 정도만 다듬는 가벼운 어간 처리 (sales → sale, monthly → month, 국가별 → 국가)"""
+    if word.isascii():
+        for suffix in ("ies", "ing", "es", "ed", "ly", "s"):
+            if len(word) > len(suffix) + 2 and word.endswith(suffix):
+                return word[: -len(suffix)] + ("y" if suffix == "ies" else "")
+        return word
+    for suffix, keep in _KO_SUFFIXES:
+        if len(word) >= len(suffix) + keep and word.endswith(suffix):
+            return word[: -len(suffix)]
+    return word
+
+
+# 특징 종류별 가중치: 단어 전체가 일치하는 것이 글자 3-gram 일치보다 중요
+_FEATURE_WEIGHTS = {"w": 1.0, "g": 0.3}
+
+
+def _features(text: str) -> dict[str, int]:
+    """텍스트의 특징(단어 어간 "w:...", 글자 3-gram "g:...")별 등장 횟수"""
+    features: dict[str, int] = {}
+    for word in split_identifier(text):
+        if word in _STOPWORDS:
+            continue
+        stem = _stem(word)
+        features["w:" + stem] = features.get("w:" + stem, 0) + 1
+        # 글자 3-gram: 철자가 조금 다르거나 일부만 같은 단어도 가깝게 (customer ↔ customers, addr ↔ address)
+        padded = f"^{stem}$"
+        for i in range(len(padded) - 2):
+            key = "g:" + padded[i:i + 3]
+            features[key] = features.get(key, 0) + 1
+    return features
+
+
+def hashing_embedding(texts: list[str]) -> list[list[float]]:
+    """
+    외부 모델 없이 쓰는 기본 임베딩입니다.
+    단어/3-gram 특징을 HASH_DIM 차원에 부호 있는 해시로 더한 뒤 L2 정규화합니다.
+    같은 단어가 여러 번 나와도 한 단어가 벡터를 좌우하지 않도록 빈도는 로그로 줄입니다.
+    """
+    vectors = []
+    for text in texts:
+        vec = [0.0] * HASH_DIM
+        for feature, count in _features(text).items():
+            h = zlib.crc32(feature.encode())
+            weight = _FEATURE_WEIGHTS[feature[0]] * (1.0 + math.log(count))
+            vec[h % HASH_DIM] += weight if (h >> 16) & 1 else -weight
+        vectors.append(vec)
+    return vectors
+
+
+def load_embedding(spec: str | None):
+    """
+    "패키지.모듈:함수" 형식의 임베딩 함수를 불러옵니다. 비어 있으면 hashing_embedding.
+    함수는 문자열 목록을 받아 같은 길이의 벡터(float 목록) 목록을 반환해야 합니다.
+    """
+    if not spec:
+        return hashing_embedding
+    module_name, _, func_name = spec.partition(":")
+    if not func_name:
+        raise ValueError(f"임베딩 함수 형식이 올바르지 않습니다 (모듈:함수): {spec}")
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def load_descriptions(path: str | None) -> dict:
+    """
+    테이블/컬럼 설명 JSON 파일을 읽습니다.
+    {"Invoice": {"description": "주문(청구서)", "columns": {"Total": "주문 총액"}}, ...}
+    """
+    if not path:
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _normalize(vec: list[float]) -> list[float]:
+    norm = math.sqrt(sum(v * v for v in vec))
+    return [v / norm for v in vec] if norm else vec
+
+
+def table_document(table: dict, description: dict | None = None) -> str:
+    """
+    테이블 하나를 임베딩할 문서로 만듭니다 (이름, 설명, 컬럼과 설명, 참조 테이블).
+    모든 테이블에 공통으로 들어가는 단어(타입, "column" 같은 표시)는 넣지 않고,
+    테이블 이름은 두 번 넣어 컬럼 이름보다 무게를 둡니다.
+    """
+    description = description or {}
+    column_notes = description.get("columns", {})
+    lines = [table["name"], table["name"]]
+    if description.get("description"):
+        lines.append(description["description"])
+    for col in table["columns"]:
+        lines.append(f"{col['name']} {column_notes.get(col['name'], '')}".strip())
+    for fk in table["foreign_keys"]:
+        lines.append(fk["references_table"])
+    return "\n".join(lines)
+
+
+class TableIndex:
+    """
+    스키마 카탈로그의 테이블을 벡터로 보관하고 질문과 가까운 테이블을 찾습니다.
+    카탈로그가 다시 만들어지면(스키마 변경) 다음 검색 때 인덱스도 다시 만듭니다.
+    """
+
+    def __init__(self, catalog, embed=hashing_embedding, descriptions: dict | None = None):
+        self.catalog = catalog
+        self.embed = embed
+        self.descriptions = descriptions or {}
+        self._names: list[str] = []
+        self._vectors: list[list[float]] = []
+        self._version = None
+        self._lock = threading.Lock()
+        self.build()
+
+    def build(self) -> None:
+        with self._lock:
+            self._build()
+
+    def _build(self) -> None:
+        tables = list(self.catalog.tables.values())
+        docs = [table_document(t, self.descriptions.get(t["name"])) for t in tables]
+        vectors = [_normalize(list(v)) for v in self.embed(docs)] if docs else []
+        self._names = [t["name"] for t in tables]
+        self._vectors = vectors
+        self._version = self.catalog.schema_version
+
+    def search(self, question: str, k: int = 5) -> list[dict]:
+        """질문과 코사인 유사도가 높은 순서로 k개 테이블의 요약 스키마를 반환합니다 (관련 없는 테이블은 제외)."""
+        self.catalog.refresh_if_changed()
+        with self._lock:
+            if self._version != self.catalog.schema_version:
+                self._build()
+            names, vectors = self._names, self._vectors
+        if not names:
+            return []
+        query = _normalize(list(self.embed([question])[0]))
+        scored = sorted(
+            ((sum(q * v for q, v in zip(query, vec)), name) for name, vec in zip(names, vectors)),
+            reverse=True,
+        )
+        results = []
+        for score, name in scored[:k]:
+            if score <= 0:
+                break
+            table = self.catalog.get(name)
+            results.append({
+                "table": name,
+                "score": round(score, 4),
+                "description": self.descriptions.get(name, {}).get("description"),
+                "columns": [f"{c['name']} {c['type'] or ''}".strip() for c in table["columns"]],
+                "foreign_keys": [
+                    f"{fk['column']} → {fk['references_table']}.{fk['references_column']}"
+                    for fk in table["foreign_keys"]
+                ],
+                "row_count": table["row_count"],
+            })
+        return results
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from catalog_search import META_TABLE as SEARCH_META
+    from rollups import rollup_tables
+    from sampling import sample_tables
+    from schema_catalog import SchemaCatalog
+
+    parser = argparse.ArgumentParser(description="질문과 관련 있는 테이블 찾기")
+    parser.add_argument("db_path")
+    parser.add_argument("question")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--embedding", default=None, help="임베딩 함수 (모듈:함수)")
+    parser.add_argument("--descriptions", default=None, help="테이블/컬럼 설명 JSON 파일")
+    args = parser.parse_args()
+
+    catalog = SchemaCatalog(args.db_path, exclude=rollup_tables() | {SEARCH_META} | sample_tables())
+    index = TableIndex(catalog, load_embedding(args.embedding), load_descriptions(args.descriptions))
+    start = time.perf_counter()
+    for item in index.search(args.question, args.k):
+        print(f"  {item['score']:.4f}  {item['table']}")
+    print(f"({(time.perf_counter() - start) * 1000:.2f}ms)")
+    catalog.close()
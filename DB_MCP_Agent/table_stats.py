@@ -0,0 +1,191 @@
+# table_stats.py
+# 테이블 통계 (행 수, 페이지 수/크기, 인덱스, 컬럼별 고유값 수 추정)
+#  - 통계는 읽기 전용 연결(서버에서는 스냅숏 또는 mode=ro 연결)로만 계산하고 원본 파일에 쓰지 않음
+#  - ANALYZE(sqlite_stat1 갱신)는 명시적으로 요청할 때만 실행 (원본에 쓰므로 데이터 버전이 바뀌어
+#    결과 캐시 무효화, 변경 알림, 스냅숏 재복사가 일어남). analysis_limit로 인덱스마다 읽는 행 수를 제한
+#    → 쿼리 플래너와 query_plan.py의 비용 추정도 같은 통계를 사용
+#  - 테이블/인덱스 크기는 dbstat 가상 테이블(aggregate=1)에서 B-tree별 페이지 수와 바이트를 읽음
+#    (dbstat가 없는 SQLite 빌드이면 크기는 생략)
+#  - 컬럼 고유값 수: 작은 테이블은 COUNT(DISTINCT)로 정확히,
+#    큰 테이블은 인덱스 첫 컬럼이면 sqlite_stat1(행 수 / 키당 평균 행 수), 나머지는 무작위 표본에서 GEE 추정
+#  - 모두 전체 테이블을 읽을 수 있는 작업이므로 서버는 백그라운드에서 계산하고 결과를 캐시
+#
+# 사용법: python table_stats.py Chinook.db [--analyze] [--analysis-limit 10000]
+
+import math
+import os
+import random
+import sqlite3
+import sys
+from collections import Counter
+from urllib.parse import quote
+
+from schema_catalog import _quote_ident
+
+# 이 행 수 이하인 테이블은 COUNT(DISTINCT)로 정확히 계산
+EXACT_DISTINCT_ROWS = 200000
+# 큰 테이블에서 고유값 수를 추정할 표본 행 수
+DISTINCT_SAMPLE_ROWS = 20000
+
+
+def analyze(db_path: str, analysis_limit: int = 10000) -> None:
+    """ANALYZE를 실행해 sqlite_stat1을 갱신합니다 (원본 파일에 씀). analysis_limit가 0이면 전체 행을 읽음."""
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        conn.execute(f"PRAGMA analysis_limit = {int(analysis_limit)}")
+        conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def read_stat1(conn: sqlite3.Connection) -> dict[tuple[str, str | None], list[int]]:
+    """sqlite_stat1을 {(테이블, 인덱스 또는 None): [행 수, 키 접두사별 평균 행 수, ...]}로 읽습니다."""
+    try:
+        rows = conn.execute("SELECT tbl, idx, stat FROM sqlite_stat1").fetchall()
+    except sqlite3.OperationalError:
+        return {}   # ANALYZE를 한 번도 실행하지 않은 데이터베이스
+    stats = {}
+    for tbl, idx, stat in rows:
+        numbers = []
+        for token in (stat or "").split():
+            if not token.isdigit():
+                break   # "unordered" 같은 옵션 토큰 이후는 무시
+            numbers.append(int(token))
+        if numbers:
+            stats[(tbl, idx)] = numbers
+    return stats
+
+
+def read_btree_sizes(conn: sqlite3.Connection) -> dict[str, tuple[int, int, int]]:
+    """dbstat에서 {테이블/인덱스 이름: (페이지 수, 바이트, 빈 바이트)}를 읽습니다. dbstat가 없으면 빈 dict."""
+    try:
+        rows = conn.execute("SELECT name, pageno, pgsize, unused FROM dbstat WHERE aggregate = 1").fetchall()
+    except sqlite3.OperationalError:
+        return {}
+    return {name: (pages, size, unused) for name, pages, size, unused in rows}
+
+
+def _gee_estimate(counts: Counter, sample_rows: int, total_rows: int) -> int:
+    """
+    표본의 값별 빈도로 전체 고유값 수를 추정합니다 (GEE: sqrt(N/n) * 한 번 나온 값 수 + 두 번 이상 나온 값 수).
+    표본에 한 번만 나온 값은 전체에서 더 많은 고유값을 대표한다고 보고 크게 늘림.
+    """
+    once = sum(1 for c in counts.values() if c == 1)
+    more = len(counts) - once
+    estimate = math.sqrt(total_rows / sample_rows) * once + more
+    return int(min(total_rows, max(len(counts), round(estimate))))
+
+
+def _column_distinct(conn, table: str, columns: list[str], rows: int) -> tuple[dict[str, int], str]:
+    """컬럼별 (NULL 제외) 고유값 수와 계산 방법("exact" 또는 "sample")을 반환합니다."""
+    ident = _quote_ident(table)
+    if rows <= EXACT_DISTINCT_ROWS:
+        select = ", ".join(f"COUNT(DISTINCT {_quote_ident(c)})" for c in columns)
+        values = conn.execute(f"SELECT {select} FROM {ident}").fetchone()
+        return dict(zip(columns, values)), "exact"
+
+    # 각 행을 1/every 확률로 뽑는 한 번의 스캔 (표본 크기 ≈ DISTINCT_SAMPLE_ROWS)
+    every = max(1, rows // DISTINCT_SAMPLE_ROWS)
+    select = ", ".join(_quote_ident(c) for c in columns)
+    seed = random.randrange(every)
+    cursor = conn.execute(f"SELECT {select} FROM {ident} WHERE (random() & 0x7fffffff) % ? = ?", (every, seed))
+    counters = [Counter() for _ in columns]
+    sampled = 0
+    for row in cursor:
+        sampled += 1
+        for counter, value in zip(counters, row):
+            if value is not None:
+                counter[value] += 1
+    if not sampled:
+        return {c: None for c in columns}, "sample"
+    return {c: _gee_estimate(counter, sampled, rows) for c, counter in zip(columns, counters)}, "sample"
+
+
+def collect_table_stats(db_path: str, tables: dict[str, dict], run_analyze: bool = False,
+                        analysis_limit: int = 10000, connect=None) -> dict[str, dict]:
+    """
+    tables(스키마 카탈로그의 {이름: 테이블 정보})의 통계를 계산합니다.
+    run_analyze이면 먼저 원본에 ANALYZE를 실행하고 (쓰기 실패 시 기존 sqlite_stat1을 사용),
+    나머지는 읽기 전용 연결(connect가 있으면 그 연결, 예: 스냅숏)로 읽습니다.
+
+    반환: {테이블: {"rows", "pages", "bytes", "indexes": [...], "columns": {컬럼: 고유값 수}, "distinct_source"}}
+    """
+    if run_analyze:
+        try:
+            analyze(db_path, analysis_limit)
+        except sqlite3.Error as e:
+            # 읽기 전용 파일 등: 이미 있는 sqlite_stat1(없으면 표본/정확한 계산)으로 진행
+            print(f"ANALYZE 실패 (기존 통계 사용): {e}", file=sys.stderr)
+    if connect is not None:
+        conn = connect()
+    else:
+        conn = sqlite3.connect(f"file:{quote(os.path.abspath(db_path))}?mode=ro", uri=True)
+    try:
+        stat1 = read_stat1(conn)
+        sizes = read_btree_sizes(conn)
+        result = {}
+        for name, table in tables.items():
+            rows = conn.execute(f"SELECT COUNT(*) FROM {_quote_ident(name)}").fetchone()[0]
+            distinct = {}
+            sources = {}
+            for column in table["columns"]:
+                if column["primary_key"] and sum(c["primary_key"] for c in table["columns"]) == 1:
+                    distinct[column["name"]] = rows
+                    sources[column["name"]] = "primary_key"
+
+            indexes = []
+            pages, size, _ = sizes.get(name, (None, None, None))
+            for index in table["indexes"]:
+                numbers = stat1.get((name, index["name"]))
+                entry = {"name": index["name"], "columns": index["columns"], "unique": index["unique"]}
+                if index["name"] in sizes:
+                    entry["pages"], entry["bytes"] = sizes[index["name"]][:2]
+                if numbers and len(numbers) > 1:
+                    # 접두사 (c1), (c1, c2), ...별 고유 키 수 ≈ 전체 행 수 / 키당 평균 행 수
+                    entry["distinct_keys"] = [max(1, round(rows / max(1, avg))) for avg in numbers[1:]]
+                    first = index["columns"][0] if index["columns"] else None
+                    # 작은 테이블은 아래에서 정확히 세므로 큰 테이블에서만 통계 값을 사용
+                    if first and first not in distinct and rows > EXACT_DISTINCT_ROWS:
+                        distinct[first] = entry["distinct_keys"][0]
+                        sources[first] = "sqlite_stat1"
+                indexes.append(entry)
+
+            remaining = [c["name"] for c in table["columns"] if c["name"] not in distinct]
+            if remaining and rows:
+                values, method = _column_distinct(conn, name, remaining, rows)
+                distinct.update(values)
+                sources.update({c: method for c in remaining})
+
+            result[name] = {
+                "rows": rows,
+                "pages": pages,
+                "bytes": size,
+                "indexes": indexes,
+                "columns": {c["name"]: distinct.get(c["name"]) for c in table["columns"]},
+                "distinct_source": sources,
+            }
+        return result
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import time
+
+    from schema_catalog import SchemaCatalog
+
+    parser = argparse.ArgumentParser(description="테이블 통계 계산")
+    parser.add_argument("db_path")
+    parser.add_argument("--analyze", action="store_true", help="먼저 ANALYZE로 sqlite_stat1을 갱신 (원본 파일에 씀)")
+    parser.add_argument("--analysis-limit", type=int, default=10000, help="인덱스마다 읽는 최대 행 수 (0이면 전체)")
+    args = parser.parse_args()
+
+    catalog = SchemaCatalog(args.db_path)
+    start = time.perf_counter()
+    stats = collect_table_stats(args.db_path, catalog.tables, args.analyze, args.analysis_limit)
+    print(json.dumps(stats, ensure_ascii=False, indent=2))
+    print(f"통계 계산: 테이블 {len(stats)}개, {(time.perf_counter() - start) * 1000:.1f}ms")
+    catalog.close()
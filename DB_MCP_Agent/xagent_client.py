@@ -1,4 +1,5 @@
 import asyncio
+import os
 from dotenv import load_dotenv
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from langchain.agents import create_agent
@@ -6,6 +7,8 @@ from langchain.chat_models import init_chat_model
 from langgraph.checkpoint.memory import MemorySaver
 from langchain_core.messages import HumanMessage
 
+from mcp_session_pool import MCP_POOL_SIZE, MCPSessionPool
+
 load_dotenv()
 
 # --------------------------------------------------------
@@ -17,14 +20,23 @@ model = init_chat_model("gpt-5-mini", model_provider="openai")
 # --------------------------------------------------------
 # 2️⃣ MultiServerMCPClient 설정
 # --------------------------------------------------------
+# CHINOOK_MCP_URL이 설정되어 있으면 이미 실행 중인 HTTP 서버에 연결
+# (예: python xagent_server.py --transport http → http://127.0.0.1:8000/mcp)
+# 여러 클라이언트가 하나의 서버 프로세스와 연결 풀/캐시를 공유합니다.
+CHINOOK_MCP_URL = os.getenv("CHINOOK_MCP_URL", "")
+
 client = MultiServerMCPClient(
     {
-        # Chinook Database MCP 서버 (stdio 기반 로컬 실행)
-        "chinook": {
-            "transport": "stdio",       # 로컬 subprocess 통신
-            "command": "python",        # MCP 서버 실행 명령어
-            "args": ["./agent_server.py"],  # MCP 서버 스크립트 경로
-        }
+        # Chinook Database MCP 서버
+        "chinook": (
+            {"transport": "streamable_http", "url": CHINOOK_MCP_URL}
+            if CHINOOK_MCP_URL
+            else {
+                "transport": "stdio",       # 로컬 subprocess 통신
+                "command": "python",        # MCP 서버 실행 명령어
+                "args": ["./agent_server.py"],  # MCP 서버 스크립트 경로
+            }
+        )
     }
 )
 
@@ -34,9 +46,15 @@ client = MultiServerMCPClient(
 async def run():
     print("===== MCP MultiServer 클라이언트 초기화 중... =====")
 
-    # MCP 서버 연결 및 도구 목록 가져오기
-    tools = await client.get_tools()
+    # 서버마다 세션을 열어 두고 대화 루프 내내 재사용
+    # (client.get_tools()의 도구는 호출마다 서버 프로세스를 새로 실행함)
+    # 세션 수는 MCP_POOL_SIZE, 상태 확인 주기는 MCP_HEALTH_INTERVAL 환경 변수로 조정
+    async with MCPSessionPool(client.connections, pool_size=MCP_POOL_SIZE) as pool:
+        tools = await pool.get_tools()
+        await chat(tools)
+
 
+async def chat(tools):
     # 메모리 체크포인터 생성 (대화 히스토리 유지용)
     memory = MemorySaver()
 
@@ -57,7 +75,8 @@ async def run():
     # 대화 루프
     # --------------------------------------------------------
     while True:
-        user_input = input("질문을 입력하세요: ")
+        # 입력을 기다리는 동안에도 세션 상태 확인이 돌도록 별도 스레드에서 읽음
+        user_input = await asyncio.to_thread(input, "질문을 입력하세요: ")
 
         if user_input.lower() in ["quit", "exit", "종료"]:
             print("챗봇을 종료합니다.")
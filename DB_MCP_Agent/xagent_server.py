@@ -1,111 +1,1117 @@
-from mcp.server.fastmcp import FastMCP
-from mcp.server.fastmcp.prompts import base
-from contextlib import asynccontextmanager
-from langchain_community.utilities import SQLDatabase
+import asyncio
+import json
 import os
 import sys
-import asyncio
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from mcp import types
+from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp.prompts import base
+from mcp.server.lowlevel import Server
+
+# DB 접근은 표준 라이브러리 sqlite3만 사용 (SQLAlchemy/langchain_community를 불러오지 않아 시작이 빠름)
+# uvicorn, 인덱스 어드바이저처럼 일부 실행 경로에서만 쓰는 모듈은 필요할 때 불러옴
+from sql_engine import BudgetExceeded, QueryControl
+from sql_cache import is_cacheable, normalize_sql
+from db_registry import DatabaseRegistry, parse_database_list
+from db_versions import ResourceSubscriptions
+from rollups import get_rollup
+from catalog_search import ENTITY_NAMES
+from table_index import load_descriptions, load_embedding
+from query_plan import QueryCostExceeded, analyze_plan, plan_summary
+from query_log import QueryLog
+from result_format import FORMATS, encode_rows
+from named_queries import load_named_queries
+from sampling import SAMPLES, approximate
+# pyarrow는 result_export.write_export 안에서 내보내기를 실행할 때만 불러옴
+from result_export import EXPORT_FORMATS, ExportSpool, write_export
+# prometheus_client는 HTTP 모드에서 /metrics 경로를 만들 때만 불러옴
+from server_metrics import ServerMetrics, note_query
 
 # 전역 데이터베이스 연결 변수
-# 서버 수명 주기 동안 유지되는 데이터베이스 연결 객체
-db = None
+# 서버 수명 주기 동안 유지되는 데이터베이스 레지스트리
+# 데이터베이스별 연결 풀/스키마 카탈로그/결과 캐시/커서는 처음 사용할 때 열고, 오래 쓰지 않으면 닫음
+registry = None
+# execute_sql_query 호출 기록 (느린 쿼리 로그, 모든 데이터베이스 공통)
+query_log = None
+# export_query로 내보낸 Arrow/Parquet 파일을 보관하는 스풀 디렉터리
+export_spool = None
+# suggest_indexes 전용 스레드 (DB 복사와 시간 측정이 쿼리 실행 스레드 풀을 차지하지 않도록 한 번에 하나씩 실행)
+advisor_executor = None
+# 설정 파일에서 읽은 이름 붙은 매개변수 쿼리 {이름: NamedQuery}
+named_queries = {}
+# resources/subscribe로 구독된 리소스 URI (세션별)
+subscriptions = ResourceSubscriptions()
+# 도구/리소스별 호출 수, 지연 시간 히스토그램, 반환 행 수, 응답 크기 (서버 프로세스 전체에서 누적)
+metrics = ServerMetrics()
+
+# 동시에 열어 둘 읽기 전용 연결 수 (환경 변수로 조정 가능, 데이터베이스마다 적용)
+POOL_SIZE = int(os.getenv("CHINOOK_POOL_SIZE", "8"))
+# 쿼리 실행 방식: thread(연결 풀 + 전용 스레드 풀) 또는 aiosqlite(이벤트 루프에서 기다리는 비동기 연결 풀)
+SQL_BACKEND = os.getenv("CHINOOK_SQL_BACKEND", "thread")
+# 데이터베이스를 열 때 원본 파일을 WAL 모드로 바꿀지 여부 (1이면 바꿈, 파일 헤더에 쓰고 -wal/-shm 파일이 생김)
+# 0이면 파일의 저널 모드를 그대로 사용 (읽기 전용/네트워크 마운트, git으로 관리하는 파일에 적합)
+WAL = os.getenv("CHINOOK_WAL", "0") == "1"
+# 캐시에 보관할 최대 쿼리 결과 수 (0이면 캐시 사용 안 함)
+CACHE_SIZE = int(os.getenv("CHINOOK_CACHE_SIZE", "256"))
+# 사용되지 않은 커서를 자동으로 닫기까지의 시간(초)
+CURSOR_IDLE_TIMEOUT = float(os.getenv("CHINOOK_CURSOR_TIMEOUT", "300"))
+# 쿼리 하나에 허용하는 최대 실행 시간(초)과 최대 결과 행 수
+QUERY_TIMEOUT = float(os.getenv("CHINOOK_QUERY_TIMEOUT", "10"))
+QUERY_MAX_ROWS = int(os.getenv("CHINOOK_MAX_ROWS", "10000"))
+# 실행 계획 기반 예상 비용 한도 (이보다 크면 실행 전에 거부, 0이면 검사하지 않음)
+MAX_QUERY_COST = int(os.getenv("CHINOOK_MAX_QUERY_COST", "50000000"))
+# 쿼리 로그 링 버퍼 크기와 (선택) 영구 저장용 SQLite 파일 경로
+QUERY_LOG_SIZE = int(os.getenv("CHINOOK_QUERY_LOG_SIZE", "1000"))
+QUERY_LOG_PATH = os.getenv("CHINOOK_QUERY_LOG_PATH", "")
+# 쿼리 결과 기본 형식 (tsv, json, markdown, repr)과 결과 하나에 허용하는 최대 토큰 수 (0이면 제한 없음)
+# 예전 출력(str(튜플 목록), 잘라내지 않음)은 CHINOOK_RESULT_FORMAT=repr, CHINOOK_MAX_RESULT_TOKENS=0
+RESULT_FORMAT = os.getenv("CHINOOK_RESULT_FORMAT", "tsv")
+MAX_RESULT_TOKENS = int(os.getenv("CHINOOK_MAX_RESULT_TOKENS", "8000"))
+# 내보내기 파일 디렉터리, 보관 시간(초), 실행 시간/행 수 한도
+EXPORT_DIR = os.getenv("CHINOOK_EXPORT_DIR", os.path.join(tempfile.gettempdir(), "chinook_exports"))
+EXPORT_TTL = float(os.getenv("CHINOOK_EXPORT_TTL", "3600"))
+EXPORT_TIMEOUT = float(os.getenv("CHINOOK_EXPORT_TIMEOUT", "120"))
+EXPORT_MAX_ROWS = int(os.getenv("CHINOOK_EXPORT_MAX_ROWS", "5000000"))
+# 동시에 실행하는 내보내기 수 (전용 스레드 풀 크기, 넘치는 요청은 기다림)
+EXPORT_WORKERS = int(os.getenv("CHINOOK_EXPORT_WORKERS", "2"))
+# 구독된 리소스가 있을 때 데이터베이스 변경을 확인하는 주기(초, 0이면 변경 알림 사용 안 함)
+CHANGE_POLL_INTERVAL = float(os.getenv("CHINOOK_CHANGE_POLL", "1.0"))
+# 이름 붙은 쿼리 설정 파일 (비어 있으면 서버 폴더의 named_queries.json이 있을 때 사용)
+NAMED_QUERIES_PATH = os.getenv("CHINOOK_NAMED_QUERIES", "")
+# 배치 도구 한 번에 처리할 수 있는 최대 쿼리/테이블 수
+MAX_BATCH_SIZE = int(os.getenv("CHINOOK_MAX_BATCH", "20"))
+# 추가 데이터베이스 목록 ("이름=경로,이름=경로")과 *.db 파일을 모아 둔 디렉터리
+DATABASES = os.getenv("CHINOOK_DATABASES", "")
+DB_DIR = os.getenv("CHINOOK_DB_DIR", "")
+# database 인자를 생략했을 때 사용할 데이터베이스 이름
+DEFAULT_DB = os.getenv("CHINOOK_DEFAULT_DB", "chinook")
+# 동시에 열어 둘 최대 데이터베이스 수와, 사용하지 않는 데이터베이스를 닫기까지의 시간(초)
+MAX_OPEN_DBS = int(os.getenv("CHINOOK_MAX_OPEN_DBS", "8"))
+DB_IDLE_TIMEOUT = float(os.getenv("CHINOOK_DB_IDLE_TIMEOUT", "600"))
+# 데이터베이스를 열 때 트리거로 유지되는 요약 테이블(rollup)을 설치할지 여부 (1이면 설치, 원본 파일에 씀)
+# 0이면 `python rollups.py`로 미리 설치해 둔 요약만 읽기 전용으로 사용
+ROLLUPS = os.getenv("CHINOOK_ROLLUPS", "0") == "1"
+# 아티스트/앨범/트랙 등 이름 검색용 FTS5 인덱스(메모리 DB, 원본 파일에 쓰지 않음) 사용 여부 (0이면 사용 안 함)
+SEARCH = os.getenv("CHINOOK_SEARCH", "1") != "0"
+# find_relevant_tables에 쓸 임베딩 함수 ("모듈:함수", 비어 있으면 내장 해싱 임베딩)
+EMBEDDING = os.getenv("CHINOOK_EMBEDDING", "")
+# 테이블/컬럼 설명 JSON 파일 (비어 있으면 서버 폴더의 chinook_descriptions.json이 있을 때 사용)
+TABLE_DESCRIPTIONS = os.getenv("CHINOOK_TABLE_DESCRIPTIONS", "")
+# 데이터베이스를 열 때 메모리 스냅숏으로 복사하고 모든 쿼리가 스냅숏을 읽게 할지 여부 (1이면 사용)
+SNAPSHOT = os.getenv("CHINOOK_SNAPSHOT", "0") == "1"
+# 스냅숏 원본 파일의 변경을 확인하는 주기(초, 0이면 자동으로 새로 고치지 않음)
+SNAPSHOT_CHECK_INTERVAL = float(os.getenv("CHINOOK_SNAPSHOT_CHECK", "2.0"))
+# 파일이 바뀌지 않아도 스냅숏을 다시 복사하는 주기(초, 0이면 파일이 바뀔 때만)
+SNAPSHOT_REFRESH = float(os.getenv("CHINOOK_SNAPSHOT_REFRESH", "0"))
+# approximate_query용 층화 표본의 추출 비율 (0이면 표본을 만들지 않음)
+SAMPLE_FRACTION = float(os.getenv("CHINOOK_SAMPLE_FRACTION", "0"))
+# 데이터가 바뀐 경우 표본을 다시 만드는 최소 간격(초, 0이면 처음 한 번만 만듦)
+SAMPLE_REFRESH = float(os.getenv("CHINOOK_SAMPLE_REFRESH", "3600"))
+# 테이블 통계(행 수, 크기, 인덱스, 컬럼 고유값 수) 계산 여부 (0이면 database://info에 통계 없음)
+TABLE_STATS = os.getenv("CHINOOK_TABLE_STATS", "1") != "0"
+# 데이터가 바뀌었으면 테이블 통계를 다시 계산하는 최소 간격(초), 0이면 데이터베이스를 열 때 한 번만
+STATS_REFRESH = float(os.getenv("CHINOOK_STATS_REFRESH", "600"))
+# 데이터베이스를 열고 처음 통계를 계산할 때 원본에 ANALYZE를 실행할지 여부 (1이면 실행)
+# 원본 파일에 쓰므로 데이터 버전이 바뀌어 결과 캐시 무효화/변경 알림/스냅숏 재복사가 한 번 일어남
+ANALYZE = os.getenv("CHINOOK_ANALYZE", "0") == "1"
+# ANALYZE가 인덱스마다 읽는 최대 행 수 (0이면 전체, 큰 데이터베이스에서 통계 계산 시간을 제한)
+ANALYSIS_LIMIT = int(os.getenv("CHINOOK_ANALYSIS_LIMIT", "10000"))
+# 도구/리소스 호출 지표 수집 여부 (0이면 수집하지 않음, metrics://server는 빈 보고서)
+METRICS = os.getenv("CHINOOK_METRICS", "1") != "0"
+# HTTP 모드에서 Prometheus 텍스트 형식으로 지표를 내보낼 경로 (빈 값이면 사용 안 함)
+METRICS_PATH = os.getenv("CHINOOK_METRICS_PATH", "/metrics")
+
+async def _reap_idle():
+    """일정 주기로 방치된 커서와 오래 쓰지 않은 데이터베이스를 정리하는 백그라운드 작업"""
+    interval = max(1.0, min(CURSOR_IDLE_TIMEOUT, DB_IDLE_TIMEOUT) / 4)
+    while True:
+        await asyncio.sleep(interval)
+        if registry is None:
+            continue
+        for db in registry.open_databases():
+            closed = db.cursors.reap_idle()
+            if closed:
+                print(f"유휴 커서 {closed}개 정리 ({db.name})", file=sys.stderr)
+        for name in await registry.reap_idle():
+            print(f"유휴 데이터베이스 닫음: {name}", file=sys.stderr)
+        if export_spool is not None:
+            removed = await asyncio.to_thread(export_spool.reap)
+            if removed:
+                print(f"보관 시간이 지난 내보내기 파일 {removed}개 삭제", file=sys.stderr)
+
+async def _refresh_snapshots():
+    """스냅숏 모드에서 기본 데이터베이스를 미리 복사하고, 원본이 바뀌면 스냅숏을 교체하는 백그라운드 작업"""
+    try:
+        # 첫 도구 호출이 복사를 기다리지 않도록 서버 시작 직후 기본 데이터베이스를 열어 둠
+        async with registry.use(None) as db:
+            print(f"스냅숏 준비 완료: {db.name} ({db.snapshot.size_bytes / 1048576:.1f}MB, {db.snapshot.load_ms}ms)",
+                  file=sys.stderr)
+    except Exception as e:
+        print(f"기본 데이터베이스 스냅숏 실패: {e}", file=sys.stderr)
+    if SNAPSHOT_CHECK_INTERVAL <= 0:
+        return
+    while True:
+        await asyncio.sleep(SNAPSHOT_CHECK_INTERVAL)
+        if registry is None:
+            continue
+        for db in registry.open_databases():
+            if db.snapshot is None or not db.snapshot.is_stale():
+                continue
+            try:
+                # 복사하는 동안에도 쿼리는 이전 스냅숏에서 계속 실행됨
+                if await asyncio.to_thread(db.snapshot.refresh):
+                    print(f"스냅숏 교체: {db.name} (세대 {db.snapshot.generation}, {db.snapshot.load_ms}ms)",
+                          file=sys.stderr)
+            except Exception as e:
+                print(f"스냅숏 새로 고침 실패 (이전 스냅숏 유지): {db.name}: {e}", file=sys.stderr)
+
+async def _refresh_samples():
+    """열린 데이터베이스에 층화 표본을 만들고, 데이터가 바뀌었으면 SAMPLE_REFRESH초마다 다시 만드는 백그라운드 작업"""
+    interval = min(5.0, SAMPLE_REFRESH) if SAMPLE_REFRESH > 0 else 5.0
+    while True:
+        await asyncio.sleep(interval)
+        if registry is None:
+            continue
+        for opened in registry.open_databases():
+            try:
+                # 만드는 동안 데이터베이스가 닫히지 않도록 빌려 둠
+                async with registry.use(opened.name) as db:
+                    if db.samples_tag is None:
+                        force = False   # 처음 열림: 표본이 없거나 설정이 바뀐 것만 만듦
+                    elif (SAMPLE_REFRESH > 0 and time.monotonic() - db.samples_built_at >= SAMPLE_REFRESH
+                          and await asyncio.to_thread(db.versions.current_tag) != db.samples_tag):
+                        force = True
+                    else:
+                        continue
+                    start = time.perf_counter()
+                    built = await asyncio.to_thread(db.build_samples, force)
+                    if built:
+                        print(f"표본 생성: {db.name} ({', '.join(built)}, {(time.perf_counter() - start) * 1000:.0f}ms)",
+                              file=sys.stderr)
+            except Exception as e:
+                print(f"표본 생성 실패 (이전 표본 유지): {opened.name}: {e}", file=sys.stderr)
+
+async def _update_stats(name: str | None) -> None:
+    """데이터베이스의 테이블 통계가 없거나, 데이터가 바뀌었고 STATS_REFRESH초가 지났으면 다시 계산합니다."""
+    async with registry.use(name) as db:
+        if db.table_stats is not None:
+            if STATS_REFRESH <= 0 or time.monotonic() - db.stats_built_at < STATS_REFRESH:
+                return
+            if await asyncio.to_thread(db.versions.current_tag) == db.stats_tag:
+                return
+        # 통계는 읽기 전용으로 계산하고, ANALYZE는 설정으로 요청한 경우 처음 한 번만
+        stats = await asyncio.to_thread(db.collect_stats, ANALYZE and db.table_stats is None)
+        print(f"테이블 통계 계산: {db.name} (테이블 {len(stats)}개, {db.stats_ms:.0f}ms)", file=sys.stderr)
+
+async def _refresh_stats():
+    """기본 데이터베이스의 테이블 통계를 미리 계산하고, 이후 열린 데이터베이스의 통계를 최신으로 유지하는 백그라운드 작업"""
+    try:
+        # 첫 database://info 읽기가 통계 없이 응답하지 않도록 서버 시작 직후 계산
+        await _update_stats(None)
+    except Exception as e:
+        print(f"테이블 통계 계산 실패: {e}", file=sys.stderr)
+    interval = min(5.0, STATS_REFRESH) if STATS_REFRESH > 0 else 5.0
+    while True:
+        await asyncio.sleep(interval)
+        if registry is None:
+            continue
+        for opened in registry.open_databases():
+            try:
+                await _update_stats(opened.name)
+            except Exception as e:
+                print(f"테이블 통계 계산 실패 (이전 통계 유지): {opened.name}: {e}", file=sys.stderr)
+
+# 기본 데이터베이스의 버전에 따라 내용이 바뀌는 리소스 (변경 알림 대상)
+VERSIONED_RESOURCES = ("database://info", "table://", "rollup://")
+# 구독한 세션에 마지막으로 알린 기본 데이터베이스 버전 태그
+_notified_tag = None
+
+def _is_versioned(uri: str) -> bool:
+    return uri.startswith(VERSIONED_RESOURCES)
+
+async def _watch_changes():
+    """구독된 리소스가 있는 동안 기본 데이터베이스의 변경을 확인하고, 바뀌면 구독한 세션에 알리는 백그라운드 작업"""
+    global _notified_tag
+    while True:
+        await asyncio.sleep(CHANGE_POLL_INTERVAL)
+        if registry is None or not subscriptions:
+            _notified_tag = None
+            continue
+        try:
+            # 구독이 있는 동안은 기본 데이터베이스를 열어 둠 (유휴 정리 대상에서 제외)
+            async with registry.use(None) as db:
+                tag = await asyncio.to_thread(db.versions.current_tag)
+        except Exception as e:
+            print(f"변경 확인 실패: {e}", file=sys.stderr)
+            continue
+        if _notified_tag is not None and tag != _notified_tag:
+            sent = await subscriptions.notify(_is_versioned)
+            print(f"리소스 변경 알림 {sent}건 (버전 {tag})", file=sys.stderr)
+        _notified_tag = tag
+
+# 자원을 공유하는 세션 수
+# HTTP 모드에서는 MCP 세션마다 lifespan이 호출되므로, 첫 세션이 자원을 만들고
+# 마지막 세션이 정리하도록 참조 횟수로 관리 (stdio 모드에서는 항상 1)
+_lifespan_users = 0
+_lifespan_lock = asyncio.Lock()
+_reaper = None
+_watcher = None
+_snapshotter = None
+_sampler = None
+_analyzer = None
+
+async def _startup():
+    """데이터베이스 레지스트리와 쿼리 로그 등 공유 자원을 생성합니다."""
+    global registry, query_log, export_spool, advisor_executor, named_queries
+    global _reaper, _watcher, _snapshotter, _sampler, _analyzer
+    # 기본 데이터베이스 경로 (절대경로로 계산)
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    db_path = os.path.join(base_dir, "Chinook.db")
+    databases = {"chinook": db_path, **parse_database_list(DATABASES)}
+    descriptions_path = TABLE_DESCRIPTIONS or os.path.join(base_dir, "chinook_descriptions.json")
+    descriptions = load_descriptions(descriptions_path) if os.path.exists(descriptions_path) else {}
+    named_path = NAMED_QUERIES_PATH or os.path.join(base_dir, "named_queries.json")
+    named_queries = load_named_queries(named_path) if os.path.exists(named_path) else {}
+
+    # 데이터베이스는 여기서 열지 않고 이름과 경로만 등록 (처음 사용할 때 연결)
+    registry = DatabaseRegistry(
+        databases,
+        db_dir=DB_DIR or None,
+        default=DEFAULT_DB,
+        max_open=MAX_OPEN_DBS,
+        idle_timeout=DB_IDLE_TIMEOUT,
+        pool_size=POOL_SIZE,
+        cache_size=CACHE_SIZE,
+        cursor_idle_timeout=CURSOR_IDLE_TIMEOUT,
+        query_timeout=QUERY_TIMEOUT,
+        rollups=ROLLUPS,
+        search=SEARCH,
+        embedding=load_embedding(EMBEDDING),
+        descriptions=descriptions,
+        named_queries=named_queries,
+        snapshot=SNAPSHOT,
+        snapshot_refresh=SNAPSHOT_REFRESH,
+        sample_fraction=SAMPLE_FRACTION,
+        analysis_limit=ANALYSIS_LIMIT,
+        sql_backend=SQL_BACKEND,
+        wal=WAL,
+    )
+    # 기본 데이터베이스 파일 존재 여부 확인
+    registry.resolve(None)
+    _reaper = asyncio.create_task(_reap_idle())
+    if CHANGE_POLL_INTERVAL > 0:
+        _watcher = asyncio.create_task(_watch_changes())
+    if SNAPSHOT:
+        _snapshotter = asyncio.create_task(_refresh_snapshots())
+    if SAMPLE_FRACTION > 0:
+        _sampler = asyncio.create_task(_refresh_samples())
+    if TABLE_STATS:
+        _analyzer = asyncio.create_task(_refresh_stats())
+    query_log = QueryLog(capacity=QUERY_LOG_SIZE, persist_path=QUERY_LOG_PATH or None)
+    export_spool = ExportSpool(EXPORT_DIR, ttl=EXPORT_TTL, workers=EXPORT_WORKERS)
+    advisor_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="advisor")
+    print(f"데이터베이스 레지스트리 준비 완료 (기본: {registry.default}, 등록: {len(registry.names())}개)", file=sys.stderr)
+
+async def _shutdown():
+    """공유 자원을 정리합니다. 일부만 만들어진 상태에서도 안전하게 호출할 수 있습니다."""
+    global registry, query_log, export_spool, advisor_executor, _reaper, _watcher, _snapshotter, _sampler, _analyzer
+    if _watcher:
+        _watcher.cancel()
+        _watcher = None
+    if _snapshotter:
+        _snapshotter.cancel()
+        _snapshotter = None
+    if _sampler:
+        _sampler.cancel()
+        _sampler = None
+    if _analyzer:
+        _analyzer.cancel()
+        _analyzer = None
+    # 내보낸 파일은 서버가 종료된 뒤에도 읽을 수 있도록 남겨 둠 (보관 시간이 지나면 다음 실행 때 삭제)
+    if export_spool:
+        export_spool.close()
+        export_spool = None
+    if advisor_executor:
+        advisor_executor.shutdown(wait=False, cancel_futures=True)
+        advisor_executor = None
+    if _reaper:
+        _reaper.cancel()
+        _reaper = None
+    if query_log:
+        query_log.close()
+        query_log = None
+    if registry:
+        await registry.close_all()
+        registry = None
+        print("데이터베이스 연결 종료", file=sys.stderr)
 
 @asynccontextmanager
 async def lifespan(app):
     """
     서버 시작/종료 시 데이터베이스 연결 관리
     """
-    global db
+    global _lifespan_users
+    async with _lifespan_lock:
+        if _lifespan_users == 0:
+            try:
+                await _startup()
+            except BaseException:
+                await _shutdown()
+                raise
+        _lifespan_users += 1
     try:
-        # 서버 시작 시 데이터베이스 연결 (절대경로로 계산)
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        db_path = os.path.join(base_dir, "Chinook.db")
-        
-        # 데이터베이스 파일 존재 여부 확인
-        if not os.path.exists(db_path):
-            raise FileNotFoundError(f"Chinook.db 파일을 찾을 수 없습니다: {db_path}")
-        
-        # SQLite 데이터베이스 연결 생성
-        db = SQLDatabase.from_uri(f"sqlite:///{db_path}")
-        print("Chinook 데이터베이스 연결 성공", file=sys.stderr)
-        
         # yield로 서버가 실행되는 동안 대기
         yield
     finally:
-        # 서버 종료 시 연결 정리
-        if db:
-            db = None
-            print("Chinook 데이터베이스 연결 종료", file=sys.stderr)
+        # 마지막 사용자가 나갈 때 연결 정리
+        async with _lifespan_lock:
+            _lifespan_users -= 1
+            if _lifespan_users == 0:
+                await _shutdown()
+
+# 리소스 구독(resources/subscribe)
+# 하위(lowlevel) 서버는 구독 처리기가 있어도 capability를 subscribe=False로 알리므로,
+# 구독 처리기를 등록한 경우 subscribe=True를 알리는 하위 서버를 사용
+class SubscribableServer(Server):
+    def get_capabilities(self, notification_options, experimental_capabilities) -> types.ServerCapabilities:
+        capabilities = super().get_capabilities(notification_options, experimental_capabilities)
+        if capabilities.resources is not None and types.SubscribeRequest in self.request_handlers:
+            capabilities.resources.subscribe = True
+        return capabilities
+
+# 호출 지표
+# 도구 실행부터 결과 변환(텍스트 직렬화)까지의 시간과 응답 크기를 잰다
+def _content_bytes(blocks) -> int:
+    size = 0
+    for block in blocks:
+        text = getattr(block, "text", None)
+        if text is None:
+            text = getattr(block, "blob", None) or ""
+        size += len(text) if text.isascii() else len(text.encode("utf-8"))
+    return size
+
+def _tool_result_bytes(result) -> int:
+    # FastMCP의 도구 결과: 콘텐츠 목록, (콘텐츠 목록, 구조화된 결과), 또는 CallToolResult
+    if isinstance(result, types.CallToolResult):
+        return _content_bytes(result.content)
+    if isinstance(result, tuple):
+        result = result[0]
+    if isinstance(result, dict):
+        return len(json.dumps(result, ensure_ascii=False).encode("utf-8"))
+    return _content_bytes(result or [])
+
+def _resource_bytes(contents) -> int:
+    size = 0
+    for item in contents or []:
+        content = item.content
+        size += len(content) if isinstance(content, bytes) or content.isascii() else len(content.encode("utf-8"))
+    return size
+
+class ChinookMCP(FastMCP):
+    """
+    FastMCP에 리소스 구독 capability와 호출 지표를 더한 서버입니다.
+    call_tool/read_resource를 감싸 METRICS이면 도구/리소스 호출마다 지연 시간과 응답 크기를 기록합니다.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # 같은 설정의 SubscribableServer로 바꾸고 FastMCP의 기본 처리기를 다시 등록
+        base = self._mcp_server
+        self._mcp_server = SubscribableServer(
+            base.name, base.version, base.instructions, base.website_url, base.icons, base.lifespan,
+        )
+        self._setup_handlers()
+
+    async def call_tool(self, name: str, arguments: dict):
+        if not METRICS:
+            return await super().call_tool(name, arguments)
+        call = metrics.begin()
+        result, error = None, True
+        try:
+            result = await super().call_tool(name, arguments)
+            error = bool(getattr(result, "isError", False))
+            return result
+        finally:
+            metrics.finish(call, "tool", name, error=error, size=_tool_result_bytes(result))
+
+    async def read_resource(self, uri):
+        if not METRICS:
+            return await super().read_resource(uri)
+        call = metrics.begin()
+        contents, error = None, True
+        try:
+            contents = await super().read_resource(uri)
+            error = False
+            return contents
+        finally:
+            # 리소스는 URI 전체가 아니라 종류(스킴)별로 묶음 (table://Album, table://Track → table)
+            metrics.finish(call, "resource", str(uri).split("://", 1)[0], error=error, size=_resource_bytes(contents))
 
 # FastMCP 서버 인스턴스 생성
 # - "ChinookDBAnalysis": MCP 서버의 이름
 # - lifespan: 서버 시작/종료 시 실행될 함수
-mcp = FastMCP("ChinookDBAnalysis", lifespan=lifespan)
+mcp = ChinookMCP("ChinookDBAnalysis", lifespan=lifespan)
+
+# 구독 처리기 (CHANGE_POLL_INTERVAL이 0이면 변경을 확인하지 않으므로 등록하지 않음)
+async def subscribe_resource(uri) -> None:
+    """database://info, table://..., rollup://... 를 구독하면 기본 데이터베이스가 바뀔 때 알림을 보냅니다."""
+    global _notified_tag
+    uri = str(uri)
+    subscriptions.add(mcp.get_context().session, uri)
+    if _notified_tag is None and registry is not None and _is_versioned(uri):
+        # 구독 시점의 버전을 기준으로 삼아, 다음 확인 전에 생긴 변경도 알림
+        async with registry.use(None) as db:
+            _notified_tag = await db.engine.run(db.versions.current_tag)
+
+async def unsubscribe_resource(uri) -> None:
+    subscriptions.remove(mcp.get_context().session, str(uri))
+
+if CHANGE_POLL_INTERVAL > 0:
+    mcp._mcp_server.subscribe_resource()(subscribe_resource)
+    mcp._mcp_server.unsubscribe_resource()(unsubscribe_resource)
 
 @mcp.tool()
-def execute_sql_query(query: str) -> str:
+async def execute_sql_query(
+    query: str,
+    timeout_seconds: float | None = None,
+    max_rows: int | None = None,
+    database: str | None = None,
+    output_format: str | None = None,
+    max_tokens: int | None = None,
+) -> str:
     """
     SQL 쿼리를 실행하고 결과를 반환합니다.
+    데이터베이스는 읽기 전용으로 열려 있어 조회(SELECT)만 가능합니다.
+    timeout_seconds / max_rows로 이 쿼리의 실행 시간과 결과 행 수 한도를
+    서버 기본값보다 작게 지정할 수 있으며, 한도를 넘으면 "쿼리 예산 초과"를 반환합니다.
+    database를 생략하면 기본 데이터베이스(Chinook)에서 실행합니다.
+    output_format: "tsv"(기본, 첫 줄이 컬럼 이름), "json", "markdown", "repr"(파이썬 튜플 목록)
+    max_tokens: 결과 텍스트의 토큰 한도. 넘는 행은 생략하고 생략된 행 수를 알려 줍니다.
+      지정하지 않아도 서버 한도(기본 8000토큰)가 적용되므로, 결과 끝에 생략 안내가 있으면
+      집계/LIMIT로 결과를 줄이거나 execute_sql_query_paged로 나눠 읽으세요.
     """
-    if db is None:
+    if registry is None:
         raise ValueError("데이터베이스가 연결되지 않았습니다.")
     
     try:
-        result = db.run(query)
-        return str(result)
+        async with registry.use(database) as db:
+            rows = await _run_query(db, query, timeout_seconds, max_rows)
+            return await _encode(db, rows, output_format, max_tokens)
+    except BudgetExceeded as e:
+        return str(e)
+    except QueryCostExceeded as e:
+        # 에이전트가 쿼리를 고쳐 쓸 수 있도록 실행 계획 요약을 함께 반환
+        return f"{e}\n{json.dumps(plan_summary(e.plan), ensure_ascii=False, indent=2)}"
     except Exception as e:
         return f"쿼리 실행 중 오류 발생: {str(e)}"
 
+async def _explain(db, query: str) -> dict:
+    """EXPLAIN QUERY PLAN을 실행하고 구조화된 분석 결과를 반환합니다."""
+    plan_rows = await db.query_engine.execute_async(f"EXPLAIN QUERY PLAN {query}", timeout=QUERY_TIMEOUT)
+    return analyze_plan(plan_rows, query, db.catalog)
+
+async def _check_cost(db, query: str) -> None:
+    """예상 비용이 MAX_QUERY_COST를 넘으면 QueryCostExceeded를 발생시킵니다."""
+    if MAX_QUERY_COST <= 0:
+        return
+    plan = await _explain(db, query)
+    if plan["estimated_cost"] > MAX_QUERY_COST:
+        raise QueryCostExceeded(plan, MAX_QUERY_COST)
+
+def _token_budget(max_tokens: int | None) -> int | None:
+    """요청한 토큰 한도를 서버 최대값 이내로 맞춥니다 (None이면 제한 없음)."""
+    if MAX_RESULT_TOKENS <= 0:
+        return max_tokens if max_tokens and max_tokens > 0 else None
+    return MAX_RESULT_TOKENS if not max_tokens or max_tokens <= 0 else min(max_tokens, MAX_RESULT_TOKENS)
+
+async def _encode(db, rows, output_format: str | None, max_tokens: int | None) -> str:
+    """결과 행을 요청한 형식의 텍스트로 만듭니다. 행이 많을 수 있으므로 엔진 스레드에서 실행합니다."""
+    fmt = (output_format or RESULT_FORMAT).strip().lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"output_format은 {', '.join(FORMATS)} 중 하나여야 합니다: {fmt}")
+    return await db.engine.run(encode_rows, getattr(rows, "columns", []), rows, fmt, _token_budget(max_tokens))
+
+def _budget(timeout_seconds: float | None, max_rows: int | None) -> tuple[float, int]:
+    """요청한 한도를 서버 최대값 이내로 맞춥니다."""
+    timeout = QUERY_TIMEOUT if not timeout_seconds or timeout_seconds <= 0 else min(timeout_seconds, QUERY_TIMEOUT)
+    rows = QUERY_MAX_ROWS if not max_rows or max_rows <= 0 else min(max_rows, QUERY_MAX_ROWS)
+    return timeout, rows
+
+async def _run_query(
+    db,
+    query: str,
+    timeout_seconds: float | None = None,
+    max_rows: int | None = None,
+) -> list[tuple]:
+    """캐시를 확인한 뒤 db의 읽기 전용 연결 풀에서 예산 안에서 쿼리를 실행합니다."""
+    timeout, row_limit = _budget(timeout_seconds, max_rows)
+    start = time.perf_counter()
+    rows, cached, error = None, False, None
+    use_cache = False
+
+    try:
+        # 같은 쿼리를 다시 실행하면 캐시된 결과를 바로 반환
+        key = normalize_sql(query)
+        use_cache = db.cache is not None and is_cacheable(key)
+        rows = db.cache.get(key) if use_cache else None
+        cached = rows is not None
+        if rows is None:
+            await _check_cost(db, query)
+            # 실행 중에 데이터가 바뀌면 결과를 캐시하지 않도록 실행 전 버전을 받아 둠
+            version = db.cache.version() if use_cache else None
+            # 읽기 전용 연결 풀에서 실행 → 다른 도구 호출을 막지 않음
+            rows = await db.query_engine.execute_async(query, timeout=timeout, max_rows=row_limit)
+            if use_cache:
+                db.cache.put(key, rows, version)
+        elif len(rows) > row_limit:
+            raise BudgetExceeded("rows", row_limit)
+        return rows
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        # 성공/실패와 관계없이 실행 시간과 반환 행 수를 기록
+        returned = len(rows) if rows is not None and not error else None
+        note_query(returned, cached if use_cache else None, error=error is not None)
+        if query_log is not None:
+            duration_ms = (time.perf_counter() - start) * 1000
+            query_log.record(query, duration_ms, returned, cached=cached, error=error, database=db.name)
+
+@mcp.tool()
+async def list_named_queries(database: str | None = None) -> list[dict]:
+    """
+    미리 정의된 이름 붙은 쿼리 목록(이름, 설명, 매개변수 타입/설명/기본값)을 반환합니다.
+    질문이 목록의 쿼리와 맞으면 SQL을 직접 작성하지 말고 run_named_query를 사용하세요.
+    """
+    if registry is None:
+        raise ValueError("데이터베이스가 연결되지 않았습니다.")
+
+    try:
+        async with registry.use(database) as db:
+            return [q.describe() for name, q in named_queries.items() if name not in db.named_query_errors]
+    except LookupError as e:
+        return [{"error": str(e)}]
+
+@mcp.tool()
+async def run_named_query(
+    name: str,
+    params: dict | None = None,
+    database: str | None = None,
+    output_format: str | None = None,
+    max_tokens: int | None = None,
+) -> str:
+    """
+    이름 붙은 쿼리를 매개변수와 함께 실행합니다 (예: name="invoices_for_customer_year",
+    params={"customer_id": 5, "year": "2023"}). 값은 SQL에 바인딩되므로 따옴표 처리가 필요 없습니다.
+    output_format / max_tokens는 execute_sql_query와 같습니다.
+    """
+    if registry is None:
+        raise ValueError("데이터베이스가 연결되지 않았습니다.")
+
+    query = named_queries.get(name)
+    if query is None:
+        return f"이름 붙은 쿼리를 찾을 수 없습니다: {name} (list_named_queries로 목록 확인)"
+    start = time.perf_counter()
+    rows, cached, error = None, False, None
+    use_cache = False
+    try:
+        bound = query.bind(params)
+        async with registry.use(database) as db:
+            if name in db.named_query_errors:
+                return f"이 데이터베이스에서는 사용할 수 없는 쿼리입니다: {name} ({db.named_query_errors[name]})"
+            try:
+                # 설정 파일의 SQL은 미리 검토된 것이므로 실행 계획 비용 검사를 생략
+                key = f"named:{name}:{json.dumps(bound, sort_keys=True, ensure_ascii=False)}"
+                use_cache = db.cache is not None and is_cacheable(normalize_sql(query.sql))
+                rows = db.cache.get(key) if use_cache else None
+                cached = rows is not None
+                if rows is None:
+                    version = db.cache.version() if use_cache else None
+                    rows = await db.query_engine.execute_async(query.sql, bound, timeout=QUERY_TIMEOUT, max_rows=QUERY_MAX_ROWS)
+                    if use_cache:
+                        db.cache.put(key, rows, version)
+                return await _encode(db, rows, output_format, max_tokens)
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                returned = len(rows) if rows is not None and not error else None
+                note_query(returned, cached if use_cache else None, error=error is not None)
+                if query_log is not None:
+                    query_log.record(query.sql, (time.perf_counter() - start) * 1000, returned,
+                                     cached=cached, error=error, database=db.name)
+    except BudgetExceeded as e:
+        return str(e)
+    except Exception as e:
+        return f"쿼리 실행 중 오류 발생: {str(e)}"
+
+@mcp.tool()
+async def execute_sql_batch(
+    queries: list[str],
+    database: str | None = None,
+    output_format: str | None = None,
+    max_tokens: int | None = None,
+) -> list[dict]:
+    """
+    여러 SQL 쿼리를 한 번에 실행합니다.
+    각 쿼리는 서로 다른 읽기 전용 연결에서 병렬로 실행되며,
+    결과는 입력 순서(index)대로 반환됩니다. 한 쿼리의 오류는 다른 쿼리에 영향을 주지 않습니다.
+    output_format / max_tokens는 execute_sql_query와 같으며 쿼리마다 적용됩니다.
+    """
+    if registry is None:
+        raise ValueError("데이터베이스가 연결되지 않았습니다.")
+    if len(queries) > MAX_BATCH_SIZE:
+        return [{"error": f"한 번에 최대 {MAX_BATCH_SIZE}개의 쿼리만 실행할 수 있습니다."}]
+
+    async def run_one(db, index: int, query: str) -> dict:
+        try:
+            rows = await _run_query(db, query)
+            return {"index": index, "query": query, "result": await _encode(db, rows, output_format, max_tokens)}
+        except BudgetExceeded as e:
+            return {"index": index, "query": query, "error": str(e)}
+        except QueryCostExceeded as e:
+            return {"index": index, "query": query, "error": str(e), "plan": plan_summary(e.plan)}
+        except Exception as e:
+            return {"index": index, "query": query, "error": f"쿼리 실행 중 오류 발생: {str(e)}"}
+
+    try:
+        async with registry.use(database) as db:
+            return list(await asyncio.gather(*(run_one(db, i, q) for i, q in enumerate(queries))))
+    except LookupError as e:
+        return [{"error": str(e)}]
+
+@mcp.tool()
+async def execute_sql_query_paged(query: str, page_size: int = 100, database: str | None = None) -> dict:
+    """
+    결과가 큰 SQL 쿼리를 페이지 단위로 실행합니다.
+    첫 페이지(page 0)와 cursor_id를 반환하며, has_more가 True이면
+    fetch_result_page(cursor_id, page)로 다음 페이지를 이어서 읽을 수 있습니다.
+    """
+    if registry is None:
+        raise ValueError("데이터베이스가 연결되지 않았습니다.")
+    
+    try:
+        page_size = max(1, min(page_size, 1000))
+        async with registry.use(database) as db:
+            await _check_cost(db, query)
+            first = await db.engine.run(db.cursors.open, query, page_size)
+            note_query(len(first["rows"]))
+            return first
+    except BudgetExceeded as e:
+        return {"error": str(e)}
+    except QueryCostExceeded as e:
+        return {"error": str(e), "plan": plan_summary(e.plan)}
+    except Exception as e:
+        return {"error": f"쿼리 실행 중 오류 발생: {str(e)}"}
+
+async def _fetch_page(cursor_id: str, page: int) -> dict:
+    """커서를 가진 데이터베이스를 찾아 해당 페이지를 읽습니다."""
+    name = registry.find_cursor(cursor_id)
+    if name is None:
+        raise LookupError(f"커서를 찾을 수 없습니다 (만료되었거나 이미 닫힘): {cursor_id}")
+    async with registry.use(name) as db:
+        result = await db.engine.run(db.cursors.fetch, cursor_id, page)
+    note_query(len(result["rows"]))
+    return result
+
+@mcp.tool()
+async def fetch_result_page(cursor_id: str, page: int) -> dict:
+    """
+    execute_sql_query_paged로 연 커서에서 지정한 페이지를 읽습니다.
+    페이지는 순서대로(이전 page + 1) 요청해야 합니다.
+    """
+    if registry is None:
+        raise ValueError("데이터베이스가 연결되지 않았습니다.")
+    
+    try:
+        return await _fetch_page(cursor_id, page)
+    except Exception as e:
+        return {"error": f"페이지 조회 중 오류 발생: {str(e)}"}
+
+@mcp.tool()
+async def close_result_cursor(cursor_id: str) -> dict:
+    """
+    더 이상 읽지 않을 커서를 닫아 서버 자원을 반환합니다.
+    """
+    if registry is None:
+        raise ValueError("데이터베이스가 연결되지 않았습니다.")
+    
+    name = registry.find_cursor(cursor_id)
+    if name is None:
+        return {"cursor_id": cursor_id, "closed": False}
+    async with registry.use(name) as db:
+        closed = await db.engine.run(db.cursors.close, cursor_id)
+    return {"cursor_id": cursor_id, "closed": closed}
+
+@mcp.tool()
+async def export_query(query: str, output_format: str = "parquet", database: str | None = None) -> dict:
+    """
+    큰 쿼리 결과 전체를 텍스트 대신 파일(Parquet 또는 Arrow IPC)로 내보내고 요약을 반환합니다.
+    output_format: "parquet"(압축, 기본값) 또는 "arrow"(memory-map으로 복사 없이 읽기)
+    반환값의 export_id/path로 파일을 찾을 수 있으며, 행 수와 컬럼별 타입/NULL 수/최솟값/최댓값이 포함됩니다.
+    결과를 직접 읽어야 할 때만 execute_sql_query를 사용하세요.
+    """
+    if registry is None or export_spool is None:
+        raise ValueError("데이터베이스가 연결되지 않았습니다.")
+
+    fmt = output_format.strip().lower()
+    if fmt not in EXPORT_FORMATS:
+        return {"error": f"output_format은 {', '.join(EXPORT_FORMATS)} 중 하나여야 합니다: {fmt}"}
+    start = time.perf_counter()
+    rows, error = None, None
+    try:
+        async with registry.use(database) as db:
+            try:
+                await _check_cost(db, query)
+                export_id, path = export_spool.new_path(fmt)
+                control = QueryControl(EXPORT_TIMEOUT)
+
+                def export() -> dict:
+                    # 시간 예산은 실행을 시작할 때부터 계산 (빈 내보내기 스레드를 기다린 시간은 제외)
+                    control.restart()
+                    return write_export(db.db_path, query, path, fmt, control=control,
+                                        max_rows=EXPORT_MAX_ROWS, connect=db.connect)
+
+                try:
+                    # 오래 걸리는 내보내기가 쿼리 엔진의 스레드를 차지하지 않도록 스풀의 전용 스레드 풀에서 실행
+                    summary = await export_spool.run(export)
+                except asyncio.CancelledError:
+                    control.cancel()
+                    raise
+                rows = summary["rows"]
+                return export_spool.add(export_id, {"database": db.name, "query": query, **summary})
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                if query_log is not None:
+                    query_log.record(query, (time.perf_counter() - start) * 1000, rows,
+                                     error=error, database=db.name)
+    except BudgetExceeded as e:
+        return {"error": str(e)}
+    except QueryCostExceeded as e:
+        return {"error": str(e), "plan": plan_summary(e.plan)}
+    except Exception as e:
+        return {"error": f"내보내기 중 오류 발생: {str(e)}"}
+
+@mcp.tool()
+async def delete_export(export_id: str) -> dict:
+    """
+    export_query로 만든 파일을 더 이상 쓰지 않으면 삭제합니다.
+    삭제하지 않아도 보관 시간(CHINOOK_EXPORT_TTL)이 지나면 자동으로 삭제됩니다.
+    """
+    if export_spool is None:
+        raise ValueError("데이터베이스가 연결되지 않았습니다.")
+    removed = await asyncio.to_thread(export_spool.remove, export_id)
+    return {"export_id": export_id, "deleted": removed}
+
+@mcp.tool()
+async def list_databases() -> dict:
+    """
+    조회할 수 있는 데이터베이스 이름 목록과 기본 데이터베이스를 반환합니다.
+    다른 도구의 database 인자에 이 이름을 지정하면 해당 데이터베이스를 사용합니다.
+    """
+    if registry is None:
+        raise ValueError("데이터베이스가 연결되지 않았습니다.")
+    
+    return {
+        "default": registry.default,
+        "databases": registry.names(),
+        "open": [db.name for db in registry.open_databases()],
+    }
+
+async def _rollup_rows(db, name: str) -> dict:
+    """요약 테이블 하나의 설명, 컬럼, 행을 읽습니다."""
+    rollup = get_rollup(name)
+    if rollup is None or rollup.name not in db.rollups:
+        raise LookupError(f"요약 테이블을 찾을 수 없습니다: {name} (사용 가능: {', '.join(db.rollups) or '없음'})")
+    rows = await db.query_engine.execute_async(f'SELECT * FROM "{rollup.table}"', timeout=QUERY_TIMEOUT)
+    return {
+        "name": rollup.name,
+        "table": rollup.table,
+        "description": rollup.description,
+        "columns": rollup.columns,
+        "rows": [list(r) for r in rows],
+    }
+
+@mcp.tool()
+async def list_rollups(database: str | None = None) -> list[dict]:
+    """
+    미리 계산되어 항상 최신으로 유지되는 집계 요약 테이블 목록을 반환합니다.
+    (국가별/월별 매출, 장르별 트랙 통계, 아티스트별 매출 등)
+    집계 질문은 원본 테이블을 조인하기 전에 여기 있는 table을
+    execute_sql_query로 조회하면 수십~수백 행만 읽고 답할 수 있습니다.
+    """
+    if registry is None:
+        raise ValueError("데이터베이스가 연결되지 않았습니다.")
+    
+    try:
+        async with registry.use(database) as db:
+            result = []
+            for name in db.rollups:
+                rollup = get_rollup(name)
+                result.append({
+                    "name": rollup.name,
+                    "table": rollup.table,
+                    "description": rollup.description,
+                    "columns": rollup.columns,
+                })
+            return result
+    except Exception as e:
+        return [{"error": f"요약 테이블 조회 중 오류 발생: {str(e)}"}]
+
 @mcp.tool()
-def get_table_schema(table_name: str) -> str:
+async def approximate_query(
+    table: str,
+    aggregates: list[str],
+    group_by: list[str] | None = None,
+    where: str | None = None,
+    joins: str | None = None,
+    limit: int = 50,
+    database: str | None = None,
+) -> dict:
+    """
+    큰 테이블의 층화 표본으로 COUNT/SUM/AVG를 빠르게 근사 계산하고 95% 신뢰구간을 함께 반환합니다.
+    탐색용 질문(대략적인 규모, 비중, 추세)에 사용하고, 정확한 값이 필요하면 execute_sql_query를 사용하세요.
+    table: 표본이 있는 테이블 (InvoiceLine, Invoice), 별칭을 붙일 수 있음 (예: "InvoiceLine il")
+    aggregates: ["COUNT(*)", "SUM(il.UnitPrice * il.Quantity)", "AVG(t.Milliseconds)"]
+    group_by / where / joins: 원본 테이블에 쓰는 SQL 조각 그대로
+      (예: joins="JOIN Track t ON t.TrackId = il.TrackId JOIN Genre g ON g.GenreId = t.GenreId", group_by=["g.Name"])
+    결과의 각 집계는 estimate, ci95([하한, 상한]), rel_error(상대 오차)이며,
+    low_support가 true이면 표본 행이 적어 오차 범위를 믿기 어려우니 정확한 쿼리로 확인하세요.
+    """
+    if registry is None:
+        raise ValueError("데이터베이스가 연결되지 않았습니다.")
+    if SAMPLE_FRACTION <= 0:
+        return {"error": "근사 집계(표본)가 비활성화되어 있습니다. execute_sql_query를 사용하세요."}
+
+    try:
+        async with registry.use(database) as db:
+            return await db.engine.call_async(
+                approximate, table, aggregates, group_by, where, joins, max(1, min(limit, 1000)), db.sample_path,
+                timeout=QUERY_TIMEOUT,
+            )
+    except BudgetExceeded as e:
+        return {"error": str(e)}
+    except Exception as e:
+        return {"error": f"근사 집계 중 오류 발생: {str(e)}"}
+
+@mcp.tool()
+async def search_catalog(
+    text: str,
+    entity: str = "all",
+    limit: int = 10,
+    database: str | None = None,
+) -> list[dict]:
+    """
+    아티스트/앨범/트랙/장르/플레이리스트를 이름으로 검색합니다 (전문 검색 인덱스, BM25 순위).
+    각 단어는 접두어로 검색되므로 "iron mai"처럼 일부만 입력해도 되고, 대소문자/악센트는 무시합니다.
+    entity: "artist", "album", "track", "genre", "playlist" 또는 "all"
+    이름으로 찾을 때는 LIKE '%...%' 쿼리 대신 이 도구로 id를 찾은 뒤 execute_sql_query에 사용하세요.
+    """
+    if registry is None:
+        raise ValueError("데이터베이스가 연결되지 않았습니다.")
+    
+    entity = entity.strip().lower()
+    if entity not in ENTITY_NAMES + ["all"]:
+        return [{"error": f"entity는 {', '.join(ENTITY_NAMES)} 또는 all 중 하나여야 합니다: {entity}"}]
+    limit = max(1, min(limit, 100))
+
+    try:
+        async with registry.use(database) as db:
+            if db.search is None:
+                return [{"error": "이 데이터베이스에는 검색 인덱스가 없습니다."}]
+
+            def run_search() -> list[dict]:
+                # 데이터가 바뀌었으면 메모리 인덱스를 다시 만든 뒤 검색
+                db.search.refresh(db.versions.current_tag())
+                targets = db.search.entities if entity == "all" else [entity]
+                return db.search.search(text, targets, limit)
+
+            return await db.engine.run(run_search)
+    except Exception as e:
+        return [{"error": f"검색 중 오류 발생: {str(e)}"}]
+
+@mcp.tool()
+async def find_relevant_tables(question: str, k: int = 5, database: str | None = None) -> list[dict]:
+    """
+    자연어 질문과 관련 있는 테이블을 유사도 순으로 k개 찾습니다.
+    각 항목에는 테이블 이름, 점수, 설명, 컬럼, 외래키, 행 수가 들어 있어
+    전체 테이블 목록과 스키마를 모두 읽지 않고 필요한 테이블만 골라 쿼리를 작성할 수 있습니다.
+    """
+    if registry is None:
+        raise ValueError("데이터베이스가 연결되지 않았습니다.")
+    k = max(1, min(k, 20))
+
+    try:
+        async with registry.use(database) as db:
+            return await db.engine.run(db.table_index.search, question, k)
+    except Exception as e:
+        return [{"error": f"관련 테이블 검색 중 오류 발생: {str(e)}"}]
+
+@mcp.tool()
+async def get_table_schema(table_name: str, database: str | None = None) -> str:
     """
     특정 테이블의 컬럼명, 데이터 타입, 제약조건 등의
     스키마 정보를 조회합니다.
     """
-    if db is None:
+    if registry is None:
         raise ValueError("데이터베이스가 연결되지 않았습니다.")
     
     try:
-        schema_info = db.get_table_info([table_name])
+        # 데이터베이스를 열 때 만들어 둔 카탈로그에서 바로 조회
+        async with registry.use(database) as db:
+            schema_info = await db.engine.run(db.catalog.table_info, [table_name])
         return schema_info
     except Exception as e:
         return f"스키마 조회 중 오류 발생: {str(e)}"
 
 @mcp.tool()
-def list_tables() -> list:
+async def get_table_schemas(tables: list[str], database: str | None = None) -> dict:
+    """
+    여러 테이블의 스키마 정보를 한 번에 조회합니다.
+    테이블 이름을 키로, 스키마 정보(또는 오류 메시지)를 값으로 반환합니다.
+    """
+    if registry is None:
+        raise ValueError("데이터베이스가 연결되지 않았습니다.")
+    if len(tables) > MAX_BATCH_SIZE:
+        return {"error": f"한 번에 최대 {MAX_BATCH_SIZE}개의 테이블만 조회할 수 있습니다."}
+
+    try:
+        async with registry.use(database) as db:
+
+            def read_schemas() -> dict:
+                schemas = {}
+                for table_name in tables:
+                    try:
+                        schemas[table_name] = db.catalog.table_info([table_name])
+                    except Exception as e:
+                        schemas[table_name] = f"스키마 조회 중 오류 발생: {str(e)}"
+                return schemas
+
+            # 카탈로그 조회는 스키마가 바뀌었으면 다시 만드므로(블로킹) 엔진 스레드에서 실행
+            return await db.engine.run(read_schemas)
+    except LookupError as e:
+        return {"error": str(e)}
+
+@mcp.tool()
+async def list_tables(database: str | None = None) -> list:
     """
     현재 연결된 데이터베이스에서 사용 가능한
     모든 테이블의 이름을 리스트로 반환합니다.
     """
-    if db is None:
+    if registry is None:
         raise ValueError("데이터베이스가 연결되지 않았습니다.")
     
     try:
         # 사용 가능한 모든 테이블 이름 조회
-        tables = db.get_usable_table_names()
+        async with registry.use(database) as db:
+            tables = await db.engine.run(db.catalog.table_names)
         return tables
     except Exception as e:
         return [f"테이블 목록 조회 중 오류 발생: {str(e)}"]
 
 @mcp.tool()
-def validate_sql_query(query: str) -> dict:
+async def validate_sql_query(query: str, database: str | None = None) -> dict:
     """
     실제로 쿼리를 실행하지 않고 문법만 검증하여
     SQL 쿼리가 올바른지 확인합니다.
     """
-    if db is None:
+    if registry is None:
         raise ValueError("데이터베이스가 연결되지 않았습니다.")
     
     try:
         # 쿼리가 유효하면 실행 계획만 반환되고 데이터는 변경되지 않음
         validation_query = f"EXPLAIN QUERY PLAN {query}"
-        db.run(validation_query)
+        async with registry.use(database) as db:
+            await db.query_engine.execute_async(validation_query, timeout=QUERY_TIMEOUT)
         return {"valid": True, "message": "쿼리 문법이 올바릅니다."}
     except Exception as e:
         return {"valid": False, "message": f"쿼리 문법 오류: {str(e)}"}
 
+@mcp.tool()
+async def analyze_sql_query(query: str, database: str | None = None) -> dict:
+    """
+    쿼리를 실행하지 않고 실행 계획(EXPLAIN QUERY PLAN)을 분석합니다.
+    전체 테이블 스캔, 임시 B-트리 사용, 인덱스 없는 조인을 표시하고
+    예상 행 수와 비용을 추정합니다. 비용이 한도를 넘으면 execute_sql_query가 실행을 거부합니다.
+    """
+    if registry is None:
+        raise ValueError("데이터베이스가 연결되지 않았습니다.")
+    
+    try:
+        async with registry.use(database) as db:
+            plan = await _explain(db, query)
+    except Exception as e:
+        return {"valid": False, "message": f"쿼리 문법 오류: {str(e)}"}
+    return {
+        "valid": True,
+        **plan,
+        "max_cost": MAX_QUERY_COST,
+        "would_reject": 0 < MAX_QUERY_COST < plan["estimated_cost"],
+    }
+
+@mcp.tool()
+async def get_slow_queries(limit: int = 10, min_ms: float = 0.0, database: str | None = None) -> list[dict]:
+    """
+    최근 실행된 쿼리를 값만 다른 쿼리끼리 묶어(fingerprint) 총 실행 시간이 큰 순서로 반환합니다.
+    캐시 적중과 오류는 제외하며, 호출 횟수/평균/최대 실행 시간을 포함합니다.
+    실행 시간 예산을 넘어 중단된 쿼리는 포함하며(적어도 예산만큼 걸린 것으로 계산), timeouts에 횟수를 표시합니다.
+    database를 생략하면 모든 데이터베이스의 기록을 봅니다.
+    """
+    if query_log is None:
+        raise ValueError("데이터베이스가 연결되지 않았습니다.")
+    try:
+        if database is not None:
+            database, _ = registry.resolve(database)
+    except LookupError as e:
+        return [{"error": str(e)}]
+    return query_log.slow_queries(limit=limit, min_ms=min_ms, database=database)
+
+@mcp.tool()
+async def suggest_indexes(top_n: int = 5, test: bool = True, database: str | None = None) -> dict:
+    """
+    느린 쿼리 상위 top_n개의 실행 계획에서 전체 스캔/인덱스 없는 조인을 찾아
+    조건 컬럼과 조회 컬럼으로 커버링 인덱스를 제안합니다.
+    test=True이면 데이터베이스의 임시 복사본에 인덱스를 만들어 실행 전/후 시간을 측정합니다.
+    원본 데이터베이스에는 인덱스를 만들지 않습니다.
+    """
+    if query_log is None or registry is None or advisor_executor is None:
+        raise ValueError("데이터베이스가 연결되지 않았습니다.")
+
+    try:
+        database, _ = registry.resolve(database)
+    except LookupError as e:
+        return {"suggestions": [], "message": str(e)}
+    slow = query_log.slow_queries(limit=top_n, database=database)
+    if not slow:
+        return {"suggestions": [], "message": "분석할 쿼리 기록이 없습니다."}
+
+    def advise(db) -> list[dict]:
+        # 인덱스 어드바이저(statistics/tempfile 포함)는 이 도구를 처음 쓸 때만 불러옴
+        from index_advisor import build_suggestions, test_suggestions
+
+        explain = lambda q: db.engine.execute(f"EXPLAIN QUERY PLAN {q}", timeout=QUERY_TIMEOUT)
+        suggestions = build_suggestions(slow, db.catalog, explain)
+        if test and suggestions:
+            test_suggestions(db.db_path, suggestions, timeout=QUERY_TIMEOUT)
+        return suggestions
+
+    try:
+        async with registry.use(database) as db:
+            # 쿼리 실행 스레드 풀(db.engine)이 아닌 전용 스레드에서 실행하고, 동시에 요청되면 차례로 기다림
+            loop = asyncio.get_running_loop()
+            suggestions = await loop.run_in_executor(advisor_executor, advise, db)
+    except Exception as e:
+        return {"suggestions": [], "message": f"인덱스 분석 중 오류 발생: {str(e)}"}
+    return {"database": database, "analyzed_queries": len(slow), "suggestions": suggestions}
+
 @mcp.resource("database://info")
-def get_database_info() -> dict:
+async def get_database_info() -> dict:
     """
     Chinook 데이터베이스의 전반적인 정보를 반환합니다.
     MCP 리소스로 등록되어 클라이언트가 데이터베이스의
@@ -117,41 +1123,149 @@ def get_database_info() -> dict:
               - tables_count: 테이블 개수
               - tables: 테이블 목록 
               - description: 데이터베이스 설명
+              - databases: 조회할 수 있는 전체 데이터베이스 이름
+              - version: 버전 태그 (스키마/데이터가 바뀌면 달라짐, 같으면 캐시한 내용을 그대로 사용 가능)
+              - statistics: 테이블별 행 수, 페이지 수/크기, 인덱스(고유 키 수), 컬럼별 고유값 수 추정
+                (백그라운드에서 계산해 둔 값, COUNT(*) 쿼리 없이 조인 순서/필터를 계획할 때 사용)
     """
-    if db is None:
+    if registry is None:
         return {"error": "데이터베이스가 연결되지 않았습니다."}
     
     try:
-        # 모든 테이블 목록 조회
-        tables = db.get_usable_table_names()
+        # 기본 데이터베이스의 모든 테이블 목록 조회
+        async with registry.use(None) as db:
+            version, tables = await db.engine.run(lambda: (db.versions.current_tag(), db.catalog.table_names()))
+            statistics = _statistics(db, version)
         return {
             "database": "Chinook",
             "tables_count": len(tables),
             "tables": tables,
-            "description": "디지털 미디어 스토어 샘플 데이터베이스"
+            "description": "디지털 미디어 스토어 샘플 데이터베이스",
+            "databases": registry.names(),
+            "version": version,
+            "statistics": statistics,
         }
     except Exception as e:
         return {"error": f"데이터베이스 정보 조회 중 오류: {str(e)}"}
 
+def _statistics(db, version: str) -> dict:
+    """캐시된 테이블 통계와 계산 시점. current가 False이면 계산 이후 데이터가 바뀐 것 (다시 계산 예정)."""
+    if not TABLE_STATS:
+        return {"status": "disabled"}
+    if db.table_stats is None:
+        return {"status": "pending"}
+    return {
+        "status": "ready",
+        "computed_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(db.stats_computed_at)),
+        "compute_ms": db.stats_ms,
+        "current": db.stats_tag == version,
+        "tables": db.table_stats,
+    }
+
+@mcp.resource("databases://status")
+def get_databases_status() -> dict:
+    """
+    등록된 데이터베이스 수와 현재 열려 있는 데이터베이스별 사용 현황을 반환합니다.
+    """
+    if registry is None:
+        return {"error": "데이터베이스가 연결되지 않았습니다."}
+    return registry.stats()
+
+@mcp.resource("cache://stats")
+def get_cache_stats() -> dict:
+    """
+    열려 있는 데이터베이스별 쿼리 결과 캐시의 적중/미스/축출/무효화 횟수를 반환합니다.
+    """
+    if registry is None or CACHE_SIZE <= 0:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "databases": {db.name: db.cache.stats() for db in registry.open_databases()},
+    }
+
+@mcp.resource("metrics://server")
+def get_server_metrics() -> dict:
+    """
+    도구별 호출 수, 오류 수, 지연 시간(평균/p50/p95/p99/최대, 밀리초)과 히스토그램,
+    반환 행 수, 응답 크기(바이트), 결과 캐시 적중률, 리소스 종류별 같은 지표를 반환합니다.
+    result_cache에는 열려 있는 데이터베이스별 결과 캐시 통계가 들어 있습니다.
+    """
+    report = metrics.snapshot()
+    report["enabled"] = METRICS
+    if registry is not None and CACHE_SIZE > 0:
+        report["result_cache"] = {db.name: db.cache.stats() for db in registry.open_databases()}
+    return report
+
+@mcp.resource("export://{export_id}")
+def get_export_resource(export_id: str) -> dict:
+    """
+    export_query로 내보낸 파일의 경로, 형식, 크기, 행 수, 컬럼 요약을 반환합니다.
+    """
+    if export_spool is None:
+        return {"error": "데이터베이스가 연결되지 않았습니다."}
+    summary = export_spool.get(export_id)
+    if summary is None:
+        return {"error": f"내보내기 파일을 찾을 수 없습니다 (만료되었거나 삭제됨): {export_id}"}
+    return summary
+
+@mcp.resource("rollup://{name}")
+async def get_rollup_resource(name: str) -> dict:
+    """
+    기본 데이터베이스의 요약 테이블(rollup_<name>) 전체 행을 반환합니다.
+    원본 테이블이 바뀌면 트리거가 해당 그룹만 다시 계산하므로 항상 최신입니다.
+    """
+    if registry is None:
+        return {"error": "데이터베이스가 연결되지 않았습니다."}
+    
+    try:
+        async with registry.use(None) as db:
+            version = await db.engine.run(db.versions.current_tag)
+            return {**await _rollup_rows(db, name), "version": version}
+    except Exception as e:
+        return {"error": f"요약 테이블 조회 중 오류: {str(e)}"}
+
+@mcp.resource("result://{cursor_id}/{page}")
+async def get_result_page(cursor_id: str, page: str) -> dict:
+    """
+    열린 커서의 결과 페이지를 MCP 리소스로 반환합니다.
+    fetch_result_page 도구와 같은 규칙(순차 조회)을 따릅니다.
+    """
+    if registry is None:
+        return {"error": "데이터베이스가 연결되지 않았습니다."}
+    
+    try:
+        return await _fetch_page(cursor_id, int(page))
+    except Exception as e:
+        return {"error": f"페이지 조회 중 오류: {str(e)}"}
+
 @mcp.resource("table://{table_name}")
-def get_table_info(table_name: str) -> str:
+async def get_table_info(table_name: str) -> dict:
     """  
     MCP 리소스로 등록되어 동적 URI 패턴으로
-    특정 테이블의 상세 정보를 반환합니다.    
+    특정 테이블의 상세 정보와 버전 태그를 반환합니다.
     """
-    if db is None:
-        return "데이터베이스가 연결되지 않았습니다."
+    if registry is None:
+        return {"error": "데이터베이스가 연결되지 않았습니다."}
     
     try:
-        # 테이블 스키마 정보 조회
-        schema_info = db.get_table_info([table_name])
+        # 기본 데이터베이스의 테이블 스키마 정보 조회
+        async with registry.use(None) as db:
+
+            def read_table() -> tuple:
+                return db.versions.current_tag(), db.catalog.table_info([table_name]), db.catalog.get(table_name)
+
+            version, schema_info, table = await db.engine.run(read_table)
+            statistics = (db.table_stats or {}).get(table["name"])
         
         # 스키마 정보가 너무 길 경우 100자로 제한하고 "..." 추가
         if len(schema_info) > 100:
-            return schema_info[:100] + "..."
-        return schema_info
+            schema_info = schema_info[:100] + "..."
+        result = {"table": table_name, "schema": schema_info, "version": version}
+        if statistics is not None:
+            result["statistics"] = statistics
+        return result
     except Exception as e:
-        return f"테이블 정보 조회 중 오류: {str(e)}"
+        return {"error": f"테이블 정보 조회 중 오류: {str(e)}"}
 
 
 @mcp.prompt()
@@ -167,19 +1281,110 @@ def default_prompt(message: str) -> list[base.Message]:
             "다음과 같은 방법으로 Chinook 음악 스토어 데이터베이스를 분석할 수 있습니다:\n"
             "- 데이터를 검색하기 위한 SQL 쿼리 실행\n"
             "- 테이블 스키마 정보 제공\n"
-            "- SQL 쿼리 문법 검증\n"
+            "- 어떤 테이블을 써야 할지 모르면 find_relevant_tables로 질문과 관련된 테이블부터 확인\n"
+            "- SQL 쿼리 문법 검증 및 실행 계획 분석 (analyze_sql_query)\n"
             "- 사용 가능한 테이블 목록 제공\n"
+            "- 자주 묻는 질문(고객별 주문, 월별/국가별 매출 등)은 list_named_queries의 쿼리를 run_named_query로 실행\n"
+            "- 아티스트/앨범/트랙 이름 검색은 LIKE 쿼리 대신 search_catalog 사용\n"
+            "- 국가별/월별 매출, 장르별 통계, 아티스트별 매출 같은 집계는 list_rollups의 요약 테이블을 먼저 조회\n"
+            f"- 큰 테이블({', '.join(s.table for s in SAMPLES)})의 대략적인 COUNT/SUM/AVG는 approximate_query로 "
+            "빠르게 추정 (신뢰구간 확인)\n"
+            "- 수천 행 이상의 결과 전체가 필요하면 execute_sql_query 대신 export_query로 파일로 내보내기\n"
+            "- 여러 테이블 스키마나 여러 쿼리가 필요하면 get_table_schemas / execute_sql_batch로 한 번에 처리\n"
+            "- 다른 데이터베이스(테넌트)를 조회할 때는 list_databases로 이름을 확인하고 database 인자로 지정\n"
             "분석 결과를 명확하게 정리하여 반환해주세요."
         ),
         # 사용자의 실제 메시지
         base.UserMessage(message),
     ]
 
+def create_http_app():
+    """
+    Streamable HTTP용 ASGI 앱을 만듭니다.
+    앱이 살아 있는 동안 lifespan 참조를 하나 잡고 있어, 세션이 모두 끊겨도
+    연결 풀/캐시/카탈로그를 다시 만들지 않고 모든 세션이 공유합니다.
+    """
+    app = mcp.streamable_http_app()
+    session_lifespan = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def http_lifespan(starlette_app):
+        async with lifespan(mcp):
+            async with session_lifespan(starlette_app):
+                yield
+
+    app.router.lifespan_context = http_lifespan
+    if METRICS and METRICS_PATH:
+        _add_prometheus_route(app)
+    return app
+
+def _add_prometheus_route(app) -> None:
+    """prometheus_client가 있으면 METRICS_PATH에서 Prometheus 텍스트 형식의 지표를 제공합니다."""
+    try:
+        from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+    except ImportError:
+        print("prometheus_client가 없어 Prometheus 지표 경로를 만들지 않습니다 (metrics://server는 사용 가능)", file=sys.stderr)
+        return
+    from starlette.responses import Response
+
+    def open_caches() -> dict:
+        if registry is None or CACHE_SIZE <= 0:
+            return {}
+        return {db.name: db.cache.stats() for db in registry.open_databases()}
+
+    prometheus = metrics.prometheus_registry(extra=open_caches)
+
+    async def prometheus_metrics(request):
+        return Response(generate_latest(prometheus), media_type=CONTENT_TYPE_LATEST)
+
+    app.add_route(METRICS_PATH, prometheus_metrics, methods=["GET"])
+
+def run_http(host: str, port: int, max_connections: int | None = None):
+    """하나의 프로세스에서 여러 MCP 세션을 받는 Streamable HTTP 서버를 실행합니다."""
+    import uvicorn
+
+    mcp.settings.host = host
+    mcp.settings.port = port
+    print(f"MCP Server (streamable-http) http://{host}:{port}{mcp.settings.streamable_http_path}", file=sys.stderr)
+    # limit_concurrency: 동시에 처리할 최대 HTTP 연결 수 (초과 시 503 응답)
+    uvicorn.run(
+        create_http_app(),
+        host=host,
+        port=port,
+        limit_concurrency=max_connections,
+        log_level=mcp.settings.log_level.lower(),
+    )
+
+def parse_args():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Chinook DB MCP 서버")
+    parser.add_argument("--transport", choices=["stdio", "http"], default="stdio",
+                        help="stdio: 클라이언트가 띄우는 서브프로세스, http: 여러 클라이언트가 공유하는 서버")
+    parser.add_argument("--host", default=os.getenv("CHINOOK_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("CHINOOK_PORT", "8000")))
+    parser.add_argument("--pool-size", type=int, default=POOL_SIZE,
+                        help="읽기 전용 연결 수 = 동시에 실행되는 쿼리 수")
+    parser.add_argument("--sql-backend", choices=["thread", "aiosqlite"], default=SQL_BACKEND,
+                        help="쿼리 실행 방식 (thread: 스레드 풀, aiosqlite: 비동기 연결 풀)")
+    parser.add_argument("--max-connections", type=int, default=None,
+                        help="HTTP 모드에서 동시에 받을 최대 연결 수 (기본: 제한 없음)")
+    parser.add_argument("--stateless", action="store_true",
+                        help="HTTP 요청마다 독립된 MCP 세션으로 처리 (세션 ID 없음)")
+    return parser.parse_args()
+
 if __name__ == "__main__":
+    args = parse_args()
+    POOL_SIZE = args.pool_size
+    SQL_BACKEND = args.sql_backend
     try:
         print("MCP Server is running...", file=sys.stderr)
-        # stdio: 표준 입출력을 통해 클라이언트와 통신
-        mcp.run(transport="stdio")
+        if args.transport == "http":
+            mcp.settings.stateless_http = args.stateless
+            run_http(args.host, args.port, args.max_connections)
+        else:
+            # stdio: 표준 입출력을 통해 클라이언트와 통신
+            mcp.run(transport="stdio")
     except KeyboardInterrupt:
         # Ctrl+C로 서버 종료 시 정상 종료 메시지 출력
         print("\n✅ 서버가 정상적으로 종료되었습니다.", file=sys.stderr)
@@ -2,6 +2,7 @@
 # 여러 MCP 서버(chinook, notion)를 MultiServerMCPClient로 통합하여 사용하는 예제
 
 import os
+import sys
 import asyncio
 from dotenv import load_dotenv
 
@@ -11,6 +12,10 @@ from langgraph.checkpoint.memory import MemorySaver
 from langchain.chat_models import init_chat_model
 from langchain_core.messages import HumanMessage
 
+# 세션 풀은 DB_MCP_Agent/mcp_session_pool.py를 함께 사용
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "DB_MCP_Agent"))
+from mcp_session_pool import MCP_POOL_SIZE, MCPSessionPool
+
 load_dotenv()
 
 # 1) 모델 준비
@@ -20,11 +25,16 @@ model = init_chat_model("gpt-5-mini", model_provider="openai")
 # 2) MultiServerMCPClient로 두 MCP 서버(chinook, notion) 정의
 client = MultiServerMCPClient(
     {
-        "chinook": {
-            "transport": "stdio",            # 로컬 서브프로세스(stdio)로 실행
-            "command": "python",
-            "args": ["../DB_MCP_Agent/xagent_server.py"],  # Chinook DB MCP 서버 스크립트 경로
-        },
+        # CHINOOK_MCP_URL이 있으면 공유 HTTP 서버에 연결, 없으면 서브프로세스로 실행
+        "chinook": (
+            {"transport": "streamable_http", "url": os.getenv("CHINOOK_MCP_URL")}
+            if os.getenv("CHINOOK_MCP_URL")
+            else {
+                "transport": "stdio",            # 로컬 서브프로세스(stdio)로 실행
+                "command": "python",
+                "args": ["../DB_MCP_Agent/xagent_server.py"],  # Chinook DB MCP 서버 스크립트 경로
+            }
+        ),
         "notion": {
             "transport": "stdio",            # npx 로 Notion 공식 MCP 서버 실행
             "command": "npx",
@@ -44,19 +54,21 @@ client = MultiServerMCPClient(
 async def run():
     print("🔗 MCP 서버 연결 및 도구 수집 중...")
     # 3) 모든 등록 서버에서 Tool 수집 (자동 연결/초기화)
-    tools = await client.get_tools()
-    print(f"✅ 통합 도구 수집 완료: 총 {len(tools)}개\n")
+    # 세션을 열어 두고 대화 루프 내내 재사용 (client.get_tools()의 도구는 호출마다 서버 프로세스를 새로 실행함)
+    async with MCPSessionPool(client.connections, pool_size=MCP_POOL_SIZE) as pool:
+        tools = await pool.get_tools()
+        print(f"✅ 통합 도구 수집 완료: 총 {len(tools)}개\n")
 
-    # 4) 에이전트 생성(메모리 포함)
-    memory = MemorySaver()
-    agent = create_agent(
-        model=model,
-        tools=tools,
-        checkpointer=memory
-    )
-    print("🚀 통합 ReAct Agent 생성 완료")
+        # 4) 에이전트 생성(메모리 포함)
+        memory = MemorySaver()
+        agent = create_agent(
+            model=model,
+            tools=tools,
+            checkpointer=memory
+        )
+        print("🚀 통합 ReAct Agent 생성 완료")
 
-    await start_chatbot(agent)
+        await start_chatbot(agent)
 
 async def start_chatbot(agent):
     # Notion 기본 작업 페이지 ID (있으면 프롬프트에 자동 포함)
@@ -73,7 +85,8 @@ async def start_chatbot(agent):
     print("=" * 60 + "\n")
 
     while True:
-        user_input = input("질문을 입력하세요: ")
+        # 입력을 기다리는 동안에도 세션 상태 확인이 돌도록 별도 스레드에서 읽음
+        user_input = await asyncio.to_thread(input, "질문을 입력하세요: ")
         if user_input.lower() in ["quit", "exit", "종료"]:
             print("\n🛑 통합 Agent를 종료합니다.")
             break
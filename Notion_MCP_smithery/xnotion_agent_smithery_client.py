@@ -2,6 +2,7 @@
 # Notion 자동화 에이전트 (신형 MultiServerMCPClient 버전)
 
 import os
+import sys
 import asyncio
 from dotenv import load_dotenv, find_dotenv
 
@@ -11,6 +12,10 @@ from langgraph.checkpoint.memory import MemorySaver
 from langchain.chat_models import init_chat_model
 from langchain_core.messages import HumanMessage
 
+# 세션 풀은 DB_MCP_Agent/mcp_session_pool.py를 함께 사용
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "DB_MCP_Agent"))
+from mcp_session_pool import MCP_POOL_SIZE, MCPSessionPool
+
 # .env 파일 로드
 load_dotenv(find_dotenv())
 
@@ -44,27 +49,29 @@ async def run():
     print("🔗 Notion MCP 서버 연결 중...")
 
     # MCP 서버에서 도구 불러오기
-    tools = await client.get_tools()
-    print(f"✅ Notion MCP 서버 연결 완료 — 사용 가능한 도구 {len(tools)}개\n")
-
-    # 도구 목록 출력
-    print("📦 사용 가능한 Notion 도구 목록:")
-    for i, tool in enumerate(tools, 1):
-        print(f"  {i}. {tool.name}: {tool.description}")
-    print()
-
-    # ──────────────────────────────────────────────
-    # 4️⃣ LangChain 에이전트 생성
-    # ──────────────────────────────────────────────
-    memory = MemorySaver()
-    agent = create_agent(
-        model=model,
-        tools=tools,
-        checkpointer=memory
-    )
-
-    print("🚀 Notion Agent 생성 완료")
-    await start_chatbot(agent)
+    # 세션을 열어 두고 대화 루프 내내 재사용 (client.get_tools()의 도구는 호출마다 서버 프로세스를 새로 실행함)
+    async with MCPSessionPool(client.connections, pool_size=MCP_POOL_SIZE) as pool:
+        tools = await pool.get_tools()
+        print(f"✅ Notion MCP 서버 연결 완료 — 사용 가능한 도구 {len(tools)}개\n")
+
+        # 도구 목록 출력
+        print("📦 사용 가능한 Notion 도구 목록:")
+        for i, tool in enumerate(tools, 1):
+            print(f"  {i}. {tool.name}: {tool.description}")
+        print()
+
+        # ──────────────────────────────────────────────
+        # 4️⃣ LangChain 에이전트 생성
+        # ──────────────────────────────────────────────
+        memory = MemorySaver()
+        agent = create_agent(
+            model=model,
+            tools=tools,
+            checkpointer=memory
+        )
+
+        print("🚀 Notion Agent 생성 완료")
+        await start_chatbot(agent)
 
 # ──────────────────────────────────────────────
 # 5️⃣ 대화형 챗봇 실행
@@ -83,7 +90,8 @@ async def start_chatbot(agent):
     print("=" * 60 + "\n")
 
     while True:
-        user_input = input("질문을 입력하세요: ")
+        # 입력을 기다리는 동안에도 세션 상태 확인이 돌도록 별도 스레드에서 읽음
+        user_input = await asyncio.to_thread(input, "질문을 입력하세요: ")
 
         if user_input.lower() in ["quit", "exit", "종료"]:
             print("🛑 Notion Agent를 종료합니다.")
@@ -48,6 +48,8 @@ if "messages" not in st.session_state:
 # ---------------------------------------------------------
 notion_api_key = os.getenv("NOTION_API_KEY", "")
 default_page_id = os.getenv("NOTION_PAGE_ID", "")
+# Chinook MCP 서버를 HTTP 모드로 띄워 둔 경우 그 주소 (예: http://127.0.0.1:8000/mcp)
+chinook_mcp_url = os.getenv("CHINOOK_MCP_URL", "")
 
 if not notion_api_key:
     st.sidebar.warning(".env에 NOTION_API_KEY가 설정되어 있지 않습니다.")
@@ -82,11 +84,16 @@ async def run_agent_with_mcp(messages: list[object]) -> str:
     # ───────────────────────────────────────────────
     client = MultiServerMCPClient(
         {
-            "chinook": {
-                "transport": "stdio",
-                "command": "python",
-                "args": [chinook_agent_path],
-            },
+            # CHINOOK_MCP_URL이 있으면 모든 세션이 하나의 HTTP 서버를 공유
+            "chinook": (
+                {"transport": "streamable_http", "url": chinook_mcp_url}
+                if chinook_mcp_url
+                else {
+                    "transport": "stdio",
+                    "command": "python",
+                    "args": [chinook_agent_path],
+                }
+            ),
             "notion": {
                 "transport": "stdio",
                 "command": "npx",